@@ -0,0 +1,112 @@
+"""Multi-project evaluation workbooks shared by Fase 1 (IRL) and Fase 2 (EBCT).
+
+A sheet holds several projects when it has a project column: ``ID_Proyecto``,
+``id_innovacion`` or any header containing "proyecto". ``project_column`` and
+``project_ids`` are the single rule both importers use to find that column
+and to read its ids as text.
+
+``render_batch_upload`` is the "several projects" expander of both pages. It
+handles the upload, keeps only projects of the portfolio, shows the load
+metrics, the per-project summary and the rows with problems, and saves every
+evaluation in one call. Each page provides the loader, the per-project
+preparation, the summary row and the saver.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Mapping
+from typing import Any
+
+import pandas as pd
+import streamlit as st
+
+
+def is_project_column(col: object) -> bool:
+    col_lower = str(col).lower()
+    return "proyecto" in col_lower or col_lower == "id_innovacion"
+
+
+def project_column(columns: Iterable) -> object | None:
+    """Header of the project column, if the sheet has one."""
+
+    return next((col for col in columns if is_project_column(col)), None)
+
+
+def project_ids(raw: pd.Series) -> pd.Series:
+    """Project ids as stripped text (``None`` for blank cells)."""
+
+    if pd.api.types.is_float_dtype(raw) and (raw.dropna() % 1 == 0).all():
+        raw = raw.astype("Int64")  # IDs numéricos con celdas vacías
+    return raw.astype(str).str.strip().where(raw.notna())
+
+
+def render_batch_upload(
+    *,
+    title: str,
+    caption: str,
+    key_prefix: str,
+    sheet_name: str,
+    file_types: list[str],
+    kind: str,
+    known_ids: Iterable,
+    load: Callable[[pd.DataFrame], tuple[Mapping[str, Any], dict]],
+    summarize: Callable[[int, Any], dict],
+    save: Callable[[dict[int, Any]], str],
+    prepare: Callable[[Any], Any] = lambda respuestas: respuestas,
+) -> None:
+    """Expander to load and save the evaluations of several projects at once.
+
+    ``load`` parses the sheet into ``({project id: responses}, stats)``;
+    ``prepare`` turns one project's responses into what ``summarize`` (one
+    summary row) and ``save`` (all projects, returns the timestamp) take.
+    """
+
+    with st.expander(title):
+        st.caption(caption)
+        batch_file = st.file_uploader(
+            "📤 Archivo con evaluaciones de varios proyectos",
+            type=file_types,
+            key=f"{key_prefix}_uploader",
+        )
+        if batch_file is None:
+            return
+        try:
+            batch_df = pd.read_excel(batch_file, sheet_name=sheet_name)
+            batch_responses, batch_stats = load(batch_df)
+        except Exception as e:
+            st.error(f"❌ Error al leer el archivo Excel: {str(e)}")
+            batch_responses, batch_stats = {}, None
+
+        # Solo proyectos registrados en el portafolio
+        known = {str(value) for value in pd.Series(known_ids).dropna().astype(int)}
+        unknown = sorted(set(batch_responses) - known)
+        batch_ready = {
+            int(proyecto): prepare(respuestas)
+            for proyecto, respuestas in batch_responses.items()
+            if proyecto in known
+        }
+        if batch_stats is not None:
+            col_b1, col_b2, col_b3 = st.columns(3)
+            col_b1.metric("Proyectos válidos", len(batch_ready))
+            col_b2.metric("Respuestas válidas", batch_stats['validas'])
+            col_b3.metric("Filas omitidas", batch_stats['invalidas'])
+        if unknown:
+            st.warning(f"⚠️ Proyectos no registrados en el portafolio (se omiten): {', '.join(unknown)}")
+        if batch_stats and batch_stats['errores']:
+            with st.expander(f"Ver {len(batch_stats['errores'])} fila(s) con problemas (primeras 30)"):
+                for error in batch_stats['errores'][:30]:
+                    st.text(f"Fila {error['fila']}: {error['motivo']}")
+
+        if not batch_ready:
+            return
+        resumen = pd.DataFrame([summarize(proyecto, datos) for proyecto, datos in batch_ready.items()])
+        st.dataframe(resumen, use_container_width=True, hide_index=True)
+        if st.button(f"💾 Guardar {len(batch_ready)} evaluaciones", type="primary", key=f"{key_prefix}_save"):
+            try:
+                batch_timestamp = save(batch_ready)
+                st.success(f"✅ {len(batch_ready)} evaluaciones {kind} guardadas ({batch_timestamp}).")
+            except Exception as e:
+                st.error(f"❌ No se guardó ninguna evaluación: {str(e)}")
+
+
+__all__ = ["is_project_column", "project_column", "project_ids", "render_batch_upload"]
@@ -0,0 +1,69 @@
+"""Versioned keys for targeted invalidation of cached database reads.
+
+Cached readers (``db.fetch_df``, ``db_trl.get_trl_history``,
+``db_ebct.get_ebct_history``) pass ``data_version(table, key)`` as an extra
+argument to their ``st.cache_data`` function. Writers call
+``invalidate(table, key)`` instead of ``st.cache_data.clear()``: the version
+changes, the next read misses the cache, and every other table or project
+keeps its cached entries. Stale entries age out through ``ttl`` / ``max_entries``.
+
+Versions live in process memory, so they are shared by every Streamlit
+session served by the same process, as is the ``st.cache_data`` store.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Hashable
+import threading
+
+_lock = threading.Lock()
+_table_versions: defaultdict[str, int] = defaultdict(int)
+_table_writes: defaultdict[str, int] = defaultdict(int)
+_key_versions: defaultdict[tuple[str, Hashable], int] = defaultdict(int)
+
+
+def _norm_key(key: Hashable) -> Hashable:
+    # 42, 42.0 y numpy.int64(42) deben compartir la misma versión
+    try:
+        as_int = int(key)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return key
+    return as_int if as_int == key else key
+
+
+def data_version(table: str, key: Hashable | None = None) -> tuple[int, int]:
+    """Return the current cache version for a table, or for one key within it.
+
+    Without ``key`` the version changes on any write to the table, so whole-table
+    readers also see per-key invalidations.
+    """
+
+    with _lock:
+        table_version = _table_versions[table]
+        if key is None:
+            return table_version, _table_writes[table]
+        return table_version, _key_versions[(table, _norm_key(key))]
+
+
+def invalidate(table: str, key: Hashable | None = None) -> None:
+    """Invalidate cached reads for one key of ``table`` or, without key, the whole table."""
+
+    with _lock:
+        _table_writes[table] += 1
+        if key is None:
+            _table_versions[table] += 1
+        else:
+            _key_versions[(table, _norm_key(key))] += 1
+
+
+def invalidate_many(table: str, keys) -> None:
+    """Invalidate several keys of ``table`` at once."""
+
+    with _lock:
+        _table_writes[table] += 1
+        for key in keys:
+            _key_versions[(table, _norm_key(key))] += 1
+
+
+__all__ = ["data_version", "invalidate", "invalidate_many"]
@@ -5,6 +5,9 @@ DB_PATH = "db.sqlite"
 TABLE = "innovaciones"
 TABLE_TRL = "trl_resultados"
 TABLE_EBCT = "ebct_evaluaciones"
+TABLE_EVAL = "evaluaciones"
+TABLE_IND = "ind_carga"
+TABLE_DRAFT = "irl_borradores"
 
 IMPACTO_ORDER = {"bajo": 1, "medio": 2, "alto": 3}
 
@@ -0,0 +1,245 @@
+"""Multi-file consolidation of Portafolio, IRL and EBCT workbooks (page 07).
+
+Each category may come as several files, one per evaluator or unit. The files
+are parsed concurrently in a process pool (``pd.read_excel`` is CPU-bound and
+holds the GIL), then merged per category in upload order. An evaluation is
+identified by ``ID_Proyecto`` plus its evaluation timestamp, so the same
+evaluation found in a later file is dropped, while a later evaluation of the
+same project is kept. Portfolio rows, which have no timestamp, are
+de-duplicated by ``ID_Proyecto`` alone. IRL/EBCT files without a timestamp
+column cannot tell two evaluations apart, so only rows identical to one
+already included are dropped; rows of a project already seen in another file
+are kept and counted as possible duplicates. Every file gets a row in the
+validation report.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import hashlib
+import io
+import multiprocessing
+import os
+
+import pandas as pd
+import streamlit as st
+
+from .indicadores import HOJAS_REQUERIDAS
+
+ID_COL = "ID_Proyecto"
+
+# Categoría -> hoja del consolidado
+CATEGORIAS: dict[str, str] = {
+    "Portafolio": "Indice",
+    "IRL": "IRL",
+    "EBCT": "EBCT",
+}
+
+# Hoja del consolidado -> hoja del libro que carga Indicadores (página 06)
+HOJAS_INDICADORES: dict[str, str] = {
+    "Indice": "Índice_Proyectos",
+    "IRL": "Niveles_IRL",
+    "EBCT": "Características_EBCT",
+    "Acciones": "Plan_Acción",
+}
+
+# Nombres alternativos de las columnas que exige Indicadores
+ALIAS_COLUMNAS: dict[str, tuple[str, ...]] = {
+    "Nombre_Proyecto": ("nombre_innovacion", "Nombre_Innovacion", "Nombre"),
+    "Nivel_Alcanzado": ("Nivel", "nivel"),
+    "Avance_Porcentaje": ("Avance", "avance"),
+}
+
+# Columnas reconocidas como fecha de evaluación, en orden de preferencia
+COLUMNAS_FECHA = ("fecha_eval", "Fecha_Evaluacion", "Fecha_Evaluación", "Fecha_Eval", "timestamp")
+
+ESTADO_OK = "✅ OK"
+ESTADO_ADVERTENCIA = "⚠️ Advertencia"
+ESTADO_ERROR = "❌ Error"
+
+REPORTE_COLUMNS = [
+    "Archivo",
+    "Categoría",
+    "Estado",
+    "Filas",
+    "Proyectos",
+    "Filas_Duplicadas",
+    "Posibles_Duplicados",
+    "Filas_Sin_ID",
+    "Detalle",
+]
+
+# Tarea de lectura: (categoría, nombre de archivo, contenido)
+Tarea = tuple[str, str, bytes]
+
+
+def leer_archivo(tarea: Tarea) -> tuple[pd.DataFrame | None, str | None]:
+    """Parse one uploaded workbook; returns ``(frame, error)`` (runs in a worker)."""
+
+    _, nombre, content = tarea
+    try:
+        if nombre.lower().endswith(".csv"):
+            return pd.read_csv(io.BytesIO(content)), None
+        return pd.read_excel(io.BytesIO(content)), None
+    except Exception as exc:  # noqa: BLE001 - el error se informa por archivo
+        return None, str(exc)
+
+
+def leer_archivos(tareas: Sequence[Tarea], max_workers: int | None = None) -> list[tuple[pd.DataFrame | None, str | None]]:
+    """Parse ``tareas`` in a process pool, preserving their order.
+
+    With a single file or a single CPU the files are read in-process. If the
+    pool cannot be started (sandboxed hosts without process spawning) they
+    are read sequentially as well.
+    """
+
+    workers = max_workers or min(len(tareas), os.cpu_count() or 1)
+    if len(tareas) <= 1 or workers <= 1:
+        return [leer_archivo(tarea) for tarea in tareas]
+    try:
+        # spawn: no se hereda por fork el estado de los hilos de Streamlit
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            return list(pool.map(leer_archivo, tareas))
+    except (BrokenProcessPool, OSError):
+        return [leer_archivo(tarea) for tarea in tareas]
+
+
+def columna_fecha(df: pd.DataFrame) -> str | None:
+    """Evaluation timestamp column of ``df``, if any."""
+
+    return next((col for col in COLUMNAS_FECHA if col in df.columns), None)
+
+
+def _ids(df: pd.DataFrame) -> pd.Series:
+    return df[ID_COL].astype(str).str.strip()
+
+
+def _claves(df: pd.DataFrame, fecha: str | None, categoria: str) -> pd.Series:
+    ids = _ids(df)
+    if fecha is None:
+        if categoria == "Portafolio":
+            return ids
+        # Sin fecha solo se reconoce como repetida una fila idéntica
+        return ids + "|" + pd.util.hash_pandas_object(df, index=False).astype(str)
+    fechas = pd.to_datetime(df[fecha], errors="coerce")
+    texto = fechas.dt.strftime("%Y-%m-%d %H:%M:%S").fillna(df[fecha].astype(str))
+    return ids + "|" + texto
+
+
+def combinar(
+    tareas: Sequence[Tarea],
+    resultados: Sequence[tuple[pd.DataFrame | None, str | None]],
+) -> tuple[dict[str, pd.DataFrame], pd.DataFrame]:
+    """Merge parsed files per category and build the per-file validation report.
+
+    Returns ``(hojas, reporte)``: ``hojas`` maps the consolidated sheet name of
+    every category with at least one valid file to its merged frame.
+    """
+
+    partes: dict[str, list[pd.DataFrame]] = {categoria: [] for categoria in CATEGORIAS}
+    vistas: dict[str, set[str]] = {categoria: set() for categoria in CATEGORIAS}
+    proyectos: dict[str, set[str]] = {categoria: set() for categoria in CATEGORIAS}
+    reporte = []
+    for (categoria, nombre, _), (df, error) in zip(tareas, resultados):
+        fila = {"Archivo": nombre, "Categoría": categoria, "Filas": 0, "Proyectos": 0,
+                "Filas_Duplicadas": 0, "Posibles_Duplicados": 0, "Filas_Sin_ID": 0, "Detalle": ""}
+        if df is None:
+            reporte.append({**fila, "Estado": ESTADO_ERROR, "Detalle": f"No se pudo leer: {error}"})
+            continue
+        if ID_COL not in df.columns:
+            reporte.append({**fila, "Estado": ESTADO_ERROR, "Filas": len(df), "Detalle": f"Falta la columna {ID_COL}"})
+            continue
+
+        sin_id = df[ID_COL].isna()
+        df = df.loc[~sin_id]
+        fecha = columna_fecha(df)
+        claves = _claves(df, fecha, categoria)
+        duplicadas = claves.isin(vistas[categoria])
+        vistas[categoria].update(claves.loc[~duplicadas])
+        df = df.loc[~duplicadas]
+        partes[categoria].append(df)
+        ids = _ids(df)
+        posibles = 0
+        if fecha is None and categoria != "Portafolio":
+            posibles = int(ids.isin(proyectos[categoria]).sum())
+        proyectos[categoria].update(ids)
+
+        detalles = []
+        if fecha is None and categoria != "Portafolio":
+            detalles.append("sin columna de fecha: solo se descartan filas idénticas")
+        if duplicadas.any():
+            detalles.append(f"{int(duplicadas.sum())} filas ya incluidas desde otro archivo")
+        if posibles:
+            detalles.append(f"{posibles} filas de proyectos ya incluidos desde otro archivo (posibles duplicados, se conservan)")
+        if sin_id.any():
+            detalles.append(f"{int(sin_id.sum())} filas sin {ID_COL} descartadas")
+        reporte.append({
+            **fila,
+            "Estado": ESTADO_ADVERTENCIA if detalles else ESTADO_OK,
+            "Filas": len(df),
+            "Proyectos": df[ID_COL].nunique(),
+            "Filas_Duplicadas": int(duplicadas.sum()),
+            "Posibles_Duplicados": posibles,
+            "Filas_Sin_ID": int(sin_id.sum()),
+            "Detalle": "; ".join(detalles),
+        })
+
+    hojas = {
+        CATEGORIAS[categoria]: pd.concat(frames, ignore_index=True)
+        for categoria, frames in partes.items()
+        if frames
+    }
+    return hojas, pd.DataFrame(reporte, columns=REPORTE_COLUMNS)
+
+
+def libro_indicadores(hojas: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
+    """Consolidated sheets renamed to the workbook schema Indicadores validates.
+
+    Known aliases of the required columns are renamed. Required columns or
+    sheets missing from the inputs are added empty (``Indicadores_Desempeño``
+    always is), so the workbook loads and those indicators show 0.
+    """
+
+    libro = {destino: hojas[origen] for origen, destino in HOJAS_INDICADORES.items() if origen in hojas}
+    for hoja, columnas in HOJAS_REQUERIDAS.items():
+        df = libro.get(hoja, pd.DataFrame(columns=[ID_COL]))
+        for columna in columnas:
+            if columna in df.columns:
+                continue
+            alias = next((nombre for nombre in ALIAS_COLUMNAS.get(columna, ()) if nombre in df.columns), None)
+            df = df.rename(columns={alias: columna}) if alias else df.assign(**{columna: float("nan")})
+        libro[hoja] = df
+    return libro
+
+
+def huella_tareas(tareas: Sequence[Tarea]) -> tuple[tuple[str, str, str], ...]:
+    """Cache key of a set of uploads (category, name and content hash of each)."""
+
+    return tuple((categoria, nombre, hashlib.sha256(content).hexdigest()) for categoria, nombre, content in tareas)
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def _consolidar(huella: tuple, _tareas: Sequence[Tarea]) -> tuple[dict[str, pd.DataFrame], pd.DataFrame]:
+    return combinar(_tareas, leer_archivos(_tareas))
+
+
+def consolidar_archivos(tareas: Sequence[Tarea]) -> tuple[dict[str, pd.DataFrame], pd.DataFrame]:
+    """Cached ``leer_archivos`` + ``combinar``: reruns reuse the merged sheets."""
+
+    return _consolidar(huella_tareas(tareas), list(tareas))
+
+
+__all__ = [
+    "CATEGORIAS",
+    "COLUMNAS_FECHA",
+    "HOJAS_INDICADORES",
+    "REPORTE_COLUMNS",
+    "leer_archivo",
+    "leer_archivos",
+    "columna_fecha",
+    "combinar",
+    "libro_indicadores",
+    "consolidar_archivos",
+]
@@ -1,10 +1,13 @@
 import sqlite3
+from collections.abc import Iterable
 import pandas as pd
 import streamlit as st
-from .config import DB_PATH, TABLE
+from . import cache, snapshots, utils
+from .config import TABLE
+from .db_pool import get_connection, transaction
 
-def get_conn():
-    return sqlite3.connect(DB_PATH, check_same_thread=False)
+def get_conn() -> sqlite3.Connection:
+    return get_connection()
 
 def init_db():
     with get_conn() as conn:
@@ -33,34 +36,147 @@ def init_db():
         conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{TABLE}_estado ON {TABLE}(estado_pm);")
         conn.commit()
 
-@st.cache_data(ttl=300)
 def fetch_df() -> pd.DataFrame:
     """Fetch the portfolio table as a DataFrame and cache the result for 5 minutes.
 
-    The cache is cleared by write operations (replace_all / upsert_merge) to
-    ensure subsequent reads return fresh data.
+    Write operations (replace_all / upsert_merge) bump the table's data version
+    so subsequent reads return fresh data without clearing unrelated caches.
     """
-    with get_conn() as conn:
-        return pd.read_sql_query(f"SELECT * FROM {TABLE} ORDER BY id_innovacion", conn)
+    return _fetch_df(cache.data_version(TABLE))
+
+@st.cache_data(ttl=300, max_entries=4)
+def _fetch_df(version: tuple[int, int]) -> pd.DataFrame:
+    # Con pyarrow se lee el snapshot Arrow de la generación actual (mmap)
+    return snapshots.load_table(TABLE, _read_table)
+
+def _read_table(conn: sqlite3.Connection) -> pd.DataFrame:
+    return pd.read_sql_query(f"SELECT * FROM {TABLE} ORDER BY id_innovacion", conn)
+
+def fetch_portfolio(flags: bool = False) -> pd.DataFrame:
+    """Return the portfolio already passed through utils.normalize_df (and add_flags).
+
+    The parsed frame is built once per data version and shared by every page and
+    session; the flag columns are rebuilt only when tz_today() changes day.
+    Treat the result as read-only: adding or dropping columns is safe, but call
+    .copy() before editing values in place.
+    """
+    version = cache.data_version(TABLE)
+    if flags:
+        df = _portfolio_flagged(version, utils.tz_today())
+    else:
+        df = _portfolio_normalized(version)
+    return df.copy(deep=False)
+
+@st.cache_resource(ttl=300, max_entries=4)
+def _portfolio_normalized(version: tuple[int, int]) -> pd.DataFrame:
+    return utils.normalize_df(_fetch_df(version))
+
+@st.cache_resource(ttl=300, max_entries=4)
+def _portfolio_flagged(version: tuple[int, int], today) -> pd.DataFrame:
+    return utils.add_flags(_portfolio_normalized(version))
 
 def replace_all(df: pd.DataFrame):
-    with get_conn() as conn:
+    with transaction() as conn:
         conn.execute(f"DELETE FROM {TABLE};")
+        snapshots.bump_generation(conn, TABLE)
         df.to_sql(TABLE, conn, if_exists="append", index=False)
-    # Invalidate cached reads after a write
-    try:
-        st.cache_data.clear()
-    except Exception:
-        # If Streamlit cache API is unavailable for some reason, ignore
-        pass
-
-def upsert_merge(df_new: pd.DataFrame):
-    current = fetch_df()
-    merged = pd.concat([current, df_new]).sort_values("id_innovacion")\
-             .drop_duplicates(subset=["id_innovacion"], keep="last")
-    replace_all(merged)
-    # ensure cache cleared (replace_all already clears but keep as safety)
+    # Invalidate cached portfolio reads after a write
+    cache.invalidate(TABLE)
+
+def _table_columns(conn: sqlite3.Connection) -> list[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({TABLE});")]
+
+def replace_all_chunked(chunks: Iterable[pd.DataFrame]) -> int:
+    """Replace the portfolio from an iterable of frames, holding one chunk at a time.
+
+    Each chunk is committed to a staging table in its own short transaction and
+    the live table is swapped in one final transaction, so a failing chunk leaves
+    the current portfolio untouched. Columns that do not exist in the table are
+    ignored. Returns the number of rows written.
+    """
+    staging = f"{TABLE}_carga"
+    with transaction() as conn:
+        conn.execute(f"DROP TABLE IF EXISTS {staging};")
+        conn.execute(f"CREATE TABLE {staging} AS SELECT * FROM {TABLE} WHERE 0;")
+        table_cols = _table_columns(conn)
+    total = 0
     try:
-        st.cache_data.clear()
-    except Exception:
-        pass
+        for chunk in chunks:
+            cols = [c for c in table_cols if c in chunk.columns]
+            if chunk.empty or not cols:
+                continue
+            marks = ", ".join("?" * len(cols))
+            rows = utils.to_sql_rows(chunk[cols])
+            with transaction() as conn:
+                conn.executemany(f"INSERT INTO {staging} ({', '.join(cols)}) VALUES ({marks})", rows)
+            total += len(rows)
+        col_list = ", ".join(table_cols)
+        with transaction() as conn:
+            conn.execute(f"DELETE FROM {TABLE};")
+            conn.execute(f"INSERT INTO {TABLE} ({col_list}) SELECT {col_list} FROM {staging};")
+            snapshots.bump_generation(conn, TABLE)
+            conn.execute(f"DROP TABLE {staging};")
+    except BaseException:
+        with transaction() as conn:
+            conn.execute(f"DROP TABLE IF EXISTS {staging};")
+        raise
+    cache.invalidate(TABLE)
+    return total
+
+def _existing_ids(conn: sqlite3.Connection, ids: list[int], chunk: int = 900) -> set[int]:
+    found: set[int] = set()
+    for start in range(0, len(ids), chunk):
+        part = ids[start:start + chunk]
+        marks = ",".join("?" * len(part))
+        found.update(
+            r[0] for r in conn.execute(
+                f"SELECT id_innovacion FROM {TABLE} WHERE id_innovacion IN ({marks})", part
+            )
+        )
+    return found
+
+def upsert_merge(df_new: pd.DataFrame) -> dict[str, int]:
+    """Insert or update rows by ``id_innovacion`` without rewriting the table.
+
+    Uses ``INSERT ... ON CONFLICT DO UPDATE`` in a single transaction; rows whose
+    stored values already match are left untouched. Columns that do not exist in
+    the table are ignored. Returns the counts of inserted, updated and unchanged rows.
+    """
+    stats = {"inserted": 0, "updated": 0, "unchanged": 0}
+    if df_new.empty:
+        return stats
+    df_new = df_new.drop_duplicates(subset=["id_innovacion"], keep="last") \
+        if "id_innovacion" in df_new.columns else df_new
+    with transaction() as conn:
+        cols = [c for c in _table_columns(conn) if c in df_new.columns]
+        rows = utils.to_sql_rows(df_new[cols])
+        col_list = ", ".join(cols)
+        marks = ", ".join("?" * len(cols))
+        updatable = [c for c in cols if c != "id_innovacion"]
+        if "id_innovacion" not in cols:
+            conn.executemany(f"INSERT INTO {TABLE} ({col_list}) VALUES ({marks})", rows)
+            stats["inserted"] = len(rows)
+        else:
+            ids = [int(i) for i in df_new["id_innovacion"].dropna()]
+            known = len(_existing_ids(conn, ids))
+            if updatable:
+                conflict = (
+                    "DO UPDATE SET " + ", ".join(f"{c}=excluded.{c}" for c in updatable)
+                    + f" WHERE ({', '.join(f'{TABLE}.{c}' for c in updatable)})"
+                    + f" IS NOT ({', '.join(f'excluded.{c}' for c in updatable)})"
+                )
+            else:
+                conflict = "DO NOTHING"
+            cur = conn.executemany(
+                f"INSERT INTO {TABLE} ({col_list}) VALUES ({marks}) "
+                f"ON CONFLICT(id_innovacion) {conflict}",
+                rows,
+            )
+            stats["inserted"] = len(rows) - known
+            stats["updated"] = cur.rowcount - stats["inserted"]
+            stats["unchanged"] = known - stats["updated"]
+        if stats["inserted"] or stats["updated"]:
+            snapshots.bump_generation(conn, TABLE)
+    if stats["inserted"] or stats["updated"]:
+        cache.invalidate(TABLE)
+    return stats
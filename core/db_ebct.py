@@ -3,45 +3,96 @@
 from __future__ import annotations
 
 from datetime import datetime
+import json
 import sqlite3
-from typing import Iterable
+from typing import Iterable, Mapping
 
 import pandas as pd
 import pytz
-
-from .config import DB_PATH, TABLE_EBCT, TZ_NAME
+import streamlit as st
+
+from . import cache
+from .config import TABLE_EBCT, TABLE_EVAL, TZ_NAME
+from .db_eval import TIPO_EBCT, create_evaluation, init_db_eval, migrate_detail_table
+from .db_pool import database_path, get_connection, transaction
+
+_DETAIL_COLUMNS = [
+    "caracteristica_id",
+    "caracteristica_nombre",
+    "fase_id",
+    "fase_nombre",
+    "peso",
+    "cumple",
+]
+
+_CREATE_SQL = f"""
+CREATE TABLE IF NOT EXISTS {TABLE_EBCT} (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    evaluacion_id INTEGER NOT NULL REFERENCES {TABLE_EVAL}(id) ON DELETE CASCADE,
+    caracteristica_id INTEGER NOT NULL,
+    caracteristica_nombre TEXT NOT NULL,
+    fase_id TEXT NOT NULL,
+    fase_nombre TEXT NOT NULL,
+    peso REAL NOT NULL,
+    cumple INTEGER NOT NULL
+);
+"""
+
+# Databases already initialised by this process (init runs on every page rerun)
+_INITIALIZED: set[str] = set()
+
+# Detail rows joined with their session; same columns as the legacy table
+# plus evaluacion_id.
+_SELECT_SQL = f"""
+    SELECT d.id, e.id_innovacion, e.fecha_eval, d.caracteristica_id, d.caracteristica_nombre,
+           d.fase_id, d.fase_nombre, d.peso, d.cumple, d.evaluacion_id
+    FROM {TABLE_EBCT} AS d
+    JOIN {TABLE_EVAL} AS e ON e.id = d.evaluacion_id
+    WHERE e.tipo = '{TIPO_EBCT}'
+"""
 
 
 def _get_conn() -> sqlite3.Connection:
-    return sqlite3.connect(DB_PATH, check_same_thread=False)
+    return get_connection()
 
 
 def init_db_ebct() -> None:
-    """Ensure the SQLite table for EBCT evaluations exists."""
-
-    with _get_conn() as conn:
+    """Ensure the SQLite tables for EBCT evaluations exist, migrating legacy files."""
+
+    if database_path() in _INITIALIZED:
+        return
+    with transaction() as conn:
+        init_db_eval(conn)
+        if migrate_detail_table(conn, TABLE_EBCT, TIPO_EBCT, _CREATE_SQL, _DETAIL_COLUMNS):
+            cache.invalidate(TABLE_EBCT)
+        conn.execute(_CREATE_SQL)
         conn.execute(
-            f"""
-            CREATE TABLE IF NOT EXISTS {TABLE_EBCT} (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                id_innovacion INTEGER NOT NULL,
-                fecha_eval TEXT NOT NULL,
-                caracteristica_id INTEGER NOT NULL,
-                caracteristica_nombre TEXT NOT NULL,
-                fase_id TEXT NOT NULL,
-                fase_nombre TEXT NOT NULL,
-                peso REAL NOT NULL,
-                cumple INTEGER NOT NULL
-            );
-            """
+            f"CREATE INDEX IF NOT EXISTS idx_{TABLE_EBCT}_eval ON {TABLE_EBCT}(evaluacion_id);"
         )
-        conn.execute(
-            f"CREATE INDEX IF NOT EXISTS idx_{TABLE_EBCT}_innovacion ON {TABLE_EBCT}(id_innovacion);"
+    _INITIALIZED.add(database_path())
+
+
+def _detail_rows(responses: Iterable[dict[str, object]]) -> list[tuple]:
+    return [
+        (
+            int(row.get("id")),
+            str(row.get("name", "")),
+            str(row.get("phase_id", "")),
+            str(row.get("phase_name", "")),
+            float(row.get("weight", 1.0)),
+            1 if row.get("value") else 0,
         )
-        conn.execute(
-            f"CREATE INDEX IF NOT EXISTS idx_{TABLE_EBCT}_fecha ON {TABLE_EBCT}(fecha_eval);"
-        )
-        conn.commit()
+        for row in responses
+    ]
+
+
+def _insert_evaluation(conn: sqlite3.Connection, id_innovacion: int, timestamp: str, rows: list[tuple]) -> None:
+    eval_id = create_evaluation(conn, id_innovacion, TIPO_EBCT, timestamp)
+    conn.executemany(
+        f"INSERT INTO {TABLE_EBCT} (evaluacion_id, {', '.join(_DETAIL_COLUMNS)}) "
+        f"VALUES (?, {', '.join('?' * len(_DETAIL_COLUMNS))})",
+        [(eval_id, *row) for row in rows],
+    )
 
 
 def save_ebct_evaluation(
@@ -52,40 +103,53 @@ def save_ebct_evaluation(
 
     tz = pytz.timezone(TZ_NAME)
     timestamp = datetime.now(tz).strftime("%Y-%m-%d %H:%M:%S")
-    rows: list[dict[str, object]] = []
-    for row in responses:
-        rows.append(
-            {
-                "id_innovacion": int(id_innovacion),
-                "fecha_eval": timestamp,
-                "caracteristica_id": int(row.get("id")),
-                "caracteristica_nombre": str(row.get("name", "")),
-                "fase_id": str(row.get("phase_id", "")),
-                "fase_nombre": str(row.get("phase_name", "")),
-                "peso": float(row.get("weight", 1.0)),
-                "cumple": 1 if row.get("value") else 0,
-            }
-        )
+    rows = _detail_rows(responses)
 
     if not rows:
         return timestamp
 
-    df = pd.DataFrame(rows)
-    with _get_conn() as conn:
-        df.to_sql(TABLE_EBCT, conn, if_exists="append", index=False)
+    with transaction() as conn:
+        _insert_evaluation(conn, id_innovacion, timestamp, rows)
+    cache.invalidate(TABLE_EBCT, id_innovacion)
+    return timestamp
+
+
+def save_ebct_evaluations(evaluations: Mapping[int, Iterable[dict[str, object]]]) -> str:
+    """Persist one EBCT evaluation per project in a single transaction.
+
+    ``evaluations`` maps ``id_innovacion`` to the rows ``save_ebct_evaluation``
+    takes. Every evaluation gets the same timestamp, which is returned; if any
+    insert fails, none is stored.
+    """
+
+    tz = pytz.timezone(TZ_NAME)
+    timestamp = datetime.now(tz).strftime("%Y-%m-%d %H:%M:%S")
+    batch = {int(id_innovacion): _detail_rows(rows) for id_innovacion, rows in evaluations.items()}
+    batch = {id_innovacion: rows for id_innovacion, rows in batch.items() if rows}
+    if not batch:
+        return timestamp
+
+    with transaction() as conn:
+        for id_innovacion, rows in batch.items():
+            _insert_evaluation(conn, id_innovacion, timestamp, rows)
+    cache.invalidate_many(TABLE_EBCT, batch)
     return timestamp
 
 
 def get_ebct_history(id_innovacion: int) -> pd.DataFrame:
     """Return the full EBCT history for a project (latest first)."""
 
+    return _get_ebct_history(int(id_innovacion), cache.data_version(TABLE_EBCT, id_innovacion))
+
+
+@st.cache_data(ttl=300, max_entries=512)
+def _get_ebct_history(id_innovacion: int, version: tuple[int, int]) -> pd.DataFrame:
     with _get_conn() as conn:
         return pd.read_sql_query(
             f"""
-            SELECT *
-            FROM {TABLE_EBCT}
-            WHERE id_innovacion = ?
-            ORDER BY fecha_eval DESC, id DESC
+            {_SELECT_SQL}
+              AND e.id_innovacion = ?
+            ORDER BY e.id DESC, d.id DESC
             """,
             conn,
             params=(id_innovacion,),
@@ -95,11 +159,63 @@ def get_ebct_history(id_innovacion: int) -> pd.DataFrame:
 def get_latest_ebct_evaluation(id_innovacion: int) -> pd.DataFrame:
     """Return only the latest EBCT evaluation rows for the project."""
 
-    history = get_ebct_history(id_innovacion)
-    if history.empty:
-        return history
-    latest_timestamp = history["fecha_eval"].iloc[0]
-    return history[history["fecha_eval"] == latest_timestamp].copy()
+    return _get_latest_ebct_evaluation(
+        int(id_innovacion), cache.data_version(TABLE_EBCT, id_innovacion)
+    )
+
+
+@st.cache_data(ttl=300, max_entries=512)
+def _get_latest_ebct_evaluation(id_innovacion: int, version: tuple[int, int]) -> pd.DataFrame:
+    with _get_conn() as conn:
+        return pd.read_sql_query(
+            f"""
+            {_SELECT_SQL}
+              AND e.id = (
+                  SELECT MAX(id) FROM {TABLE_EVAL}
+                  WHERE id_innovacion = ? AND tipo = '{TIPO_EBCT}'
+              )
+            ORDER BY d.id DESC
+            """,
+            conn,
+            params=(id_innovacion,),
+        )
+
+
+def get_latest_ebct_for_projects(ids: Iterable[int]) -> pd.DataFrame:
+    """Return the latest EBCT evaluation rows of every project in ``ids``.
+
+    One query for the whole set, ordered by project and then as
+    ``get_latest_ebct_evaluation``. Projects without evaluations are absent.
+    """
+
+    unique_ids = tuple(sorted({int(i) for i in ids}))
+    return _get_latest_ebct_for_projects(unique_ids, cache.data_version(TABLE_EBCT))
+
+
+@st.cache_data(ttl=300, max_entries=64)
+def _get_latest_ebct_for_projects(ids: tuple[int, ...], version: tuple[int, int]) -> pd.DataFrame:
+    with _get_conn() as conn:
+        return pd.read_sql_query(
+            f"""
+            {_SELECT_SQL}
+              AND e.id IN (
+                  SELECT MAX(id) FROM {TABLE_EVAL}
+                  WHERE tipo = '{TIPO_EBCT}'
+                    AND id_innovacion IN (SELECT value FROM json_each(?))
+                  GROUP BY id_innovacion
+              )
+            ORDER BY e.id_innovacion, d.id DESC
+            """,
+            conn,
+            params=(json.dumps(list(ids)),),
+        )
 
 
-__all__ = ["init_db_ebct", "save_ebct_evaluation", "get_ebct_history", "get_latest_ebct_evaluation"]
+__all__ = [
+    "init_db_ebct",
+    "save_ebct_evaluation",
+    "save_ebct_evaluations",
+    "get_ebct_history",
+    "get_latest_ebct_evaluation",
+    "get_latest_ebct_for_projects",
+]
@@ -0,0 +1,115 @@
+"""Evaluation sessions shared by the IRL (Fase 1) and EBCT (Fase 2) detail tables.
+
+Each saved evaluation gets one row in ``evaluaciones`` (project, type,
+timestamp and global score). The rows of ``trl_resultados`` and
+``ebct_evaluaciones`` reference it through ``evaluacion_id`` instead of
+repeating ``id_innovacion`` and the ``fecha_eval`` text on every row. Session
+ids grow with time, so the latest evaluation of a project is the indexed
+``MAX(id)``.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+
+from .config import TABLE_EVAL
+
+TIPO_IRL = "IRL"
+TIPO_EBCT = "EBCT"
+
+
+def init_db_eval(conn: sqlite3.Connection) -> None:
+    """Ensure the evaluation-session table and its index exist."""
+
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {TABLE_EVAL} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            id_innovacion INTEGER NOT NULL,
+            tipo TEXT NOT NULL,
+            fecha_eval TEXT NOT NULL,
+            puntaje_global REAL
+        );
+        """
+    )
+    conn.execute(
+        f"CREATE INDEX IF NOT EXISTS idx_{TABLE_EVAL}_proyecto ON {TABLE_EVAL}(id_innovacion, tipo);"
+    )
+
+
+def create_evaluation(
+    conn: sqlite3.Connection,
+    id_innovacion: int,
+    tipo: str,
+    fecha_eval: str,
+    puntaje_global: float | None = None,
+) -> int:
+    """Insert a session row and return its id (call inside the detail-row transaction)."""
+
+    cur = conn.execute(
+        f"INSERT INTO {TABLE_EVAL} (id_innovacion, tipo, fecha_eval, puntaje_global) VALUES (?, ?, ?, ?)",
+        (int(id_innovacion), tipo, fecha_eval, puntaje_global),
+    )
+    return int(cur.lastrowid)
+
+
+def migrate_detail_table(
+    conn: sqlite3.Connection,
+    table: str,
+    tipo: str,
+    create_sql: str,
+    detail_columns: list[str],
+    score_column: str | None = None,
+) -> bool:
+    """Move a legacy detail table (``id_innovacion`` + ``fecha_eval`` per row) to sessions.
+
+    Every distinct (project, timestamp) pair becomes an ``evaluaciones`` row, in
+    chronological order, and the detail rows keep their ids. Legacy rows without
+    a project are dropped: no reader can reach them. Returns ``True`` when the
+    table was migrated. Must run inside a transaction.
+    """
+
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table});")]
+    if not columns or "evaluacion_id" in columns:
+        return False
+
+    score_expr = f"MAX({score_column})" if score_column else "NULL"
+    conn.execute(
+        f"""
+        INSERT INTO {TABLE_EVAL} (id_innovacion, tipo, fecha_eval, puntaje_global)
+        SELECT id_innovacion, ?, COALESCE(fecha_eval, ''), {score_expr}
+        FROM {table}
+        WHERE id_innovacion IS NOT NULL
+        GROUP BY id_innovacion, COALESCE(fecha_eval, '')
+        ORDER BY COALESCE(fecha_eval, ''), MIN(id)
+        """,
+        (tipo,),
+    )
+    legacy = f"{table}_legacy"
+    conn.execute(f"ALTER TABLE {table} RENAME TO {legacy};")
+    conn.execute(create_sql)
+    cols = ", ".join(detail_columns)
+    legacy_cols = ", ".join(f"l.{col}" for col in detail_columns)
+    conn.execute(
+        f"""
+        INSERT INTO {table} (id, evaluacion_id, {cols})
+        SELECT l.id, e.id, {legacy_cols}
+        FROM {legacy} AS l
+        JOIN {TABLE_EVAL} AS e
+          ON e.tipo = ?
+         AND e.id_innovacion = l.id_innovacion
+         AND e.fecha_eval = COALESCE(l.fecha_eval, '')
+        """,
+        (tipo,),
+    )
+    conn.execute(f"DROP TABLE {legacy};")
+    return True
+
+
+__all__ = [
+    "TIPO_IRL",
+    "TIPO_EBCT",
+    "init_db_eval",
+    "create_evaluation",
+    "migrate_detail_table",
+]
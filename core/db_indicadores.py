@@ -0,0 +1,189 @@
+"""SQLite storage of the consolidated project bundle shown in Indicadores (page 06).
+
+Each sheet of the imported workbook, plus the recomputed indicators, goes to
+its own ``ind_*`` table with an index on ``ID_Proyecto``. The table schema
+follows the sheet columns, so the tables are rebuilt on every import.
+``ind_carga`` keeps the content hash and import time of the bundle, and
+``ind_columnas`` the datetime, bool and float columns so they are read back
+with their dtype (an all-empty float column would otherwise come back as object).
+
+``load_bundle`` reads the tables once per import into frames shared by every
+session of the process. The data survives restarts without re-parsing Excel,
+and memory no longer grows with the number of open sessions.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+import sqlite3
+
+import pandas as pd
+import pytz
+import streamlit as st
+
+from . import cache, utils
+from .config import TABLE_IND, TZ_NAME
+from .db_pool import database_path, get_connection, transaction
+
+# Clave del bundle (como en st.session_state.proyectos_db) -> tabla SQLite
+BUNDLE_TABLES: dict[str, str] = {
+    "indice": "ind_indice",
+    "irl": "ind_irl",
+    "ebct": "ind_ebct",
+    "acciones": "ind_acciones",
+    "indicadores": "ind_indicadores",
+    "preguntas_irl": "ind_preguntas_irl",
+    "indicadores_calculados": "ind_indicadores_calculados",
+}
+ID_COL = "ID_Proyecto"
+_COLUMNS_TABLE = "ind_columnas"
+
+_INITIALIZED: set[str] = set()
+
+
+def _get_conn() -> sqlite3.Connection:
+    return get_connection()
+
+
+def _init(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {TABLE_IND} (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            digest TEXT,
+            cargado_en TEXT NOT NULL
+        );
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {_COLUMNS_TABLE} (
+            tabla TEXT NOT NULL,
+            columna TEXT NOT NULL,
+            tipo TEXT NOT NULL,
+            PRIMARY KEY (tabla, columna)
+        );
+        """
+    )
+
+
+def init_db_indicadores() -> None:
+    """Ensure the bundle metadata tables exist."""
+
+    if database_path() in _INITIALIZED:
+        return
+    with transaction() as conn:
+        _init(conn)
+    _INITIALIZED.add(database_path())
+
+
+def _write_frame(conn: sqlite3.Connection, table: str, frame: pd.DataFrame) -> list[tuple]:
+    frame = frame.rename(columns=str)
+    conn.execute(pd.io.sql.get_schema(frame, table))
+    if len(frame.columns):
+        cols = ", ".join(f'"{col}"' for col in frame.columns)
+        marks = ", ".join("?" * len(frame.columns))
+        conn.executemany(f'INSERT INTO "{table}" ({cols}) VALUES ({marks})', utils.to_sql_rows(frame))
+    if ID_COL in frame.columns:
+        conn.execute(f'CREATE INDEX "idx_{table}_proyecto" ON "{table}"("{ID_COL}");')
+    typed = []
+    for col in frame.columns:
+        if pd.api.types.is_datetime64_any_dtype(frame[col]):
+            typed.append((table, col, "datetime"))
+        elif pd.api.types.is_bool_dtype(frame[col]):
+            typed.append((table, col, "bool"))
+        elif pd.api.types.is_float_dtype(frame[col]):
+            typed.append((table, col, "float"))
+    return typed
+
+
+def import_bundle(datos: dict, digest: str | None = None) -> None:
+    """Replace the stored bundle with the frames of ``datos`` in one transaction."""
+
+    cargado_en = datetime.now(pytz.timezone(TZ_NAME)).strftime("%Y-%m-%d %H:%M:%S")
+    with transaction() as conn:
+        _init(conn)
+        typed: list[tuple] = []
+        for key, table in BUNDLE_TABLES.items():
+            conn.execute(f'DROP TABLE IF EXISTS "{table}";')
+            frame = datos.get(key)
+            if isinstance(frame, pd.DataFrame):
+                typed.extend(_write_frame(conn, table, frame))
+        conn.execute(f"DELETE FROM {_COLUMNS_TABLE};")
+        conn.executemany(f"INSERT INTO {_COLUMNS_TABLE} (tabla, columna, tipo) VALUES (?, ?, ?)", typed)
+        conn.execute(
+            f"INSERT OR REPLACE INTO {TABLE_IND} (id, digest, cargado_en) VALUES (1, ?, ?)",
+            (digest, cargado_en),
+        )
+    cache.invalidate(TABLE_IND)
+
+
+def bundle_digest() -> str | None:
+    """Content hash of the stored bundle, or ``None`` when nothing was imported."""
+
+    init_db_indicadores()
+    row = _get_conn().execute(f"SELECT digest FROM {TABLE_IND} WHERE id = 1").fetchone()
+    return row[0] if row else None
+
+
+def load_bundle() -> dict | None:
+    """Return the stored bundle as a dict of frames (``None`` when empty).
+
+    The frames are shared by every caller: treat them as read-only. The dict
+    itself is a fresh copy, so callers may add keys to it.
+    """
+
+    init_db_indicadores()
+    bundle = _load_bundle(cache.data_version(TABLE_IND))
+    return dict(bundle) if bundle is not None else None
+
+
+@st.cache_resource(ttl=300, max_entries=2)
+def _load_bundle(version: tuple[int, int]) -> dict | None:
+    conn = _get_conn()
+    meta = conn.execute(f"SELECT cargado_en FROM {TABLE_IND} WHERE id = 1").fetchone()
+    if meta is None:
+        return None
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    typed: dict[str, dict[str, str]] = {}
+    for tabla, columna, tipo in conn.execute(f"SELECT tabla, columna, tipo FROM {_COLUMNS_TABLE}"):
+        typed.setdefault(tabla, {})[columna] = tipo
+
+    bundle: dict = {"preguntas_irl": None}
+    for key, table in BUNDLE_TABLES.items():
+        if table not in existing:
+            continue
+        tipos = typed.get(table, {})
+        frame = pd.read_sql_query(
+            f'SELECT * FROM "{table}"',
+            conn,
+            parse_dates=[col for col, tipo in tipos.items() if tipo == "datetime"],
+        )
+        for col, tipo in tipos.items():
+            if tipo in ("bool", "float"):
+                frame[col] = frame[col].astype(tipo)
+        bundle[key] = frame
+    bundle["timestamp"] = datetime.strptime(meta[0], "%Y-%m-%d %H:%M:%S")
+    return bundle
+
+
+def clear_bundle() -> None:
+    """Delete the stored bundle."""
+
+    with transaction() as conn:
+        _init(conn)
+        for table in BUNDLE_TABLES.values():
+            conn.execute(f'DROP TABLE IF EXISTS "{table}";')
+        conn.execute(f"DELETE FROM {_COLUMNS_TABLE};")
+        conn.execute(f"DELETE FROM {TABLE_IND};")
+    cache.invalidate(TABLE_IND)
+
+
+__all__ = [
+    "BUNDLE_TABLES",
+    "init_db_indicadores",
+    "import_bundle",
+    "bundle_digest",
+    "load_bundle",
+    "clear_bundle",
+]
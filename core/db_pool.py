@@ -0,0 +1,105 @@
+"""Shared SQLite connection manager for the persistence modules.
+
+``db``, ``db_trl`` and ``db_ebct`` used to open a fresh connection on every
+call. Streamlit reruns each session on its own script thread, so connections
+are pooled per thread (and per database path) and reused across calls. Every
+connection is opened in WAL mode with tuned pragmas, which lets readers keep
+going while a writer commits.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+import os
+import sqlite3
+import threading
+from typing import Iterator
+
+from .config import DB_PATH
+
+# Pragmas applied to every pooled connection.
+PRAGMAS: dict[str, object] = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -32000,  # KiB (≈32 MB de page cache)
+    "mmap_size": 268_435_456,  # 256 MB
+    "temp_store": "MEMORY",
+    "foreign_keys": "ON",
+}
+BUSY_TIMEOUT_S = 30.0
+
+_lock = threading.Lock()
+_pool: dict[tuple[int, str], sqlite3.Connection] = {}
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_S, check_same_thread=False)
+    for name, value in PRAGMAS.items():
+        conn.execute(f"PRAGMA {name}={value};")
+    return conn
+
+
+def _prune_dead_threads() -> None:
+    """Close connections whose owning thread has finished (caller holds the lock)."""
+
+    alive = {thread.ident for thread in threading.enumerate()}
+    for key in [key for key in _pool if key[0] not in alive]:
+        _pool.pop(key).close()
+
+
+def database_path(path: str | None = None) -> str:
+    """Absolute path of the database used when ``path`` is omitted."""
+
+    return os.path.abspath(path or DB_PATH)
+
+
+def get_connection(path: str | None = None) -> sqlite3.Connection:
+    """Return the pooled connection for the current thread, opening it if needed."""
+
+    db_path = database_path(path)
+    key = (threading.get_ident(), db_path)
+    conn = _pool.get(key)
+    if conn is not None:
+        return conn
+    conn = _connect(db_path)
+    with _lock:
+        _prune_dead_threads()
+        _pool[key] = conn
+    return conn
+
+
+@contextmanager
+def transaction(path: str | None = None, *, immediate: bool = True) -> Iterator[sqlite3.Connection]:
+    """Run a block inside a single transaction on the pooled connection.
+
+    ``BEGIN IMMEDIATE`` takes the write lock up front so concurrent writers wait
+    on ``busy_timeout`` instead of failing halfway. Nested calls join the outer
+    transaction.
+    """
+
+    conn = get_connection(path)
+    if conn.in_transaction:
+        yield conn
+        return
+    conn.execute("BEGIN IMMEDIATE;" if immediate else "BEGIN;")
+    try:
+        yield conn
+    except BaseException:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    else:
+        if conn.in_transaction:
+            conn.commit()
+
+
+def close_all() -> None:
+    """Close every pooled connection (tests, shutdown or DB file swaps)."""
+
+    with _lock:
+        while _pool:
+            _, conn = _pool.popitem()
+            conn.close()
+
+
+__all__ = ["PRAGMAS", "database_path", "get_connection", "transaction", "close_all"]
@@ -1,66 +1,158 @@
+import json
 import sqlite3
+from collections.abc import Mapping
 import pandas as pd
 import streamlit as st
 from datetime import datetime
 import pytz
-from .config import DB_PATH, TABLE_TRL, TZ_NAME
+from . import cache
+from .config import TABLE_EVAL, TABLE_TRL, TZ_NAME
+from .db_eval import TIPO_IRL, create_evaluation, init_db_eval, migrate_detail_table
+from .db_pool import database_path, get_connection, transaction
 
-def get_conn():
-    return sqlite3.connect(DB_PATH, check_same_thread=False)
+_CREATE_SQL = f"""
+CREATE TABLE IF NOT EXISTS {TABLE_TRL}(
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    evaluacion_id INTEGER NOT NULL REFERENCES {TABLE_EVAL}(id) ON DELETE CASCADE,
+    dimension TEXT,
+    nivel INTEGER,
+    evidencia TEXT
+);
+"""
+
+# Databases already initialised by this process (init runs on every page rerun)
+_INITIALIZED: set[str] = set()
+
+def get_conn() -> sqlite3.Connection:
+    return get_connection()
 
 def init_db_trl():
-    with get_conn() as conn:
-        conn.execute(f"""
-        CREATE TABLE IF NOT EXISTS {TABLE_TRL}(
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            id_innovacion INTEGER,
-            fecha_eval TEXT,
-            dimension TEXT,
-            nivel INTEGER,
-            evidencia TEXT,
-            trl_global REAL
-        );
-        """)
-        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{TABLE_TRL}_idinv ON {TABLE_TRL}(id_innovacion);")
-        conn.commit()
+    if database_path() in _INITIALIZED:
+        return
+    with transaction() as conn:
+        init_db_eval(conn)
+        # Legacy files stored id_innovacion/fecha_eval/trl_global on every row
+        if migrate_detail_table(conn, TABLE_TRL, TIPO_IRL, _CREATE_SQL,
+                                ["dimension", "nivel", "evidencia"], score_column="trl_global"):
+            cache.invalidate(TABLE_TRL)
+        conn.execute(_CREATE_SQL)
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{TABLE_TRL}_eval ON {TABLE_TRL}(evaluacion_id);")
+    _INITIALIZED.add(database_path())
+
+def _detail_rows(df_dim: pd.DataFrame | list[dict]) -> list[tuple]:
+    records = df_dim.to_dict("records") if isinstance(df_dim, pd.DataFrame) else list(df_dim)
+    if not records:
+        return [(None, None, "")]
+    return [
+        (
+            str(r.get("dimension")),
+            int(r.get("nivel")) if pd.notna(r.get("nivel")) else None,
+            str(r.get("evidencia")) if r.get("evidencia") is not None else "",
+        )
+        for r in records
+    ]
+
+def _insert_evaluation(conn: sqlite3.Connection, id_innovacion: int, now_str: str,
+                       rows: list[tuple], trl_global: float | None) -> None:
+    eval_id = create_evaluation(conn, id_innovacion, TIPO_IRL, now_str, trl_global)
+    conn.executemany(
+        f"INSERT INTO {TABLE_TRL} (evaluacion_id, dimension, nivel, evidencia) VALUES (?, ?, ?, ?)",
+        [(eval_id, *row) for row in rows],
+    )
 
 def save_trl_result(id_innovacion: int, df_dim: pd.DataFrame, trl_global: float | None):
     tz = pytz.timezone(TZ_NAME)
     now_str = datetime.now(tz).strftime("%Y-%m-%d %H:%M:%S")
-    rows = []
-    if df_dim.empty:
-        rows.append({
-            "id_innovacion": id_innovacion,
-            "fecha_eval": now_str,
-            "dimension": None,
-            "nivel": None,
-            "evidencia": "",
-            "trl_global": trl_global,
-        })
-    else:
-        for _, r in df_dim.iterrows():
-            rows.append({
-                "id_innovacion": id_innovacion,
-                "fecha_eval": now_str,
-                "dimension": str(r.get("dimension")),
-                "nivel": int(r.get("nivel")) if pd.notna(r.get("nivel")) else None,
-                "evidencia": str(r.get("evidencia")) if r.get("evidencia") is not None else "",
-                "trl_global": trl_global,
-            })
-    df_save = pd.DataFrame(rows)
-    with get_conn() as conn:
-        df_save.to_sql(TABLE_TRL, conn, if_exists="append", index=False)
-    # Clear cache for history reads so subsequent get_trl_history returns fresh data
-    try:
-        st.cache_data.clear()
-    except Exception:
-        pass
-
-@st.cache_data(ttl=300)
+    rows = _detail_rows(df_dim)
+    with transaction() as conn:
+        _insert_evaluation(conn, id_innovacion, now_str, rows, trl_global)
+    # Only this project's cached history is stale now
+    cache.invalidate(TABLE_TRL, id_innovacion)
+
+def save_trl_results(evaluations: Mapping[int, tuple[pd.DataFrame | list[dict], float | None]]) -> str:
+    """Persist one IRL evaluation per project in a single transaction.
+
+    ``evaluations`` maps ``id_innovacion`` to the ``(df_dim, trl_global)`` pair
+    ``save_trl_result`` takes. Every evaluation gets the same timestamp, which
+    is returned; if any insert fails, none is stored.
+    """
+    tz = pytz.timezone(TZ_NAME)
+    now_str = datetime.now(tz).strftime("%Y-%m-%d %H:%M:%S")
+    batch = {
+        int(id_innovacion): (_detail_rows(df_dim), trl_global)
+        for id_innovacion, (df_dim, trl_global) in evaluations.items()
+    }
+    if not batch:
+        return now_str
+    with transaction() as conn:
+        for id_innovacion, (rows, trl_global) in batch.items():
+            _insert_evaluation(conn, id_innovacion, now_str, rows, trl_global)
+    cache.invalidate_many(TABLE_TRL, batch)
+    return now_str
+
+# Detail rows joined with their session; same columns as the legacy table
+# plus evaluacion_id, and eval_rank (1 = latest evaluation of the project)
+_HISTORY_SQL = f"""
+    SELECT t.id, e.id_innovacion, e.fecha_eval, t.dimension, t.nivel, t.evidencia,
+           e.puntaje_global AS trl_global, t.evaluacion_id,
+           DENSE_RANK() OVER (PARTITION BY e.id_innovacion ORDER BY e.id DESC) AS eval_rank
+    FROM {TABLE_TRL} AS t
+    JOIN {TABLE_EVAL} AS e ON e.id = t.evaluacion_id
+    WHERE e.tipo = '{TIPO_IRL}' {{where}}
+    ORDER BY e.id_innovacion, e.id DESC, t.id DESC
+"""
+_IDS_FILTER = "AND e.id_innovacion IN (SELECT value FROM json_each(?))"
+
 def get_trl_history(id_innovacion: int) -> pd.DataFrame:
-    """Return TRL history for a project; cached for short period to avoid repeated DB hits."""
+    """Return TRL history for a project; cached until the project gets a new evaluation."""
+    return _get_trl_history(id_innovacion, cache.data_version(TABLE_TRL, id_innovacion))
+
+@st.cache_data(ttl=300, max_entries=512)
+def _get_trl_history(id_innovacion: int, version: tuple[int, int]) -> pd.DataFrame:
+    with get_conn() as conn:
+        df = pd.read_sql_query(
+            _HISTORY_SQL.format(where="AND e.id_innovacion = ?"), conn, params=(id_innovacion,)
+        )
+    return df.drop(columns="eval_rank")
+
+def get_trl_histories(ids) -> pd.DataFrame:
+    """Return the TRL history of several projects with a single query.
+
+    Rows are ordered by project and then as get_trl_history (latest first);
+    ``eval_rank`` numbers each project's evaluations from 1 (latest).
+    """
+    unique_ids = tuple(sorted({int(i) for i in ids}))
+    if not unique_ids:
+        return _empty_ranked()
+    return _get_trl_histories(unique_ids, cache.data_version(TABLE_TRL))
+
+@st.cache_data(ttl=300, max_entries=64)
+def _get_trl_histories(ids: tuple[int, ...], version: tuple[int, int]) -> pd.DataFrame:
     with get_conn() as conn:
         return pd.read_sql_query(
-            f"SELECT * FROM {TABLE_TRL} WHERE id_innovacion=? ORDER BY fecha_eval DESC, id DESC",
-            conn, params=(id_innovacion,)
+            _HISTORY_SQL.format(where=_IDS_FILTER), conn, params=(json.dumps(list(ids)),)
         )
+
+def get_latest_trl_per_project(ids=None) -> pd.DataFrame:
+    """Return only the latest TRL evaluation rows of each project (all projects by default)."""
+    unique_ids = None if ids is None else tuple(sorted({int(i) for i in ids}))
+    if unique_ids == ():
+        return _empty_ranked()
+    return _get_latest_trl_per_project(unique_ids, cache.data_version(TABLE_TRL))
+
+@st.cache_data(ttl=300, max_entries=64)
+def _get_latest_trl_per_project(ids: tuple[int, ...] | None, version: tuple[int, int]) -> pd.DataFrame:
+    # Latest session per project is the indexed MAX(id)
+    latest = f"SELECT MAX(id) FROM {TABLE_EVAL} WHERE tipo = '{TIPO_IRL}'"
+    params: tuple = ()
+    if ids is not None:
+        latest += " AND id_innovacion IN (SELECT value FROM json_each(?))"
+        params = (json.dumps(list(ids)),)
+    where = f"AND e.id IN ({latest} GROUP BY id_innovacion)"
+    with get_conn() as conn:
+        return pd.read_sql_query(_HISTORY_SQL.format(where=where), conn, params=params)
+
+def _empty_ranked() -> pd.DataFrame:
+    columns = ["id", "id_innovacion", "fecha_eval", "dimension", "nivel", "evidencia", "trl_global",
+               "evaluacion_id", "eval_rank"]
+    return pd.DataFrame(columns=columns)
@@ -0,0 +1,169 @@
+"""Vectorized importer for the offline EBCT evaluation workbook ("Evaluación EBCT" sheet).
+
+Answer labels are mapped in bulk with the same precedence as the former
+per-row loop: any "No"/🔴 first, then "En"/"desarrollo"/🟡, then
+"Sí"/"cumple"/🟢, and anything else counts as "No cumple". Characteristic
+ids are validated with a merge against ``EBCT_CHARACTERISTICS_BY_ID``.
+
+A workbook may hold many projects when the sheet has a project column
+(rule shared with IRL in ``core.batch_import``).
+``load_ebct_responses_by_project`` groups the answers per project, and
+``evaluation_rows`` turns them into the rows ``db_ebct`` persists.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+from .batch_import import project_column, project_ids
+from .ebct import EBCT_CHARACTERISTICS, EBCT_CHARACTERISTICS_BY_ID
+
+SHEET_NAME = "Evaluación EBCT"
+
+OPTION_NO = "🔴 No cumple"
+OPTION_PARTIAL = "🟡 En desarrollo"
+OPTION_YES = "🟢 Sí cumple"
+OPTION_SCORES = {OPTION_NO: 0.0, OPTION_PARTIAL: 0.5, OPTION_YES: 1.0}
+
+REQUIRED_COLUMNS = ("ID", "Respuesta")
+ROW_COLUMNS = ["proyecto", "fila", "caracteristica_id", "respuesta"]
+
+
+def normalize_options(raw: pd.Series) -> pd.Series:
+    """Map free-text answers to the three EBCT options."""
+
+    text = raw.astype(str).str.strip()
+    conditions = [
+        text.str.contains("No", regex=False) | text.str.contains("🔴", regex=False),
+        text.str.contains("desarrollo", regex=False)
+        | text.str.contains("En", regex=False)
+        | text.str.contains("🟡", regex=False),
+        text.str.contains("cumple", regex=False)
+        | text.str.contains("Sí", regex=False)
+        | text.str.contains("🟢", regex=False),
+    ]
+    return pd.Series(
+        np.select(conditions, [OPTION_NO, OPTION_PARTIAL, OPTION_YES], default=OPTION_NO),
+        index=raw.index,
+        dtype=object,
+    )
+
+
+def parse_ebct_sheet(df: pd.DataFrame) -> tuple[pd.DataFrame, dict]:
+    """Validate the sheet and return ``(rows, stats)``.
+
+    ``rows`` has ``ROW_COLUMNS``, one known characteristic per row
+    (``proyecto`` is ``None`` without a project column). Raises ``ValueError``
+    when ``ID`` or ``Respuesta`` is missing.
+    """
+
+    if not all(col in df.columns for col in REQUIRED_COLUMNS):
+        raise ValueError(f"El Excel debe contener las columnas: {', '.join(REQUIRED_COLUMNS)}")
+
+    fila = pd.Series(df.index, index=df.index) + 2
+    ids = pd.to_numeric(df["ID"], errors="coerce")
+    enteros = ids.notna() & (ids % 1 == 0)
+    catalogo = pd.DataFrame({"caracteristica_id": list(EBCT_CHARACTERISTICS_BY_ID), "_en_catalogo": True})
+    unidas = pd.DataFrame({"caracteristica_id": ids.where(enteros).astype("Int64")}).merge(
+        catalogo.astype({"caracteristica_id": "Int64"}), on="caracteristica_id", how="left"
+    )
+    conocidas = pd.Series(unidas["_en_catalogo"].notna().to_numpy(), index=df.index)
+
+    col_proyecto = project_column(df.columns)
+    if col_proyecto is not None:
+        proyecto = project_ids(df[col_proyecto])
+        sin_proyecto = proyecto.isna()
+    else:
+        proyecto = pd.Series(None, index=df.index, dtype=object)
+        sin_proyecto = pd.Series(False, index=df.index)
+    validas = conocidas & ~sin_proyecto
+
+    errores = [
+        {"fila": int(f), "motivo": f"ID de característica no válido: {raw!r}"}
+        for f, raw in zip(fila[~conocidas], df.loc[~conocidas, "ID"])
+    ]
+    errores.extend(
+        {"fila": int(f), "motivo": "Fila sin proyecto"}
+        for f in fila[conocidas & sin_proyecto]
+    )
+    errores.sort(key=lambda error: error["fila"])
+
+    rows = pd.DataFrame(
+        {
+            "proyecto": proyecto[validas],
+            "fila": fila[validas],
+            "caracteristica_id": ids[validas].astype(int),
+            "respuesta": normalize_options(df.loc[validas, "Respuesta"]),
+        },
+        columns=ROW_COLUMNS,
+    ).reset_index(drop=True)
+    stats = {
+        "total": len(df),
+        "validas": len(rows),
+        "invalidas": len(df) - len(rows),
+        "proyectos": int(rows["proyecto"].nunique()),
+        "errores": errores,
+    }
+    return rows, stats
+
+
+def _responses(rows: pd.DataFrame) -> dict[int, str]:
+    return dict(zip(rows["caracteristica_id"].tolist(), rows["respuesta"].tolist()))
+
+
+def load_ebct_responses(df: pd.DataFrame) -> tuple[dict[int, str], dict]:
+    """``{characteristic id: option}`` of a single-project sheet and the load statistics.
+
+    Raises ``ValueError`` when the sheet holds more than one project.
+    """
+
+    rows, stats = parse_ebct_sheet(df)
+    if stats["proyectos"] > 1:
+        raise ValueError(
+            f"La hoja contiene {stats['proyectos']} proyectos; use la carga masiva de evaluaciones."
+        )
+    return _responses(rows), stats
+
+
+def load_ebct_responses_by_project(df: pd.DataFrame) -> tuple[dict[str, dict[int, str]], dict]:
+    """Responses per project of a multi-project sheet and the load statistics."""
+
+    rows, stats = parse_ebct_sheet(df)
+    responses = {
+        proyecto: _responses(grupo)
+        for proyecto, grupo in rows.groupby("proyecto", sort=False)
+    }
+    return responses, stats
+
+
+def evaluation_rows(responses: Mapping[int, str]) -> list[dict[str, object]]:
+    """Rows for ``db_ebct`` covering every characteristic (unanswered ones count as "No cumple")."""
+
+    return [
+        {
+            "id": item["id"],
+            "name": item["name"],
+            "phase_id": item["phase_id"],
+            "phase_name": item["phase_name"],
+            "weight": item["weight"],
+            "value": OPTION_SCORES.get(responses.get(item["id"], OPTION_NO), 0.0),
+        }
+        for item in EBCT_CHARACTERISTICS
+    ]
+
+
+__all__ = [
+    "SHEET_NAME",
+    "OPTION_NO",
+    "OPTION_PARTIAL",
+    "OPTION_YES",
+    "OPTION_SCORES",
+    "normalize_options",
+    "parse_ebct_sheet",
+    "load_ebct_responses",
+    "load_ebct_responses_by_project",
+    "evaluation_rows",
+]
@@ -0,0 +1,192 @@
+"""On-demand Excel exports built in a background thread and cached by content hash.
+
+Results pages (Fase 0 evaluation, Fase 2 detail table, Diagnóstico plan) used
+to serialize their workbook on every render just to hand bytes to
+``st.download_button``. Now a page calls ``download_button`` with a builder
+and the content key of the data the workbook comes from
+(``content_key(name, *frames, params=...)``):
+
+* Until the user asks for the file, only a "prepare" button is shown and no
+  workbook is built.
+* On click the builder is submitted to the export pool and the script goes
+  on. A small fragment shows "Generando…" and polls every ``POLL_S`` seconds;
+  once the bytes are ready it reruns the page, which then shows the download
+  button. A failed build is shown as an error next to the prepare button.
+* The bytes are kept by content key, so later reruns, and other sessions
+  exporting the same data, get the download button directly.
+
+The pool has ``WORKERS`` threads, so one session's large export does not
+queue the exports of every other session.
+
+Entries are evicted least-recently-used once the entry count or total size
+exceeds its cap.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future, ThreadPoolExecutor
+import hashlib
+import threading
+
+import pandas as pd
+import streamlit as st
+
+from .figure_cache import fingerprint
+
+MAX_ENTRIES = 32
+MAX_BYTES = 128 * 1024 * 1024
+WORKERS = 4
+POLL_S = 1.0
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def content_key(name: str, *frames: pd.DataFrame | None, params: Hashable = None) -> str:
+    """Key of export ``name`` for the content of ``frames`` and ``params``."""
+
+    digest = hashlib.sha256(f"{name}|{params!r}|".encode("utf-8"))
+    digest.update(fingerprint(*frames).encode("ascii"))
+    return digest.hexdigest()
+
+
+class ExportService:
+    """Runs export builders in a worker thread and keeps their bytes in an LRU store."""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES, workers: int = WORKERS) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="export")
+        self._results: OrderedDict[str, bytes] = OrderedDict()
+        self._pending: dict[str, Future] = {}
+        self._errors: dict[str, str] = {}
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def get(self, key: str) -> bytes | None:
+        """Bytes of a finished export, or ``None``."""
+
+        with self._lock:
+            data = self._results.get(key)
+            if data is not None:
+                self._results.move_to_end(key)
+            return data
+
+    def pending(self, key: str) -> bool:
+        with self._lock:
+            return key in self._pending
+
+    def error(self, key: str) -> str | None:
+        """Message of the last failed build of ``key`` (cleared by the next ``submit``)."""
+
+        with self._lock:
+            return self._errors.get(key)
+
+    def submit(self, key: str, builder: Callable[[], bytes]) -> Future:
+        """Start ``builder`` unless the export is cached or already running."""
+
+        with self._lock:
+            self._errors.pop(key, None)
+            future = self._pending.get(key)
+            if future is not None:
+                return future
+            data = self._results.get(key)
+            if data is not None:
+                future = Future()
+                future.set_result(data)
+                return future
+            future = self._executor.submit(self._run, key, builder)
+            self._pending[key] = future
+            return future
+
+    def _run(self, key: str, builder: Callable[[], bytes]) -> bytes:
+        try:
+            data = builder()
+            if isinstance(data, (bytearray, memoryview)):
+                data = bytes(data)
+            self._store(key, data)
+            return data
+        except Exception as error:
+            with self._lock:
+                self._errors[key] = str(error) or type(error).__name__
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def _store(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._results.pop(key, None)
+            if previous is not None:
+                self._nbytes -= len(previous)
+            self._results[key] = data
+            self._nbytes += len(data)
+            while len(self._results) > self.max_entries or self._nbytes > self.max_bytes:
+                _, evicted = self._results.popitem(last=False)
+                self._nbytes -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+            self._errors.clear()
+            self._nbytes = 0
+
+
+_default = ExportService()
+
+
+@st.fragment(run_every=POLL_S)
+def _wait_for_export(export_key: str) -> None:
+    # Solo este fragmento se vuelve a ejecutar mientras el archivo se genera
+    if _default.get(export_key) is not None or not _default.pending(export_key):
+        st.rerun()
+    st.info("⏳ Generando archivo...")
+
+
+def download_button(
+    label: str,
+    *,
+    key: str,
+    export_key: str,
+    builder: Callable[[], bytes],
+    file_name: str,
+    mime: str = XLSX_MIME,
+    prepare_label: str = "⚙️ Preparar Excel",
+    **button_kwargs,
+) -> None:
+    """Download button whose bytes are built in the export pool only after the user asks.
+
+    ``button_kwargs`` (``help``, ``use_container_width``...) go to both buttons.
+    """
+
+    requested_key = f"{key}__solicitado"
+    data = _default.get(export_key)
+    if data is not None:
+        st.session_state.pop(requested_key, None)
+        st.download_button(label, data=data, file_name=file_name, mime=mime, key=key, **button_kwargs)
+        return
+    if _default.pending(export_key):
+        _wait_for_export(export_key)
+        return
+    if st.session_state.pop(requested_key, None) == export_key:
+        error = _default.error(export_key)
+        if error:
+            st.error(f"No se pudo generar el archivo: {error}")
+    if st.button(prepare_label, key=f"{key}__preparar", **button_kwargs):
+        _default.submit(export_key, builder)
+        st.session_state[requested_key] = export_key
+        st.rerun()
+
+
+def clear() -> None:
+    """Drop every cached export of the default service."""
+
+    _default.clear()
+
+
+__all__ = ["MAX_ENTRIES", "MAX_BYTES", "WORKERS", "POLL_S", "XLSX_MIME", "ExportService", "content_key", "download_button", "clear"]
@@ -0,0 +1,115 @@
+"""LRU cache of Plotly figure specs for the Indicadores dashboards (page 06).
+
+Every figure is stored as its JSON spec (``fig.to_json()``) under a key made of
+the chart name, a fingerprint of the frames it is drawn from and its
+parameters (selected projects, etc.). A hit rebuilds the figure from the spec,
+skipping the merges, ``apply`` calls and trace construction of the builder.
+Entries are evicted least-recently-used once the entry count or the total size
+of the stored specs exceeds its cap.
+
+The default cache is process-wide: equal data gives equal figures, so sessions
+can share entries.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+import hashlib
+import json
+import threading
+
+import pandas as pd
+import plotly.graph_objects as go
+
+MAX_ENTRIES = 256
+MAX_BYTES = 64 * 1024 * 1024  # tamaño total de los specs JSON
+
+
+def fingerprint(*frames: pd.DataFrame | None) -> str:
+    """Stable hash of the content, columns and dtypes of ``frames``."""
+
+    digest = hashlib.sha256()
+    for frame in frames:
+        if frame is None:
+            digest.update(b"<none>")
+            continue
+        digest.update(repr((list(frame.columns), [str(t) for t in frame.dtypes])).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class FigureCache:
+    """Thread-safe LRU store of serialized figures bounded by count and bytes."""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._specs: OrderedDict[Hashable, str] = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    def get(self, key: Hashable) -> go.Figure | None:
+        with self._lock:
+            spec = self._specs.get(key)
+            if spec is None:
+                return None
+            self._specs.move_to_end(key)
+        return go.Figure(json.loads(spec))
+
+    def put(self, key: Hashable, fig: go.Figure) -> None:
+        spec = fig.to_json()
+        size = len(spec)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._specs.pop(key, None)
+            if previous is not None:
+                self._nbytes -= len(previous)
+            self._specs[key] = spec
+            self._nbytes += size
+            while len(self._specs) > self.max_entries or self._nbytes > self.max_bytes:
+                _, evicted = self._specs.popitem(last=False)
+                self._nbytes -= len(evicted)
+
+    def get_or_build(self, key: Hashable, builder: Callable[[], go.Figure]) -> go.Figure:
+        fig = self.get(key)
+        if fig is None:
+            fig = builder()
+            self.put(key, fig)
+        return fig
+
+    def clear(self) -> None:
+        with self._lock:
+            self._specs.clear()
+            self._nbytes = 0
+
+
+_default = FigureCache()
+
+
+def cached_figure(
+    name: str,
+    huella: str,
+    params: Hashable,
+    builder: Callable[[], go.Figure],
+) -> go.Figure:
+    """Return the figure ``name`` for dataset ``huella`` and ``params``, building it on a miss."""
+
+    return _default.get_or_build((name, huella, params), builder)
+
+
+def clear() -> None:
+    """Drop every cached figure of the default cache."""
+
+    _default.clear()
+
+
+__all__ = ["MAX_ENTRIES", "MAX_BYTES", "FigureCache", "fingerprint", "cached_figure", "clear"]
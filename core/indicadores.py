@@ -0,0 +1,203 @@
+"""Workbook loading and per-project indicators of the Indicadores y Seguimiento page (06).
+
+``cargar_libro_proyectos`` parses every sheet of the project workbook from one
+open of the file, checks the expected sheets and columns, and caches the parsed
+bundle by the SHA-256 of the upload, so reruns do not parse the file again.
+The same sheets may come as an Arrow bundle (``.zip``, see ``core.snapshots``),
+which is read without any Excel parsing.
+
+``calcular_indicadores`` computes the IRL average, EBCT colour shares, action
+progress and global maturity of every project with one groupby per sheet, then
+aligns the results to ``Índice_Proyectos`` by ``ID_Proyecto``. Projects with no
+rows in a sheet get 0, as the former per-project loop did.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+
+import pandas as pd
+import streamlit as st
+
+from . import snapshots
+
+ID_COL = "ID_Proyecto"
+
+# Hojas del libro de proyectos y columnas que la página 06 usa de cada una
+HOJAS_REQUERIDAS: dict[str, list[str]] = {
+    "Índice_Proyectos": [ID_COL, "Nombre_Proyecto"],
+    "Niveles_IRL": [ID_COL, "Nivel_Alcanzado"],
+    "Características_EBCT": [ID_COL],
+    "Plan_Acción": [ID_COL, "Avance_Porcentaje"],
+    "Indicadores_Desempeño": [ID_COL],
+}
+HOJA_PREGUNTAS_IRL = "Preguntas_IRL"
+
+# Estado_Color de la hoja Características_EBCT
+COLOR_ROJO = 1
+COLOR_AMARILLO = 2
+COLOR_VERDE = 3
+
+INDICADOR_COLUMNS = [
+    "ID_Proyecto",
+    "Nombre_Proyecto",
+    "Indicador_IRL_Promedio",
+    "Indicador_Cumplimiento_EBCT",
+    "Indicador_Avance_Acciones",
+    "Indicador_Caracteristicas_Verde",
+    "Indicador_Caracteristicas_Amarillo",
+    "Indicador_Caracteristicas_Rojo",
+    "Indicador_Madurez_Global",
+    "Total_Caracteristicas",
+    "Total_Acciones",
+]
+
+
+ESTADOS_DISPLAY = {
+    COLOR_ROJO: "🔴 Rojo",
+    COLOR_AMARILLO: "🟡 Amarillo",
+    COLOR_VERDE: "🟢 Verde",
+}
+
+
+def _validar_hojas(disponibles) -> list[str]:
+    faltantes = [hoja for hoja in HOJAS_REQUERIDAS if hoja not in disponibles]
+    if faltantes:
+        raise ValueError(f"Faltan hojas en el archivo: {', '.join(faltantes)}")
+    hojas = list(HOJAS_REQUERIDAS)
+    if HOJA_PREGUNTAS_IRL in disponibles:
+        hojas.append(HOJA_PREGUNTAS_IRL)
+    return hojas
+
+
+def leer_libro_proyectos(content: bytes, formato: str = "xlsx") -> dict[str, pd.DataFrame | None]:
+    """Parse the project workbook in one pass and return its frames by sheet name.
+
+    ``formato`` is ``"xlsx"`` or ``"zip"`` (Arrow bundle with the same sheets).
+    Raises ``ValueError`` naming the missing sheets or columns. The optional
+    ``Preguntas_IRL`` sheet is ``None`` when absent.
+    """
+
+    if formato == "zip":
+        bundle = snapshots.bundle_from_bytes(content)
+        frames: dict[str, pd.DataFrame | None] = {hoja: bundle[hoja] for hoja in _validar_hojas(bundle)}
+    else:
+        with pd.ExcelFile(io.BytesIO(content)) as libro:
+            frames = libro.parse(sheet_name=_validar_hojas(libro.sheet_names))
+
+    errores = [
+        f"{hoja}: {', '.join(col for col in columnas if col not in frames[hoja].columns)}"
+        for hoja, columnas in HOJAS_REQUERIDAS.items()
+        if any(col not in frames[hoja].columns for col in columnas)
+    ]
+    if errores:
+        raise ValueError(f"Faltan columnas en el archivo: {' | '.join(errores)}")
+
+    ebct = frames["Características_EBCT"]
+    if "Estado_Color" in ebct.columns:
+        # Códigos numéricos a etiquetas con emojis; Estado_Actual por compatibilidad
+        ebct["Estado_Display"] = ebct["Estado_Color"].map(ESTADOS_DISPLAY)
+        ebct["Estado_Actual"] = ebct["Estado_Display"]
+    frames.setdefault(HOJA_PREGUNTAS_IRL, None)
+    return frames
+
+
+def libro_digest(content: bytes) -> str:
+    """Content hash used as cache key for an uploaded workbook."""
+
+    return hashlib.sha256(content).hexdigest()
+
+
+def formato_archivo(nombre: str) -> str:
+    """``"zip"`` for Arrow bundles, ``"xlsx"`` otherwise."""
+
+    return "zip" if nombre.lower().endswith(".zip") else "xlsx"
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _cargar_libro(digest: str, formato: str, _content: bytes) -> dict[str, pd.DataFrame | None]:
+    return leer_libro_proyectos(_content, formato)
+
+
+def cargar_libro_proyectos(content: bytes, formato: str = "xlsx") -> dict[str, pd.DataFrame | None]:
+    """Cached ``leer_libro_proyectos``: the same bytes are parsed only once.
+
+    ``st.cache_data`` hands out a copy on every call, so callers may modify
+    the frames.
+    """
+
+    return _cargar_libro(libro_digest(content), formato, content)
+
+
+def _mean_by_project(df: pd.DataFrame, column: str, ids: pd.Series) -> tuple[pd.Series, pd.Series]:
+    """Mean of ``column`` and row count per project, aligned to ``ids`` (0 when absent)."""
+
+    stats = df.groupby(ID_COL)[column].agg(["mean", "size"])
+    size = ids.map(stats["size"]).fillna(0).astype(int)
+    mean = ids.map(stats["mean"]).where(size > 0, 0.0)
+    return mean, size
+
+
+def _color_shares(ebct: pd.DataFrame, ids: pd.Series) -> tuple[dict[int, pd.Series], pd.Series]:
+    """Percentage of EBCT rows per colour code and total rows, aligned to ``ids``."""
+
+    if "Estado_Color" not in ebct.columns:
+        total = ids.map(ebct.groupby(ID_COL).size()).fillna(0).astype(int)
+        zeros = pd.Series(0.0, index=ids.index)
+        return {code: zeros for code in (COLOR_ROJO, COLOR_AMARILLO, COLOR_VERDE)}, total
+
+    codes = (COLOR_ROJO, COLOR_AMARILLO, COLOR_VERDE)
+    flags = pd.DataFrame({code: ebct["Estado_Color"].eq(code) for code in codes})
+    flags[ID_COL] = ebct[ID_COL]
+    grouped = flags.groupby(ID_COL)
+    counts = grouped[list(codes)].sum()
+    total = ids.map(grouped.size()).fillna(0).astype(int)
+    shares = {}
+    for code in codes:
+        share = ids.map(counts[code]) / total * 100
+        shares[code] = share.where(total > 0, 0.0)
+    return shares, total
+
+
+def calcular_indicadores(datos: dict) -> pd.DataFrame:
+    """Build the ``indicadores_calculados`` frame for every project in ``datos['indice']``."""
+
+    indice = datos["indice"]
+    ids = indice[ID_COL]
+
+    irl_promedio, _ = _mean_by_project(datos["irl"], "Nivel_Alcanzado", ids)
+    shares, total_ebct = _color_shares(datos["ebct"], ids)
+    avance, total_acciones = _mean_by_project(datos["acciones"], "Avance_Porcentaje", ids)
+
+    cumplimiento = shares[COLOR_VERDE]
+    madurez = irl_promedio / 9 * 40 + cumplimiento * 0.6
+
+    resultado = pd.DataFrame(
+        {
+            "ID_Proyecto": ids,
+            "Nombre_Proyecto": indice["Nombre_Proyecto"],
+            "Indicador_IRL_Promedio": irl_promedio.round(2),
+            "Indicador_Cumplimiento_EBCT": cumplimiento.round(1),
+            "Indicador_Avance_Acciones": avance.round(1),
+            "Indicador_Caracteristicas_Verde": shares[COLOR_VERDE].round(1),
+            "Indicador_Caracteristicas_Amarillo": shares[COLOR_AMARILLO].round(1),
+            "Indicador_Caracteristicas_Rojo": shares[COLOR_ROJO].round(1),
+            "Indicador_Madurez_Global": madurez.round(1),
+            "Total_Caracteristicas": total_ebct,
+            "Total_Acciones": total_acciones,
+        },
+        columns=INDICADOR_COLUMNS,
+    )
+    return resultado.reset_index(drop=True)
+
+
+__all__ = [
+    "HOJAS_REQUERIDAS",
+    "INDICADOR_COLUMNS",
+    "leer_libro_proyectos",
+    "libro_digest",
+    "formato_archivo",
+    "cargar_libro_proyectos",
+    "calcular_indicadores",
+]
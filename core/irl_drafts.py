@@ -0,0 +1,287 @@
+"""Drafts of in-progress IRL evaluations, written behind the UI thread.
+
+An evaluation only reached the database when the user pressed "Finalizar
+evaluación", so a closed tab or an expired session lost every answer. Now the
+answers that change are written to ``irl_borradores``, one row per
+``(project, dimension, level, question)`` slot:
+
+* ``enqueue`` only records the changed slots and returns. Later changes to the
+  same slot replace the queued value.
+* A worker thread waits ``DEBOUNCE_S`` after the last change (at most
+  ``MAX_DELAY_S`` after the first), then upserts the queue in transactions of
+  ``BATCH_SIZE`` rows. A slot cleared back to empty deletes its row. Changes
+  whose write fails stay queued and are retried after the debounce.
+* ``load_draft`` reads a project's draft with one query on the primary key
+  and lays the changes still queued for it on top, so it never waits for the
+  worker. ``discard_draft`` drops the draft once the evaluation is saved.
+"""
+
+from __future__ import annotations
+
+import atexit
+from collections.abc import Mapping
+from datetime import datetime
+import threading
+import time
+
+import pytz
+
+from .config import TABLE_DRAFT, TZ_NAME
+from .db_pool import database_path, get_connection, transaction
+from .irl_store import Slot, key_suffix
+
+DEBOUNCE_S = 1.0
+MAX_DELAY_S = 5.0
+BATCH_SIZE = 64
+
+_CREATE_SQL = f"""
+CREATE TABLE IF NOT EXISTS {TABLE_DRAFT} (
+    id_innovacion INTEGER NOT NULL,
+    dimension TEXT NOT NULL,
+    nivel INTEGER NOT NULL,
+    pregunta INTEGER NOT NULL,
+    respuesta TEXT,
+    evidencia TEXT NOT NULL DEFAULT '',
+    actualizado TEXT NOT NULL,
+    PRIMARY KEY (id_innovacion, dimension, nivel, pregunta)
+) WITHOUT ROWID;
+"""
+
+_UPSERT_SQL = f"""
+INSERT INTO {TABLE_DRAFT} (id_innovacion, dimension, nivel, pregunta, respuesta, evidencia, actualizado)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (id_innovacion, dimension, nivel, pregunta) DO UPDATE SET
+    respuesta = excluded.respuesta,
+    evidencia = excluded.evidencia,
+    actualizado = excluded.actualizado;
+"""
+
+_DELETE_SQL = f"DELETE FROM {TABLE_DRAFT} WHERE id_innovacion = ? AND dimension = ? AND nivel = ? AND pregunta = ?;"
+
+Answer = tuple[str | None, str]
+
+# Databases whose draft table already exists in this process
+_INITIALIZED: set[str] = set()
+_init_lock = threading.Lock()
+
+
+def init_db_drafts(path: str | None = None) -> None:
+    db_path = database_path(path)
+    with _init_lock:
+        if db_path in _INITIALIZED:
+            return
+        with transaction(db_path) as conn:
+            conn.execute(_CREATE_SQL)
+        _INITIALIZED.add(db_path)
+
+
+def _now() -> str:
+    return datetime.now(pytz.timezone(TZ_NAME)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def write_draft(project_id: int, changes: Mapping[Slot, Answer], path: str | None = None) -> None:
+    """Store ``changes`` of one project synchronously, in transactions of ``BATCH_SIZE`` rows."""
+
+    init_db_drafts(path)
+    now_str = _now()
+    items = list(changes.items())
+    for start in range(0, len(items), BATCH_SIZE):
+        upserts, deletes = [], []
+        for (dimension, level_id, question), (respuesta, evidencia) in items[start:start + BATCH_SIZE]:
+            key = (int(project_id), dimension, int(level_id), int(question))
+            if respuesta is None and not evidencia:
+                deletes.append(key)
+            else:
+                upserts.append((*key, respuesta, evidencia or "", now_str))
+        with transaction(path) as conn:
+            if upserts:
+                conn.executemany(_UPSERT_SQL, upserts)
+            if deletes:
+                conn.executemany(_DELETE_SQL, deletes)
+
+
+class DraftWriter:
+    """Coalescing write-behind queue drained by one daemon thread."""
+
+    def __init__(self, debounce_s: float = DEBOUNCE_S, max_delay_s: float = MAX_DELAY_S) -> None:
+        self.debounce_s = debounce_s
+        self.max_delay_s = max_delay_s
+        self._pending: dict[tuple[str, int], dict[Slot, Answer]] = {}
+        self._inflight: dict[tuple[str, int], dict[Slot, Answer]] = {}
+        self._first_change: float | None = None
+        self._last_change = 0.0
+        self._writing = False
+        self._passes = 0
+        # Las pasadas anteriores a esta se hacen sin esperar el debounce (flush)
+        self._flush_until = 0
+        # Proyectos descartados mientras se escribía: sus fallos no se reencolan
+        self._discarded: set[tuple[str, int]] = set()
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+
+    def __len__(self) -> int:
+        with self._cond:
+            return sum(len(changes) for changes in self._pending.values())
+
+    def enqueue(self, project_id: int, changes: Mapping[Slot, Answer], path: str | None = None) -> None:
+        if not changes:
+            return
+        key = (database_path(path), int(project_id))
+        with self._cond:
+            self._pending.setdefault(key, {}).update(changes)
+            now = time.monotonic()
+            self._last_change = now
+            if self._first_change is None:
+                self._first_change = now
+            self._ensure_thread()
+            self._cond.notify_all()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Write everything queued now; ``True`` when nothing is left queued.
+
+        Waits for one write pass started after the call (or ``timeout``). Changes
+        whose write failed stay queued and are retried after the debounce.
+        """
+
+        with self._cond:
+            if not self._pending and not self._writing:
+                return True
+            # Una pasada en curso pudo tomar su lote antes de esta llamada
+            target = self._passes + (2 if self._writing else 1)
+            self._flush_until = max(self._flush_until, target)
+            self._ensure_thread()
+            self._cond.notify_all()
+            self._cond.wait_for(
+                lambda: self._passes >= target or (not self._pending and not self._writing), timeout
+            )
+            return not self._pending and not self._writing
+
+    def queued(self, project_id: int, path: str | None = None) -> dict[Slot, Answer]:
+        """Changes of a project not yet committed (being written or waiting), newest last."""
+
+        key = (database_path(path), int(project_id))
+        with self._cond:
+            return {**self._inflight.get(key, {}), **self._pending.get(key, {})}
+
+    def discard(self, project_id: int, path: str | None = None) -> None:
+        """Drop the queued changes of a project and wait for any write in progress."""
+
+        key = (database_path(path), int(project_id))
+        with self._cond:
+            self._pending.pop(key, None)
+            if self._writing and key in self._inflight:
+                self._discarded.add(key)
+            self._cond.wait_for(lambda: not self._writing)
+
+    def _ensure_thread(self) -> None:
+        # Caller holds the condition
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="irl-drafts", daemon=True)
+            self._thread.start()
+
+    def _due_in(self) -> float:
+        if self._passes < self._flush_until or self._first_change is None:
+            return 0.0
+        due = min(self._last_change + self.debounce_s, self._first_change + self.max_delay_s)
+        return max(due - time.monotonic(), 0.0)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: bool(self._pending))
+                while self._pending and self._due_in() > 0:
+                    self._cond.wait(self._due_in())
+                if not self._pending:
+                    continue
+                batch, self._pending = self._pending, {}
+                self._inflight = batch
+                self._first_change = None
+                self._writing = True
+            failed: dict[tuple[str, int], dict[Slot, Answer]] = {}
+            try:
+                for (db_path, project_id), changes in batch.items():
+                    try:
+                        write_draft(project_id, changes, db_path)
+                    except Exception:
+                        failed[(db_path, project_id)] = changes
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self._inflight = {}
+                    self._passes += 1
+                    # Reintentar tras el debounce sin pisar cambios encolados mientras tanto
+                    # (ni revivir borradores descartados durante la escritura)
+                    for key, changes in failed.items():
+                        if key not in self._discarded:
+                            self._pending[key] = {**changes, **self._pending.get(key, {})}
+                    self._discarded.clear()
+                    if failed:
+                        self._first_change = self._last_change = time.monotonic()
+                    self._cond.notify_all()
+
+
+_writer = DraftWriter()
+atexit.register(_writer.flush, 2.0)
+
+
+def enqueue(project_id: int, changes: Mapping[Slot, Answer], path: str | None = None) -> None:
+    """Queue changed slots of a project; returns without touching the database."""
+
+    _writer.enqueue(project_id, changes, path)
+
+
+def flush(timeout: float | None = None) -> bool:
+    return _writer.flush(timeout)
+
+
+def load_draft(project_id: int, path: str | None = None) -> tuple[dict[str, object], str | None]:
+    """Draft of a project as ``resp_*``/``evid_*`` keys, plus its last update time.
+
+    Changes still queued for the project are laid over the stored rows
+    (without waiting for the worker); the time is then the current one.
+    """
+
+    queued = _writer.queued(project_id, path)  # antes de leer: lo que se confirme entre medio ya está en la tabla
+    init_db_drafts(path)
+    rows = get_connection(path).execute(
+        f"SELECT dimension, nivel, pregunta, respuesta, evidencia, actualizado FROM {TABLE_DRAFT} WHERE id_innovacion = ?;",
+        (int(project_id),),
+    ).fetchall()
+    values: dict[str, object] = {}
+    for dimension, level_id, question, respuesta, evidencia, _ in rows:
+        suffix = key_suffix(dimension, level_id, question)
+        values[f"resp_{suffix}"] = respuesta
+        values[f"evid_{suffix}"] = evidencia
+    for (dimension, level_id, question), (respuesta, evidencia) in queued.items():
+        suffix = key_suffix(dimension, level_id, question)
+        if respuesta is None and not evidencia:
+            values.pop(f"resp_{suffix}", None)
+            values.pop(f"evid_{suffix}", None)
+        else:
+            values[f"resp_{suffix}"] = respuesta
+            values[f"evid_{suffix}"] = evidencia or ""
+    actualizado = _now() if queued else max((row[5] for row in rows), default=None)
+    return values, actualizado
+
+
+def discard_draft(project_id: int, path: str | None = None) -> None:
+    """Delete the draft of a project (after its evaluation is saved or restarted)."""
+
+    _writer.discard(project_id, path)
+    init_db_drafts(path)
+    with transaction(path) as conn:
+        conn.execute(f"DELETE FROM {TABLE_DRAFT} WHERE id_innovacion = ?;", (int(project_id),))
+
+
+__all__ = [
+    "DEBOUNCE_S",
+    "MAX_DELAY_S",
+    "BATCH_SIZE",
+    "DraftWriter",
+    "init_db_drafts",
+    "write_draft",
+    "enqueue",
+    "flush",
+    "load_draft",
+    "discard_draft",
+]
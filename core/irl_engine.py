@@ -0,0 +1,264 @@
+"""Pure IRL scoring: approved levels, level states and global score without Streamlit.
+
+A project's answers are kept per dimension as three bitmasks per level (bit
+``i - 1`` is question ``i``):
+
+* ``true_mask``: questions answered ``VERDADERO``.
+* ``answered_mask``: questions answered ``VERDADERO`` or ``FALSO``.
+* ``evidence_mask``: questions with valid evidence.
+
+``DimensionAnswers.from_flat`` builds them from the flat ``resp_{dim}_{level}_{idx}``
+/ ``evid_...`` mapping used by the IRL page and by ``core.irl_import``, reading
+each key once. Scoring then works on integers: a level is approved when every
+question is ``VERDADERO``, and a dimension reaches the highest level of the
+unbroken run of approved levels starting at its first level.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+
+VERDADERO = "VERDADERO"
+FALSO = "FALSO"
+
+ESTADO_COMPLETO = "Completo"
+ESTADO_INCOMPLETO = "Incompleto"
+
+
+def evidence_valid(texto: str | None, *, strict: bool = False, min_chars: int = 1) -> bool:
+    """Non-empty evidence; with ``strict`` at least ``min_chars`` characters."""
+
+    txt = (texto or "").strip()
+    if not txt:
+        return False
+    if strict:
+        return len(txt) >= int(min_chars)
+    return True
+
+
+def _full(count: int) -> int:
+    return (1 << count) - 1
+
+
+@dataclass
+class DimensionAnswers:
+    """Answers of one dimension as per-level bitmasks, levels sorted by id.
+
+    A level without questions is stored as a single pseudo-question answered
+    through ``resp_{dim}_{level}``.
+    """
+
+    dimension: str
+    levels: tuple[int, ...]
+    counts: tuple[int, ...]
+    true_mask: list[int] = field(default_factory=list)
+    answered_mask: list[int] = field(default_factory=list)
+    evidence_mask: list[int] = field(default_factory=list)
+
+    @classmethod
+    def empty(cls, dimension: str, level_definitions: Sequence[dict]) -> "DimensionAnswers":
+        ordered = sorted(level_definitions, key=lambda lvl: lvl.get("nivel", 0))
+        levels = tuple(int(lvl.get("nivel", 0)) for lvl in ordered)
+        counts = tuple(len(lvl.get("preguntas") or []) for lvl in ordered)
+        zeros = [0] * len(levels)
+        return cls(dimension, levels, counts, list(zeros), list(zeros), list(zeros))
+
+    @classmethod
+    def from_flat(
+        cls,
+        dimension: str,
+        level_definitions: Sequence[dict],
+        values: Mapping[str, object],
+        *,
+        strict: bool = False,
+        min_chars: int = 1,
+    ) -> "DimensionAnswers":
+        """Read ``resp_*``/``evid_*`` keys of ``dimension`` from ``values`` (e.g. ``st.session_state``)."""
+
+        answers = cls.empty(dimension, level_definitions)
+        for pos, (level_id, count) in enumerate(zip(answers.levels, answers.counts)):
+            if count:
+                keys = [(f"resp_{dimension}_{level_id}_{idx}", f"evid_{dimension}_{level_id}_{idx}")
+                        for idx in range(1, count + 1)]
+            else:
+                keys = [(f"resp_{dimension}_{level_id}", f"evid_{dimension}_{level_id}")]
+            for bit, (resp_key, evid_key) in enumerate(keys):
+                answers.set(pos, bit, values.get(resp_key), values.get(evid_key), strict=strict, min_chars=min_chars)
+        return answers
+
+    def position(self, level_id: int) -> int | None:
+        try:
+            return self.levels.index(int(level_id))
+        except ValueError:
+            return None
+
+    def set(
+        self,
+        pos: int,
+        bit: int,
+        respuesta: object,
+        evidencia: object = None,
+        *,
+        strict: bool = False,
+        min_chars: int = 1,
+    ) -> None:
+        """Store the answer of question ``bit + 1`` of the level at ``pos``."""
+
+        flag = 1 << bit
+        self.true_mask[pos] &= ~flag
+        self.answered_mask[pos] &= ~flag
+        self.evidence_mask[pos] &= ~flag
+        if respuesta == VERDADERO:
+            self.true_mask[pos] |= flag
+        if respuesta in (VERDADERO, FALSO):
+            self.answered_mask[pos] |= flag
+        if isinstance(evidencia, str) and evidence_valid(evidencia, strict=strict, min_chars=min_chars):
+            self.evidence_mask[pos] |= flag
+
+    def width(self, pos: int) -> int:
+        return self.counts[pos] or 1
+
+    def level_approved(self, pos: int) -> bool:
+        """Every question of the level is ``VERDADERO`` (evidence not required)."""
+
+        return self.true_mask[pos] == _full(self.width(pos))
+
+    def level_ready(self, pos: int) -> bool:
+        """Every question answered and every ``VERDADERO`` one with valid evidence."""
+
+        full = _full(self.width(pos))
+        return self.answered_mask[pos] == full and not (self.true_mask[pos] & ~self.evidence_mask[pos])
+
+    def approved_flags(self) -> list[bool]:
+        return [self.level_approved(pos) for pos in range(len(self.levels))]
+
+    def score(self) -> int:
+        return approved_level(self.levels, self.approved_flags())
+
+
+@dataclass(frozen=True)
+class LevelState:
+    """Automatic state of a level derived from its answers."""
+
+    respuesta: str
+    en_calculo: bool
+    estado: str
+
+
+def level_states(answers: DimensionAnswers) -> dict[int, LevelState]:
+    """State of every level as set after loading answers (Excel or restore)."""
+
+    states = {}
+    for pos, level_id in enumerate(answers.levels):
+        if answers.level_approved(pos):
+            states[level_id] = LevelState(VERDADERO, True, ESTADO_COMPLETO)
+        else:
+            states[level_id] = LevelState(FALSO, False, ESTADO_INCOMPLETO)
+    return states
+
+
+def approved_level(levels: Sequence[int], approved: Sequence[bool]) -> int:
+    """Highest level of the unbroken run of approved levels from the first one (0 if none).
+
+    ``levels`` must be sorted; a gap in the numbering ends the run.
+    """
+
+    if not levels:
+        return 0
+    baseline = levels[0]
+    highest = baseline - 1
+    for level_id, ok in zip(levels, approved):
+        if level_id != highest + 1 or not ok:
+            break
+        highest = level_id
+    return highest if highest >= baseline else 0
+
+
+def global_score(levels: Iterable[int | None]) -> float | None:
+    """Mean of the reached levels 1-9 (``None`` when no dimension reached a level).
+
+    Same result as ``trl.calcular_trl`` on the approved levels.
+    """
+
+    reached = [int(level) for level in levels if level and level == level]  # omite None, 0 y NaN
+    if not reached or any(not 1 <= level <= 9 for level in reached):
+        return None
+    return float(sum(reached) / len(reached))
+
+
+@dataclass(frozen=True)
+class ProjectScore:
+    levels: dict[str, int]
+    global_score: float | None
+
+
+def score_project(answers: Mapping[str, DimensionAnswers]) -> ProjectScore:
+    """Approved level per dimension and global score of one project."""
+
+    levels = {dimension: data.score() for dimension, data in answers.items()}
+    return ProjectScore(levels, global_score(levels.values()))
+
+
+def project_answers(
+    level_definitions: Mapping[str, Sequence[dict]],
+    values: Mapping[str, object],
+    *,
+    strict: bool = False,
+    min_chars: int = 1,
+) -> dict[str, DimensionAnswers]:
+    """``DimensionAnswers`` of every dimension in ``level_definitions``."""
+
+    return {
+        dimension: DimensionAnswers.from_flat(dimension, levels, values, strict=strict, min_chars=min_chars)
+        for dimension, levels in level_definitions.items()
+    }
+
+
+def dimension_rows(
+    level_definitions: Mapping[str, Sequence[dict]],
+    values: Mapping[str, object],
+    dimensions: Iterable[str] | None = None,
+) -> tuple[list[dict], ProjectScore]:
+    """Rows ``{dimension, nivel, evidencia}`` persisted by ``db_trl`` and the project score.
+
+    ``nivel`` is ``None`` when the dimension reached no level; ``evidencia``
+    joins the evidences of the approved levels with " · ". Dimensions follow
+    ``dimensions`` (all of ``level_definitions`` by default).
+    """
+
+    answers = project_answers(level_definitions, values)
+    order = list(level_definitions) if dimensions is None else list(dimensions)
+    rows = []
+    for dimension in order:
+        data = answers.get(dimension) or DimensionAnswers.empty(dimension, [])
+        reached = data.score()
+        evidencias = []
+        for level_id, count in zip(data.levels, data.counts):
+            if level_id > reached:
+                break
+            keys = (
+                [f"evid_{dimension}_{level_id}_{idx}" for idx in range(1, count + 1)]
+                if count
+                else [f"evid_{dimension}_{level_id}"]
+            )
+            evidencias.extend(txt for txt in (str(values.get(key) or "").strip() for key in keys) if txt)
+        rows.append({"dimension": dimension, "nivel": reached or None, "evidencia": " · ".join(evidencias)})
+    levels = {row["dimension"]: row["nivel"] or 0 for row in rows}
+    return rows, ProjectScore(levels, global_score(levels.values()))
+
+
+__all__ = [
+    "VERDADERO",
+    "FALSO",
+    "evidence_valid",
+    "DimensionAnswers",
+    "LevelState",
+    "level_states",
+    "approved_level",
+    "global_score",
+    "ProjectScore",
+    "score_project",
+    "project_answers",
+    "dimension_rows",
+]
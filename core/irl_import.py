@@ -0,0 +1,275 @@
+"""Vectorized importer for the offline IRL evaluation workbook ("Evaluación IRL" sheet).
+
+Columns are detected once from the header. Answers are normalized to
+``VERDADERO``/``FALSO`` with vectorized string operations, and the
+(dimension, level, question) triples are validated with a join against the
+question catalog built from ``LEVEL_DEFINITIONS``. The result is the same
+``resp_*``/``toggle_*``/``evid_*`` dict the IRL page stores in
+``pending_irl_responses``, plus load statistics.
+
+A sheet may hold several projects when it has a project column (same rule
+as EBCT, see ``core.batch_import``); ``load_irl_responses_by_project`` then
+returns one response dict per project.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+
+import pandas as pd
+
+from .batch_import import is_project_column, project_ids
+
+SHEET_NAME = "Evaluación IRL"
+
+VERDADERO = "VERDADERO"
+FALSO = "FALSO"
+
+# Variantes aceptadas (ya en mayúsculas y sin espacios). Los booleanos de
+# Excel llegan como True/False y se convierten en "TRUE"/"FALSE".
+ANSWER_ALIASES = {
+    "TRUE": VERDADERO,
+    "T": VERDADERO,
+    "1": VERDADERO,
+    "V": VERDADERO,
+    "VERDADERO": VERDADERO,
+    "FALSE": FALSO,
+    "F": FALSO,
+    "0": FALSO,
+    "FALSO": FALSO,
+}
+
+REQUIRED_COLUMNS = ("dimension", "nivel", "num_pregunta", "respuesta", "evidencia")
+ROW_COLUMNS = ["proyecto", "fila", "dimension", "nivel", "pregunta_num", "respuesta", "evidencia"]
+
+
+def detect_columns(columns: Iterable) -> dict[str, object]:
+    """Map the logical fields to the sheet headers (same rules as the template)."""
+
+    found: dict[str, object] = {}
+    for col in columns:
+        col_lower = str(col).lower()
+        if is_project_column(col):
+            found.setdefault("proyecto", col)
+        elif "dimensión" in col_lower or "dimension" in col_lower:
+            found["dimension"] = col
+        elif "nivel" in col_lower:
+            found["nivel"] = col
+        elif "#" in col_lower and "pregunta" in col_lower:
+            found["num_pregunta"] = col
+        elif "pregunta" in col_lower and "#" not in col_lower:
+            found["pregunta"] = col
+        elif "respuesta" in col_lower:
+            found["respuesta"] = col
+        elif "evidencia" in col_lower:
+            found["evidencia"] = col
+    return found
+
+
+def question_catalog(level_definitions: Mapping[str, list[dict]]) -> pd.DataFrame:
+    """One row per (dimension, nivel, pregunta_num) defined in ``level_definitions``."""
+
+    rows = [
+        (dimension, int(level["nivel"]), idx)
+        for dimension, levels in level_definitions.items()
+        for level in levels
+        for idx in range(1, len(level.get("preguntas", [])) + 1)
+    ]
+    return pd.DataFrame(rows, columns=["dimension", "nivel", "pregunta_num"])
+
+
+def normalize_answers(raw: pd.Series) -> pd.Series:
+    """VERDADERO/FALSO for recognised values, the cleaned text otherwise ("" for blanks)."""
+
+    text = (
+        raw.astype(str)
+        .str.upper()
+        .str.replace(r"[\s]", "", regex=True)
+        .where(raw.notna(), "")
+    )
+    return text.map(ANSWER_ALIASES).fillna(text)
+
+
+def _empty_stats(columns: Mapping[str, object]) -> dict:
+    return {
+        "total": 0,
+        "validas": 0,
+        "invalidas": 0,
+        "ejemplo": 0,
+        "vacias": 0,
+        "proyectos": 0,
+        "errores": [],
+        "columnas": dict(columns),
+    }
+
+
+def parse_irl_sheet(df: pd.DataFrame, level_definitions: Mapping[str, list[dict]]) -> tuple[pd.DataFrame, dict]:
+    """Validate the sheet and return ``(rows, stats)``.
+
+    ``rows`` has one valid answer per row with ``ROW_COLUMNS`` (``proyecto`` is
+    ``None`` for single-project sheets). ``stats`` counts total, valid, invalid
+    and empty rows and lists the problems found (``fila`` is the Excel row).
+    Raises ``ValueError`` when a required column is missing.
+    """
+
+    columns = detect_columns(df.columns)
+    missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+    if missing:
+        raise ValueError(
+            f"No se pudieron detectar todas las columnas necesarias ({', '.join(missing)}). "
+            f"Columnas disponibles: {list(df.columns)}"
+        )
+    stats = _empty_stats(columns)
+    stats["total"] = len(df)
+
+    fila = pd.Series(df.index, index=df.index) + 2
+    dim_raw = df[columns["dimension"]]
+    dim_text = dim_raw.astype(str).where(dim_raw.notna(), "")
+    dimension = dim_text.str.split(" - ", n=1).str[0].str.strip()
+    nivel_raw = df[columns["nivel"]]
+    num_raw = df[columns["num_pregunta"]]
+    nivel = pd.to_numeric(nivel_raw, errors="coerce")
+    num = pd.to_numeric(num_raw, errors="coerce")
+    respuesta = normalize_answers(df[columns["respuesta"]])
+
+    # Mismo orden de validación que la planilla: ubicación, números, respuesta
+    sin_ubicacion = dim_text.isin(["", "nan"]) | nivel_raw.isna() | num_raw.isna()
+    no_numerica = ~sin_ubicacion & (nivel.isna() | num.isna())
+    vacia = sin_ubicacion | (~no_numerica & respuesta.isin(["", "NAN"]))
+    no_booleana = ~vacia & ~no_numerica & ~respuesta.isin([VERDADERO, FALSO])
+
+    candidatas = ~(vacia | no_numerica | no_booleana)
+    claves = pd.DataFrame(
+        {
+            "dimension": dimension[candidatas],
+            "nivel": nivel[candidatas].astype(int),
+            "pregunta_num": num[candidatas].astype(int),
+        }
+    )
+    catalogo = question_catalog(level_definitions).assign(_en_catalogo=True)
+    unidas = claves.merge(catalogo, on=["dimension", "nivel", "pregunta_num"], how="left")
+    fuera = pd.Series(False, index=df.index)
+    fuera[candidatas] = unidas["_en_catalogo"].isna().to_numpy()
+
+    errores = [
+        {"fila": int(f), "motivo": "Error: nivel o número de pregunta no numérico"}
+        for f in fila[no_numerica]
+    ]
+    errores.extend(
+        {
+            "fila": int(f),
+            "dimension": dim,
+            "nivel": int(n),
+            "pregunta_num": int(q),
+            "respuesta_raw": f"'{raw}' (tipo: {type(raw).__name__})",
+            "respuesta_limpia": f"'{limpia}'",
+            "motivo": "No se pudo normalizar a VERDADERO/FALSO",
+        }
+        for f, dim, n, q, raw, limpia in zip(
+            fila[no_booleana],
+            dimension[no_booleana],
+            nivel[no_booleana],
+            num[no_booleana],
+            df.loc[no_booleana, columns["respuesta"]],
+            respuesta[no_booleana],
+        )
+    )
+    errores.extend(
+        {"fila": int(f), "motivo": f"Pregunta {dim}-N{int(n)}-P{int(q)} no existe en el catálogo IRL"}
+        for f, dim, n, q in zip(fila[fuera], dimension[fuera], nivel[fuera], num[fuera])
+    )
+    errores.sort(key=lambda error: error["fila"])
+
+    validas = candidatas & ~fuera
+    evid_raw = df[columns["evidencia"]]
+    evidencia = evid_raw.astype(str).where(evid_raw.notna(), "").str.strip()
+    if "proyecto" in columns:
+        proyecto = project_ids(df[columns["proyecto"]])
+    else:
+        proyecto = pd.Series(None, index=df.index, dtype=object)
+    rows = pd.DataFrame(
+        {
+            "proyecto": proyecto[validas],
+            "fila": fila[validas],
+            "dimension": dimension[validas],
+            "nivel": nivel[validas].astype(int),
+            "pregunta_num": num[validas].astype(int),
+            "respuesta": respuesta[validas],
+            "evidencia": evidencia[validas],
+        },
+        columns=ROW_COLUMNS,
+    ).reset_index(drop=True)
+
+    stats["vacias"] = int(vacia.sum())
+    stats["invalidas"] = int((no_numerica | no_booleana | fuera).sum())
+    stats["validas"] = len(rows)
+    stats["proyectos"] = int(rows["proyecto"].nunique())
+    stats["errores"] = errores
+    return rows, stats
+
+
+def responses_from_rows(rows: pd.DataFrame) -> dict:
+    """``resp_*``/``toggle_*``/``evid_*`` keys for ``rows`` (later rows win)."""
+
+    responses: dict = {}
+    for dimension, nivel, num, respuesta, evidencia in zip(
+        rows["dimension"], rows["nivel"], rows["pregunta_num"], rows["respuesta"], rows["evidencia"]
+    ):
+        suffix = f"{dimension}_{nivel}_{num}"
+        responses[f"resp_{suffix}"] = respuesta
+        responses[f"toggle_{suffix}"] = respuesta == VERDADERO
+        responses[f"evid_{suffix}"] = evidencia
+    return responses
+
+
+def load_irl_responses(df: pd.DataFrame, level_definitions: Mapping[str, list[dict]]) -> tuple[dict, dict]:
+    """Responses of a single-project sheet and the load statistics.
+
+    Raises ``ValueError`` when the sheet holds more than one project.
+    """
+
+    rows, stats = parse_irl_sheet(df, level_definitions)
+    if stats["proyectos"] > 1:
+        raise ValueError(
+            f"La hoja contiene {stats['proyectos']} proyectos; cárguela con la evaluación por lotes."
+        )
+    return responses_from_rows(rows), stats
+
+
+def load_irl_responses_by_project(
+    df: pd.DataFrame,
+    level_definitions: Mapping[str, list[dict]],
+) -> tuple[dict[str, dict], dict]:
+    """Responses per project of a multi-project sheet and the load statistics.
+
+    Rows without a project id are counted as invalid.
+    """
+
+    rows, stats = parse_irl_sheet(df, level_definitions)
+    sin_proyecto = rows["proyecto"].isna()
+    if sin_proyecto.any():
+        stats["invalidas"] += int(sin_proyecto.sum())
+        stats["validas"] -= int(sin_proyecto.sum())
+        stats["errores"].extend(
+            {"fila": int(fila), "motivo": "Fila sin proyecto"} for fila in rows.loc[sin_proyecto, "fila"]
+        )
+        stats["errores"].sort(key=lambda error: error["fila"])
+        rows = rows.loc[~sin_proyecto]
+    responses = {
+        proyecto: responses_from_rows(grupo)
+        for proyecto, grupo in rows.groupby("proyecto", sort=False)
+    }
+    return responses, stats
+
+
+__all__ = [
+    "SHEET_NAME",
+    "ANSWER_ALIASES",
+    "detect_columns",
+    "question_catalog",
+    "normalize_answers",
+    "parse_irl_sheet",
+    "responses_from_rows",
+    "load_irl_responses",
+    "load_irl_responses_by_project",
+]
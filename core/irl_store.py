@@ -0,0 +1,179 @@
+"""Compact answer store of one IRL evaluation.
+
+The IRL page used to keep three session keys per question
+(``resp_{dim}_{level}_{idx}``, ``toggle_*`` and ``evid_*``) and rescanned all
+of them on every rerun. ``AnswerStore`` holds the same answers in one object:
+
+* answers as the per-level bitmasks of ``irl_engine.DimensionAnswers``;
+* evidence texts in a flat list;
+* an index from ``(dimension, level, question)`` to its slot, so reads and
+  writes are O(1).
+
+Levels without questions use question ``0`` (keys ``resp_{dim}_{level}``).
+Every change bumps ``version`` and the version of its dimension, so derived
+values (ready flags, scores) are recomputed only for dimensions that changed.
+Changed slots are also remembered until ``take_changes`` hands them to the
+draft writer (``irl_drafts``).
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator, Mapping, Sequence
+from dataclasses import dataclass, field
+
+from .irl_engine import FALSO, VERDADERO, DimensionAnswers
+
+Slot = tuple[str, int, int]
+
+
+def key_suffix(dimension: str, level_id: int, question: int = 0) -> str:
+    """Suffix of the legacy ``resp_``/``toggle_``/``evid_`` session keys."""
+
+    if question:
+        return f"{dimension}_{level_id}_{question}"
+    return f"{dimension}_{level_id}"
+
+
+@dataclass
+class AnswerStore:
+    """Answers and evidences of one project, indexed by (dimension, level, question)."""
+
+    project_id: int | None = None
+    strict: bool = False
+    min_chars: int = 1
+    version: int = 0
+    _answers: dict[str, DimensionAnswers] = field(default_factory=dict)
+    _slots: dict[Slot, tuple[int, int, int]] = field(default_factory=dict)
+    _evidencias: list[str] = field(default_factory=list)
+    _versions: dict[str, int] = field(default_factory=dict)
+    _dirty: set[Slot] = field(default_factory=set)
+
+    @classmethod
+    def empty(
+        cls,
+        level_definitions: Mapping[str, Sequence[dict]],
+        project_id: int | None = None,
+        *,
+        strict: bool = False,
+        min_chars: int = 1,
+    ) -> "AnswerStore":
+        store = cls(project_id, strict, int(min_chars))
+        for dimension, levels in level_definitions.items():
+            answers = DimensionAnswers.empty(dimension, levels)
+            store._answers[dimension] = answers
+            store._versions[dimension] = 0
+            for pos, (level_id, count) in enumerate(zip(answers.levels, answers.counts)):
+                questions = range(1, count + 1) if count else (0,)
+                for bit, question in enumerate(questions):
+                    store._slots[(dimension, level_id, question)] = (pos, bit, len(store._evidencias))
+                    store._evidencias.append("")
+        return store
+
+    @classmethod
+    def from_flat(
+        cls,
+        level_definitions: Mapping[str, Sequence[dict]],
+        values: Mapping[str, object],
+        project_id: int | None = None,
+        *,
+        strict: bool = False,
+        min_chars: int = 1,
+    ) -> "AnswerStore":
+        """Store built from ``resp_*``/``evid_*`` keys (session state or ``irl_import`` output)."""
+
+        store = cls.empty(level_definitions, project_id, strict=strict, min_chars=min_chars)
+        store.update(values)
+        return store
+
+    def __contains__(self, slot: Slot) -> bool:
+        return slot in self._slots
+
+    def slots(self, dimension: str | None = None) -> Iterator[Slot]:
+        for slot in self._slots:
+            if dimension is None or slot[0] == dimension:
+                yield slot
+
+    def get(self, dimension: str, level_id: int, question: int = 0) -> tuple[str | None, str]:
+        """``(respuesta, evidencia)``; ``respuesta`` is ``None`` when unanswered."""
+
+        pos, bit, ref = self._slots[(dimension, int(level_id), int(question))]
+        answers = self._answers[dimension]
+        flag = 1 << bit
+        if answers.true_mask[pos] & flag:
+            respuesta = VERDADERO
+        elif answers.answered_mask[pos] & flag:
+            respuesta = FALSO
+        else:
+            respuesta = None
+        return respuesta, self._evidencias[ref]
+
+    def set(
+        self,
+        dimension: str,
+        level_id: int,
+        question: int = 0,
+        respuesta: object = None,
+        evidencia: object = None,
+    ) -> bool:
+        """Store one answer (``evidencia=None`` keeps the current text); ``True`` if it changed."""
+
+        pos, bit, ref = self._slots[(dimension, int(level_id), int(question))]
+        actual, evidencia_actual = self.get(dimension, level_id, question)
+        nueva = respuesta if respuesta in (VERDADERO, FALSO) else None
+        texto = evidencia_actual if evidencia is None else str(evidencia)
+        if nueva == actual and texto == evidencia_actual:
+            return False
+        self._answers[dimension].set(pos, bit, nueva, texto, strict=self.strict, min_chars=self.min_chars)
+        self._evidencias[ref] = texto
+        self.version += 1
+        self._versions[dimension] += 1
+        self._dirty.add((dimension, int(level_id), int(question)))
+        return True
+
+    def update(self, values: Mapping[str, object]) -> int:
+        """Apply the ``resp_*``/``evid_*`` keys present in ``values``; returns the changed count."""
+
+        changed = 0
+        for dimension, level_id, question in self._slots:
+            suffix = key_suffix(dimension, level_id, question)
+            resp_key, evid_key = f"resp_{suffix}", f"evid_{suffix}"
+            if resp_key not in values and evid_key not in values:
+                continue
+            respuesta = values[resp_key] if resp_key in values else self.get(dimension, level_id, question)[0]
+            evidencia = values.get(evid_key)
+            changed += self.set(dimension, level_id, question, respuesta, evidencia)
+        return changed
+
+    def answers(self, dimension: str) -> DimensionAnswers:
+        """Bitmasks of ``dimension`` (kept up to date in place; do not mutate)."""
+
+        if dimension not in self._answers:
+            return DimensionAnswers.empty(dimension, [])
+        return self._answers[dimension]
+
+    def dimension_version(self, dimension: str) -> int:
+        return self._versions.get(dimension, 0)
+
+    def take_changes(self) -> dict[Slot, tuple[str | None, str]]:
+        """Current ``(respuesta, evidencia)`` of the slots changed since the last call."""
+
+        changes = {slot: self.get(*slot) for slot in self._dirty}
+        self._dirty.clear()
+        return changes
+
+    def to_flat(self) -> dict[str, object]:
+        """Answered slots as ``resp_*``/``toggle_*``/``evid_*`` keys (``irl_import`` format)."""
+
+        flat: dict[str, object] = {}
+        for dimension, level_id, question in self._slots:
+            respuesta, evidencia = self.get(dimension, level_id, question)
+            if respuesta is None and not evidencia:
+                continue
+            suffix = key_suffix(dimension, level_id, question)
+            flat[f"resp_{suffix}"] = respuesta
+            flat[f"toggle_{suffix}"] = respuesta == VERDADERO
+            flat[f"evid_{suffix}"] = evidencia
+        return flat
+
+
+__all__ = ["AnswerStore", "key_suffix"]
@@ -0,0 +1,105 @@
+"""Streaming reader for the Fase 0 bulk portfolio upload.
+
+``pd.read_excel`` builds the whole workbook in memory before anything can be
+validated. Here ``.xlsx`` files are read with openpyxl ``read_only=True`` row
+iteration and ``.csv`` files with ``read_csv(chunksize=...)``, so only one
+chunk of ``CHUNK_ROWS`` rows is materialized as a DataFrame at a time. The
+page normalizes and writes each chunk before the next one is read.
+"""
+
+from __future__ import annotations
+
+from itertools import islice
+from typing import IO, Iterator
+
+import pandas as pd
+
+CHUNK_ROWS = 5_000
+
+
+def _header_names(values: tuple) -> list:
+    """Column names as ``pd.read_excel`` would build them (Unnamed / .1 suffixes)."""
+
+    names: list = []
+    seen: dict[object, int] = {}
+    for idx, value in enumerate(values):
+        name = f"Unnamed: {idx}" if value is None or (isinstance(value, str) and not value.strip()) else value
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _iter_xlsx(source: IO[bytes], chunk_rows: int, sheet) -> Iterator[pd.DataFrame]:
+    from openpyxl import load_workbook
+
+    wb = load_workbook(source, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0] if sheet is None else wb[sheet]
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = _header_names(header)
+        width = len(columns)
+        # filas completamente vacías (formato residual de Excel) se descartan
+        data = (
+            row[:width] + (None,) * (width - len(row))
+            for row in rows
+            if any(value is not None and value != "" for value in row)
+        )
+        while True:
+            block = list(islice(data, chunk_rows))
+            if not block:
+                break
+            yield pd.DataFrame.from_records(block, columns=columns)
+    finally:
+        wb.close()
+
+
+def _xlsx_row_estimate(source: IO[bytes], sheet) -> int | None:
+    from openpyxl import load_workbook
+
+    wb = load_workbook(source, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0] if sheet is None else wb[sheet]
+        max_row = ws.max_row
+    finally:
+        wb.close()
+        source.seek(0)
+    return max(int(max_row) - 1, 0) if max_row else None
+
+
+def _iter_frame(df: pd.DataFrame, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows].reset_index(drop=True)
+
+
+def read_upload_chunks(
+    source: IO[bytes],
+    filename: str,
+    chunk_rows: int = CHUNK_ROWS,
+    sheet: str | None = None,
+) -> tuple[Iterator[pd.DataFrame], int | None]:
+    """Open an uploaded portfolio file and return ``(chunks, estimated_rows)``.
+
+    ``estimated_rows`` comes from the sheet dimension for ``.xlsx`` (blank rows
+    included) and is ``None`` when it is unknown, as for CSV. Legacy ``.xls``
+    workbooks cannot be streamed by openpyxl; they are read whole and then
+    handed out in chunks so the caller keeps a single code path.
+    """
+
+    name = filename.lower()
+    if name.endswith(".csv"):
+        return iter(pd.read_csv(source, chunksize=chunk_rows)), None
+    if name.endswith(".xls"):
+        df = pd.read_excel(source, sheet_name=sheet or 0)
+        return _iter_frame(df, chunk_rows), len(df)
+    total = _xlsx_row_estimate(source, sheet)
+    return _iter_xlsx(source, chunk_rows, sheet), total
+
+
+__all__ = ["CHUNK_ROWS", "read_upload_chunks"]
@@ -1,6 +1,13 @@
+from datetime import datetime
+
+import numpy as np
 import pandas as pd
 from .config import IMPACTO_ORDER
 
+# Columnas del portafolio que suman puntaje según las tablas de Fase 0
+SCORE_COLUMNS = ["estatus", "impacto", "estado_pm", "potencial_transferencia", "activo_pm", "tiene_resp_in"]
+BONO_PLAZO = 10.0
+
 def filter_candidatos(df: pd.DataFrame, impacto_min="Medio", puntaje_min=140,
                       exigir_resp_in=True, exigir_abierto=True, excluir_cerrados=True):
     df = df.copy()
@@ -14,3 +21,91 @@ def filter_candidatos(df: pd.DataFrame, impacto_min="Medio", puntaje_min=140,
     out = df[mask].copy()
     out["candidato_alto_potencial"] = True
     return out
+
+def prepare_lookup(df: pd.DataFrame) -> dict:
+    """Convierte una tabla de puntaje (Concepto/Valor) en un dict clave normalizada -> valor."""
+    if df is None or df.empty:
+        return {}
+    col_key, col_val = df.columns[0], df.columns[-1]
+    keys = df[col_key].astype(str).str.strip().str.lower()
+    values = pd.to_numeric(df[col_val], errors="coerce").fillna(0.0).astype(float)
+    return {k: v for k, v in zip(keys, values) if k}
+
+def thresholds(df_eval: pd.DataFrame) -> dict:
+    lookup = prepare_lookup(df_eval)
+    baja = lookup.get("baja", 0.0)
+    media = lookup.get("media", 50.0)
+    alta = lookup.get("alta", 100.0)
+    if media < baja:
+        media = baja
+    if alta < media:
+        alta = media
+    return {
+        "baja": baja,
+        "media": media,
+        "alta": alta,
+    }
+
+def _norm_text(df: pd.DataFrame, col: str) -> pd.Series:
+    if col not in df.columns:
+        return pd.Series("", index=df.index, dtype=object)
+    return df[col].fillna("").astype(str).str.strip().str.lower()
+
+def _fecha_termino(df: pd.DataFrame) -> pd.Series:
+    if "fecha_termino_pm" not in df.columns:
+        return pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
+    fechas = df["fecha_termino_pm"]
+    if not pd.api.types.is_datetime64_any_dtype(fechas):
+        fechas = fechas.where(fechas.astype(str).str.strip() != "")
+        fechas = pd.to_datetime(fechas, errors="coerce", format="mixed")
+    return fechas.dt.normalize()
+
+def _hoy(today=None) -> pd.Timestamp:
+    return pd.Timestamp(today if today is not None else datetime.now().date()).normalize()
+
+def score_portfolio(df: pd.DataFrame, lookups: dict, today=None) -> pd.Series:
+    """Puntaje Fase 0 de todo el portafolio con lookups por columna.
+
+    Suma el valor de cada criterio en ``SCORE_COLUMNS`` según ``lookups`` (ver
+    ``prepare_lookup``) más ``BONO_PLAZO`` si la fecha de término sigue vigente.
+    Los proyectos inactivos o cerrados puntúan 0.
+    """
+    total = pd.Series(0.0, index=df.index)
+    for col in SCORE_COLUMNS:
+        total += _norm_text(df, col).map(lookups.get(col, {})).fillna(0.0).astype(float)
+    total += np.where(_fecha_termino(df) >= _hoy(today), BONO_PLAZO, 0.0)
+    excluido = _norm_text(df, "activo_pm").eq("no") | _norm_text(df, "estado_pm").eq("cerrado")
+    return total.mask(excluido, 0.0)
+
+def build_recommendations(df: pd.DataFrame, puntajes: pd.Series, eval_table: pd.DataFrame,
+                          today=None) -> pd.Series:
+    """Texto de recomendación ('Proy. cerrado; Fuera de plazo; ...') para cada proyecto."""
+    fechas = _fecha_termino(df)
+    hoy = _hoy(today)
+    umbrales = thresholds(eval_table)
+    puntajes = puntajes.reindex(df.index).to_numpy(dtype=float)
+    partes = [
+        np.where(_norm_text(df, "estado_pm").eq("cerrado"), "Proy. cerrado", ""),
+        np.where(fechas.isna(), "", np.where(fechas < hoy, "Fuera de plazo", "Dentro de plazo")),
+        np.where(_norm_text(df, "impacto").eq("alto"), "Impacto alto", ""),
+        np.where(_norm_text(df, "tiene_resp_in").eq("no"), "Sin Resp IN", ""),
+    ]
+    prioridad = np.select(
+        [puntajes <= umbrales["media"], puntajes <= umbrales["alta"]],
+        ["Prioridad baja", "Prioridad media"],
+        default="Prioridad alta",
+    )
+    texto = pd.Series("", index=df.index, dtype=object)
+    for parte in partes:
+        parte = pd.Series(parte, index=df.index, dtype=object)
+        texto = texto + np.where(parte != "", parte + "; ", "")
+    return texto + prioridad
+
+def evaluate_portfolio(df: pd.DataFrame, score_tables: dict, today=None) -> pd.DataFrame:
+    """Agrega ``evaluacion_calculada`` y ``recomendacion`` al portafolio normalizado."""
+    lookups = {col: prepare_lookup(score_tables[col]) for col in SCORE_COLUMNS}
+    out = df.copy()
+    out["evaluacion_calculada"] = score_portfolio(out, lookups, today=today)
+    out["recomendacion"] = build_recommendations(out, out["evaluacion_calculada"], score_tables["evaluacion"],
+                                                 today=today)
+    return out
@@ -0,0 +1,238 @@
+"""Columnar snapshots (Arrow IPC / Feather v2) of the portfolio and of project bundles.
+
+pyarrow is an optional dependency. Without it ``HAS_ARROW`` is ``False``, the
+portfolio is read from SQLite as before, and the Arrow export options are
+hidden.
+
+Portfolio: every writer in ``core.db`` bumps a generation counter in
+``snapshot_gen`` inside its own transaction, together with a random token.
+The first reader of a generation writes
+``snapshots/<table>-<gen>-<token>.arrow`` next to the database. The token
+tells apart databases that reach the same generation, e.g. when the file is
+replaced by a backup or a copy from another machine; databases without a
+tracked write yet use the identity of the file (inode, size, mtime) instead.
+Later readers,
+including other processes and the app after a restart, memory-map that file
+instead of running ``SELECT *`` through pandas. Files are stored uncompressed,
+so the read is zero-copy and supports column projection.
+
+Bundles: a zip with one ``<sheet>.arrow`` member per sheet, offered by the
+Consolidador as a faster alternative to the consolidated .xlsx.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+import glob
+import hashlib
+import io
+import os
+import secrets
+import sqlite3
+import tempfile
+import zipfile
+
+import pandas as pd
+
+from .db_pool import database_path, transaction
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    HAS_ARROW = True
+except ModuleNotFoundError:  # pragma: no cover - depende del entorno
+    pa = None
+    feather = None
+    HAS_ARROW = False
+
+GEN_TABLE = "snapshot_gen"
+EXTENSION = ".arrow"
+
+
+def _ensure_gen_table(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {GEN_TABLE} (tabla TEXT PRIMARY KEY, gen INTEGER NOT NULL, token TEXT);"
+    )
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({GEN_TABLE});")]
+    if "token" not in columns:  # tablas creadas antes de guardar el token
+        conn.execute(f"ALTER TABLE {GEN_TABLE} ADD COLUMN token TEXT;")
+
+
+def bump_generation(conn: sqlite3.Connection, table: str) -> None:
+    """Mark ``table`` as changed (call inside the writer's transaction)."""
+
+    _ensure_gen_table(conn)
+    conn.execute(
+        f"INSERT INTO {GEN_TABLE} (tabla, gen, token) VALUES (?, 1, ?) "
+        "ON CONFLICT(tabla) DO UPDATE SET gen = gen + 1, token = excluded.token",
+        (table, secrets.token_hex(8)),
+    )
+
+
+def generation(conn: sqlite3.Connection, table: str) -> int:
+    """Current generation of ``table`` (0 before its first tracked write)."""
+
+    try:
+        row = conn.execute(f"SELECT gen FROM {GEN_TABLE} WHERE tabla = ?", (table,)).fetchone()
+    except sqlite3.OperationalError:  # tabla aún no creada: ningún escritor la ha tocado
+        return 0
+    return int(row[0]) if row else 0
+
+
+def _file_identity(path: str | None = None) -> str | None:
+    try:
+        info = os.stat(database_path(path))
+    except OSError:
+        return None
+    key = f"{info.st_dev}-{info.st_ino}-{info.st_size}-{info.st_mtime_ns}"
+    return hashlib.sha256(key.encode("ascii")).hexdigest()[:16]
+
+
+def snapshot_key(conn: sqlite3.Connection, table: str, path: str | None = None) -> str | None:
+    """``<gen>-<token>`` naming the snapshot of ``table`` in this database.
+
+    ``None`` when no identity is available (no token and the file cannot be
+    stat'ed); the table is then read without a snapshot.
+    """
+
+    try:
+        row = conn.execute(f"SELECT gen, token FROM {GEN_TABLE} WHERE tabla = ?", (table,)).fetchone()
+    except sqlite3.OperationalError:  # sin tabla o sin columna token: ningún escritor nuevo la ha tocado
+        row = None
+    if row and row[1]:
+        return f"{int(row[0])}-{row[1]}"
+    identity = _file_identity(path)
+    return f"{int(row[0]) if row else 0}-{identity}" if identity else None
+
+
+def snapshot_dir(path: str | None = None) -> str:
+    """Directory holding the snapshots of the database at ``path``."""
+
+    return os.path.join(os.path.dirname(database_path(path)), "snapshots")
+
+
+def snapshot_path(table: str, key: str, path: str | None = None) -> str:
+    return os.path.join(snapshot_dir(path), f"{table}-{key}{EXTENSION}")
+
+
+def _require_arrow() -> None:
+    if not HAS_ARROW:
+        raise RuntimeError("pyarrow no está instalado: los snapshots Arrow no están disponibles.")
+
+
+def _to_arrow(df: pd.DataFrame) -> "pa.Table":
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        # Columnas de Excel con tipos mezclados (números y textos): se guardan como texto
+        mixed = {
+            col: df[col].astype("string")
+            for col in df.columns
+            if df[col].dtype == object
+        }
+        return pa.Table.from_pandas(df.assign(**mixed), preserve_index=False)
+
+
+def write_table(df: pd.DataFrame, path: str) -> None:
+    """Write ``df`` as an uncompressed Arrow IPC file, replacing ``path`` atomically."""
+
+    _require_arrow()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Nombre temporal único por proceso e hilo
+    fd, tmp = tempfile.mkstemp(prefix=f"{os.path.basename(path)}.", suffix=".tmp", dir=os.path.dirname(path))
+    os.close(fd)
+    try:
+        feather.write_feather(_to_arrow(df), tmp, compression="uncompressed")
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def read_table(path: str, columns: list[str] | None = None) -> pd.DataFrame:
+    """Memory-map an Arrow IPC file, optionally reading only ``columns``."""
+
+    _require_arrow()
+    return feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+
+
+def load_table(table: str, loader: Callable[[sqlite3.Connection], pd.DataFrame]) -> pd.DataFrame:
+    """Read ``table`` from its current snapshot, or through ``loader`` and snapshot it.
+
+    The snapshot key and the ``loader`` query run in one read transaction, so
+    the snapshot always matches the generation it is named after. Without
+    pyarrow this is just ``loader``.
+    """
+
+    if not HAS_ARROW:
+        with transaction(immediate=False) as conn:
+            return loader(conn)
+    with transaction(immediate=False) as conn:
+        key = snapshot_key(conn, table)
+        if key is None:
+            return loader(conn)
+        path = snapshot_path(table, key)
+        if os.path.exists(path):
+            try:
+                return read_table(path)
+            except (OSError, pa.ArrowInvalid):
+                pass  # snapshot dañado: se regenera desde SQLite
+        df = loader(conn)
+    try:
+        write_table(df, path)
+    except OSError:
+        return df
+    for old in glob.glob(os.path.join(snapshot_dir(), f"{table}-*{EXTENSION}")):
+        if old != path:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+    return df
+
+
+def bundle_to_bytes(frames: dict[str, pd.DataFrame]) -> bytes:
+    """Pack named frames as a zip of Arrow IPC files (one member per sheet)."""
+
+    _require_arrow()
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as archive:
+        for name, frame in frames.items():
+            sink = pa.BufferOutputStream()
+            feather.write_feather(_to_arrow(frame), sink, compression="uncompressed")
+            archive.writestr(f"{name}{EXTENSION}", sink.getvalue().to_pybytes())
+    return buffer.getvalue()
+
+
+def bundle_from_bytes(content: bytes, columns: dict[str, list[str]] | None = None) -> dict[str, pd.DataFrame]:
+    """Read a bundle written by ``bundle_to_bytes``; ``columns`` projects per sheet."""
+
+    _require_arrow()
+    frames: dict[str, pd.DataFrame] = {}
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        for member in archive.namelist():
+            if not member.endswith(EXTENSION):
+                continue
+            name = member[: -len(EXTENSION)]
+            wanted = (columns or {}).get(name)
+            source = pa.BufferReader(archive.read(member))
+            frames[name] = feather.read_table(source, columns=wanted).to_pandas()
+    return frames
+
+
+__all__ = [
+    "HAS_ARROW",
+    "bump_generation",
+    "generation",
+    "snapshot_key",
+    "snapshot_dir",
+    "snapshot_path",
+    "write_table",
+    "read_table",
+    "load_table",
+    "bundle_to_bytes",
+    "bundle_from_bytes",
+]
@@ -0,0 +1,113 @@
+"""Process-wide registry of the downloadable Excel templates.
+
+Templates (IRL, EBCT, Fase 0 portfolio and instructive, Indicadores) only
+change when the catalog they are built from changes. Each page asks for its
+template with ``get_template(name, version, builder)``, where ``version`` is
+``catalog_version(...)`` of that catalog. The openpyxl workbook is built on
+the first request of a version. Later reruns, and other sessions served by
+the same process, get the cached bytes. Headers, instructions and styles live
+in the builder, not in the catalog, so callers include a layout version of
+the builder in ``catalog_version(...)`` and bump it whenever the builder
+changes.
+
+With ``persist=True`` the bytes are also stored as
+``templates/<name>-<version>.xlsx`` next to the database. After a restart the
+file is read instead of rebuilding the workbook.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+import hashlib
+import json
+import os
+import threading
+
+from .db_pool import database_path
+
+EXTENSION = ".xlsx"
+
+_lock = threading.Lock()
+_cache: dict[str, tuple[str, bytes]] = {}
+
+
+def catalog_version(*catalogs: object) -> str:
+    """Short stable hash of the catalogs a template is built from."""
+
+    payload = json.dumps(catalogs, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def template_dir(path: str | None = None) -> str:
+    """Directory holding the persisted templates of the database at ``path``."""
+
+    return os.path.join(os.path.dirname(database_path(path)), "templates")
+
+
+def template_path(name: str, version: str, path: str | None = None) -> str:
+    return os.path.join(template_dir(path), f"{name}-{version}{EXTENSION}")
+
+
+def _read(file_path: str) -> bytes | None:
+    try:
+        with open(file_path, "rb") as handle:
+            return handle.read()
+    except OSError:
+        return None
+
+
+def _write(name: str, version: str, file_path: str, content: bytes) -> None:
+    try:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        tmp_path = f"{file_path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        with open(tmp_path, "wb") as handle:
+            handle.write(content)
+        os.replace(tmp_path, file_path)
+        # Las versiones anteriores de la misma plantilla ya no se sirven
+        prefix = f"{name}-"
+        for entry in os.listdir(os.path.dirname(file_path)):
+            if entry.startswith(prefix) and entry.endswith(EXTENSION) and entry != os.path.basename(file_path):
+                os.remove(os.path.join(os.path.dirname(file_path), entry))
+    except OSError:
+        pass  # el disco es solo una caché; la descarga sigue sirviéndose desde memoria
+
+
+def get_template(
+    name: str,
+    version: str,
+    builder: Callable[[], bytes | None],
+    *,
+    persist: bool = False,
+) -> bytes | None:
+    """Bytes of template ``name`` for ``version``, calling ``builder`` only on a miss.
+
+    A ``None`` from ``builder`` (e.g. openpyxl missing) is returned but not cached.
+    The lock only guards the in-memory cache; ``builder`` and file I/O run outside it.
+    """
+
+    with _lock:
+        cached = _cache.get(name)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    # Dos fallos simultáneos pueden construirla dos veces; queda la última
+    file_path = template_path(name, version) if persist else None
+    content = _read(file_path) if file_path else None
+    if content is None:
+        content = builder()
+        if content is None:
+            return None
+        if file_path:
+            _write(name, version, file_path, content)
+    with _lock:
+        _cache[name] = (version, content)
+    return content
+
+
+def clear() -> None:
+    """Drop every template cached in memory (persisted files are kept)."""
+
+    with _lock:
+        _cache.clear()
+
+
+__all__ = ["catalog_version", "template_dir", "template_path", "get_template", "clear"]
@@ -1,9 +1,17 @@
 from datetime import datetime
+import numpy as np
 import pandas as pd
 import pytz
 from .config import TZ_NAME
 
 DATE_FIELDS = ["fecha_creacion","fecha_inicio_pm","fecha_termino_pm","fecha_termino_real_pm"]
+# Formatos explícitos que parse_date prueba antes del parser genérico
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y")
+# Texto que devuelve SQLite para fechas guardadas con to_sql: el parser genérico
+# da el mismo resultado, pero en bloque es mucho más rápido. Ningún texto calza
+# con más de un formato, así que el orden de prueba no cambia el resultado.
+_DB_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+_DATETIME_DTYPE = pd.to_datetime(pd.Series(["2000-01-01"]), format="%Y-%m-%d").dtype
 
 def tz_today():
     return datetime.now(pytz.timezone(TZ_NAME)).date()
@@ -22,15 +30,61 @@ def parse_float_local(v):
     try: return float(str(v).replace(",", "."))
     except: return None
 
+def _blank_mask(values: np.ndarray) -> np.ndarray:
+    return pd.isna(values) | (values == "")
+
+def parse_date_series(s: pd.Series) -> pd.Series:
+    """Versión vectorizada de ``s.apply(parse_date)``.
+
+    Cada formato explícito se aplica en bloque sobre las celdas aún sin fecha;
+    solo las que no calzan con ninguno pasan por el parser genérico, celda a celda.
+    """
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s.copy()
+    values = s.to_numpy(dtype=object)
+    result = np.full(len(values), np.datetime64("NaT"), dtype=_DATETIME_DTYPE)
+    pending = np.flatnonzero(~_blank_mask(values))
+    text = s.iloc[pending].astype(str).to_numpy(dtype=object)
+    for fmt in (_DB_DATE_FORMAT,) + DATE_FORMATS:
+        if not len(pending):
+            break
+        parsed = pd.to_datetime(text, format=fmt, errors="coerce")
+        ok = ~parsed.isna()
+        result[pending[ok]] = parsed[ok].to_numpy(dtype=_DATETIME_DTYPE)
+        pending, text = pending[~ok], text[~ok]
+    try:
+        for i in pending:
+            parsed = pd.to_datetime(values[i], errors="coerce")
+            if not pd.isna(parsed):
+                result[i] = parsed.to_datetime64()
+    except (TypeError, ValueError, OverflowError):
+        # fechas con zona horaria u otros tipos exóticos: camino celda a celda
+        return s.apply(parse_date)
+    return pd.Series(result, index=s.index, name=s.name)
+
+def parse_float_series(s: pd.Series) -> pd.Series:
+    """Versión vectorizada de ``s.apply(parse_float_local)`` (acepta coma decimal)."""
+    if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+        return s.astype(float)
+    values = s.to_numpy(dtype=object)
+    blank = _blank_mask(values)
+    text = s.astype(str).str.replace(",", ".", regex=False).where(~blank)
+    result = pd.to_numeric(text, errors="coerce").to_numpy(dtype=float, copy=True)
+    # lo que to_numeric no reconoce (p. ej. booleanos) usa la regla celda a celda
+    for i in np.flatnonzero(np.isnan(result) & ~blank):
+        value = parse_float_local(values[i])
+        result[i] = np.nan if value is None else value
+    return pd.Series(result, index=s.index, name=s.name)
+
 def normalize_df(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
     for c in DATE_FIELDS:
         if c in df.columns:
-            df[c] = df[c].apply(parse_date)
+            df[c] = parse_date_series(df[c])
         else:
             df[c] = pd.NaT
     if "evaluacion_numerica" in df.columns:
-        df["evaluacion_numerica"] = df["evaluacion_numerica"].apply(parse_float_local)
+        df["evaluacion_numerica"] = parse_float_series(df["evaluacion_numerica"])
     # rellenar textos
     text_cols = ["nombre_innovacion","potencial_transferencia","estatus","impacto",
                  "nombre_pm","codigo_pm","responsable_pm","estado_pm","activo_pm",
@@ -57,3 +111,14 @@ def add_flags(df: pd.DataFrame) -> pd.DataFrame:
         (df["responsable_innovacion"].str.strip() == "")
     )
     return df
+
+def to_sql_rows(df: pd.DataFrame) -> list[tuple]:
+    """Convert a frame to plain Python tuples with the same encoding to_sql uses."""
+    out = pd.DataFrame(index=df.index)
+    for c in df.columns:
+        col = df[c]
+        if pd.api.types.is_datetime64_any_dtype(col):
+            col = col.dt.strftime(_DB_DATE_FORMAT)
+        col = col.astype(object)
+        out[c] = col.where(col.notna(), None)
+    return list(out.itertuples(index=False, name=None))
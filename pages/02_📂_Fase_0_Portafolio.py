@@ -16,6 +16,8 @@ from pathlib import Path
 
 from datetime import datetime
 
+from itertools import chain
+
 
 
 
@@ -70,7 +72,7 @@ import streamlit as st
 
 
 
-from core import db, utils
+from core import db, exports, portfolio_import, scoring, templates, utils
 from core.data_table import render_table
 from core.theme import load_theme
 
@@ -1661,6 +1663,11 @@ def _template_instructions() -> List[str]:
 
 
 
+
+
+# Versiones de diseño de los builders de abajo (ver core.templates)
+PORTAFOLIO_TEMPLATE_LAYOUT = 1
+INSTRUCTIVO_TEMPLATE_LAYOUT = 1
 
 
 def _build_template_excel(template_df: pd.DataFrame):
@@ -1760,39 +1767,65 @@ def _restore_result_columns(df_new: pd.DataFrame, df_original: pd.DataFrame) ->
     return df_new
 
 
-def _prepare_lookup(df: pd.DataFrame):
-
-
-
-
-
-
-
-    col_key, col_val = df.columns[0], df.columns[-1]
-
-
-
-
 
+def _iter_upload_chunks(chunks, total_rows, progress, portafolio_df, score_tables, invalids):
+    """Normaliza cada bloque de la carga masiva y actualiza la barra de progreso."""
+    base_columns = portafolio_df.columns.tolist()
+    leidas = 0
+    for chunk in chunks:
+        chunk = utils.normalize_df(chunk)
+        columns = base_columns or chunk.columns.tolist()
+        additional_cols = [col for col in chunk.columns if col not in columns]
+        all_columns = list(dict.fromkeys(columns + additional_cols))
+        df_norm = utils.normalize_df(chunk.reindex(columns=all_columns))
+        df_norm, issues = _enforce_catalog_values(df_norm, score_tables)
+        for col, vals in issues.items():
+            invalids.setdefault(col, set()).update(vals)
+        leidas += len(chunk)
+        yield _restore_result_columns(df_norm, portafolio_df)
+        if total_rows:
+            progress.progress(min(leidas / total_rows, 1.0), text=f'Procesadas {leidas:,} de ~{total_rows:,} filas')
+        else:
+            progress.progress(0.0, text=f'Procesadas {leidas:,} filas')
 
+fase1_page = next(Path('pages').glob('03_*_Fase_1_IRL.py'), None)
 
-    mapping = {}
+# Inicializar session_state para portafolio si no existe
+if 'portafolio' not in st.session_state:
+    st.session_state.portafolio = None
+if 'portafolio_loaded_at' not in st.session_state:
+    st.session_state.portafolio_loaded_at = None
 
 
+st.title('Fase 0 - Portafolio y filtro inicial')
 
 
 
 
 
-    for _, row in df.iterrows():
 
 
+st.caption('Carga, normaliza y evalua iniciativas antes de avanzar a la radiografia IRL.')
 
+# Indicador de estado
+col_status1, col_status2, col_status3 = st.columns(3)
+with col_status1:
+    if st.session_state.portafolio is not None and len(st.session_state.portafolio) > 0:
+        st.success(f"🟢 **{len(st.session_state.portafolio)} proyectos** cargados")
+    else:
+        st.info("⚪ **Sin datos** - Descarga la plantilla para empezar")
+with col_status2:
+    if st.session_state.portafolio_loaded_at is not None:
+        st.caption(f"📅 Última carga: {st.session_state.portafolio_loaded_at}")
+    else:
+        st.caption("📅 Sin historial de carga")
+with col_status3:
+    st.caption("💡 Tip: Usa 'Anexar' para agregar proyectos sin borrar los existentes")
 
+st.divider()
 
 
 
-        key = str(row.get(col_key, '')).strip().lower()
 
 
 
@@ -1800,31 +1833,30 @@ def _prepare_lookup(df: pd.DataFrame):
 
 
 
-        try:
 
 
 
 
 
+if 'score_tables' not in st.session_state:
 
 
-            value = float(row.get(col_val, 0))
 
 
 
 
 
+    st.session_state['score_tables'] = _default_tables()
 
 
-        except (TypeError, ValueError):
 
 
 
 
 
+score_tables = st.session_state['score_tables']
 
 
-            value = 0.0
 
 
 
@@ -1832,25 +1864,163 @@ def _prepare_lookup(df: pd.DataFrame):
 
 
 
-        if key:
 
 
 
 
 
 
+with st.expander('⚙️ Configurar tablas de puntaje', expanded=False):
+    st.info('💡 **Fórmula de puntaje:** Estatus + Impacto + Estado PM + Activo PM + Potencial transferencia + Responsable IN + Bono plazo (10 pts si fecha vigente)')
+    
+    # Crear pestañas para organizar las tablas
+    tab1, tab2, tab3 = st.tabs(['📊 Criterios Principales', '🎯 Criterios Secundarios', '📈 Evaluación y Umbrales'])
+    
+    with tab1:
+        st.caption('Configuración de puntajes para los criterios principales de evaluación')
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.markdown('**📍 Estatus**')
+            score_tables['estatus'] = st.data_editor(
+                score_tables['estatus'],
+                num_rows='dynamic',
+                hide_index=True,
+                use_container_width=True,
+                key='tabla_estatus',
+            )
+        
+        with col2:
+            st.markdown('**💥 Impacto**')
+            score_tables['impacto'] = st.data_editor(
+                score_tables['impacto'],
+                num_rows='dynamic',
+                hide_index=True,
+                use_container_width=True,
+                key='tabla_impacto',
+            )
+        
+        with col3:
+            st.markdown('**📋 Estado PM**')
+            score_tables['estado_pm'] = st.data_editor(
+                score_tables['estado_pm'],
+                num_rows='dynamic',
+                hide_index=True,
+                use_container_width=True,
+                key='tabla_estado_pm',
+            )
+    
+    with tab2:
+        st.caption('Configuración de puntajes para criterios complementarios')
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.markdown('**✅ Activo PM**')
+            score_tables['activo_pm'] = st.data_editor(
+                score_tables['activo_pm'],
+                num_rows='dynamic',
+                hide_index=True,
+                use_container_width=True,
+                key='tabla_activo_pm',
+            )
+        
+        with col2:
+            st.markdown('**🔄 Potencial Transferencia**')
+            score_tables['potencial_transferencia'] = st.data_editor(
+                score_tables['potencial_transferencia'],
+                num_rows='dynamic',
+                hide_index=True,
+                use_container_width=True,
+                key='tabla_potencial_transferencia',
+            )
+        
+        with col3:
+            st.markdown('**👤 Tiene Resp IN**')
+            score_tables['tiene_resp_in'] = st.data_editor(
+                score_tables['tiene_resp_in'],
+                num_rows='dynamic',
+                hide_index=True,
+                use_container_width=True,
+                key='tabla_tiene_resp_in',
+            )
+    
+    with tab3:
+        st.caption('Define los umbrales de evaluación para categorizar proyectos según su puntaje')
+        st.markdown('**📊 Evaluación y Umbrales**')
+        score_tables['evaluacion'] = st.data_editor(
+            score_tables['evaluacion'],
+            num_rows='dynamic',
+            hide_index=True,
+            use_container_width=True,
+            key='tabla_evaluacion',
+        )
 
-            mapping[key] = value
+portafolio_df = db.fetch_portfolio()
 
+# ============================================================================
+# SECCIÓN: GESTIÓN DE PORTAFOLIO
+# ============================================================================
 
+st.markdown('---')
+st.markdown('### 📁 Gestión de Portafolio')
 
+col_reset, col_ejemplo, col_plantilla, col_instructivo = st.columns(4)
 
+with col_reset:
+    st.markdown("**🔄 Resetear**")
+    if st.button("Resetear", use_container_width=True, type="secondary", key="btn_reset", disabled=portafolio_df.empty):
+        empty_df = pd.DataFrame(columns=portafolio_df.columns) if not portafolio_df.empty else pd.DataFrame()
+        db.replace_all(empty_df)
+        for key in list(st.session_state.keys()):
+            if any(x in key.lower() for x in ['ranking', 'fase', 'portafolio', 'payload']):
+                del st.session_state[key]
+        st.rerun()
 
+with col_ejemplo:
+    st.markdown("**🎯 Ejemplo**")
+    if st.button("Cargar", use_container_width=True, type="primary", key="btn_ejemplo"):
+        sample = utils.normalize_df(_sample_portafolio())
+        db.replace_all(sample)
+        for key in ['ranking', 'fase1_payload', 'fase0_resultado']:
+            st.session_state.pop(key, None)
+        st.toast("✅ Ejemplo cargado correctamente", icon="✅")
+        st.rerun()
 
+with col_plantilla:
+    st.markdown("**📥 Plantilla**")
+    template_df = _portafolio_template()
+    template_xlsx = templates.get_template(
+        "portafolio",
+        templates.catalog_version(PORTAFOLIO_TEMPLATE_LAYOUT, list(template_df.columns)),
+        lambda: _build_template_excel(template_df),
+        persist=True,
+    )
+    if template_xlsx:
+        st.download_button('Descargar', data=template_xlsx, file_name=f'plantilla.xlsx',
+                          mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                          key='btn_template', use_container_width=True)
 
-    return mapping
+with col_instructivo:
+    st.markdown("**📖 Instructivo**")
+    instructivo_lines = _template_instructions()
+    instructivo_xlsx = templates.get_template(
+        "instructivo_portafolio",
+        templates.catalog_version(INSTRUCTIVO_TEMPLATE_LAYOUT, instructivo_lines),
+        lambda: _build_instructive_excel(instructivo_lines),
+        persist=True,
+    )
+    if instructivo_xlsx:
+        st.download_button('Descargar', data=instructivo_xlsx, file_name=f'instructivo.xlsx',
+                          mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                          key='btn_instructivo', use_container_width=True)
 
+st.markdown('---')
+st.markdown('### 📤 Carga Masiva')
+st.caption('Sube un archivo Excel o CSV con múltiples proyectos')
 
+uploaded_file = st.file_uploader(
+    'Selecciona archivo',
+    type=['csv', 'xlsx', 'xls'],
 
 
 
@@ -1858,6 +2028,7 @@ def _prepare_lookup(df: pd.DataFrame):
 
 
 
+    key='upload_portafolio',
 
 
 
@@ -1865,6 +2036,7 @@ def _prepare_lookup(df: pd.DataFrame):
 
 
 
+)
 
 
 
@@ -1872,20 +2044,6 @@ def _prepare_lookup(df: pd.DataFrame):
 
 
 
-def _thresholds(df_eval: pd.DataFrame):
-    lookup = _prepare_lookup(df_eval)
-    baja = lookup.get('baja', 0.0)
-    media = lookup.get('media', 50.0)
-    alta = lookup.get('alta', 100.0)
-    if media < baja:
-        media = baja
-    if alta < media:
-        alta = media
-    return {
-        'baja': baja,
-        'media': media,
-        'alta': alta,
-    }
 
 
 
@@ -1894,22 +2052,23 @@ def _thresholds(df_eval: pd.DataFrame):
 
 
 
+if uploaded_file is not None:
 
-def _buscar_valor(value, lookup):
 
 
 
 
 
 
+    action = st.radio(
 
-    return lookup.get(str(value or '').strip().lower(), 0.0)
 
 
 
 
 
 
+        'Como aplicar la carga?',
 
 
 
@@ -1917,6 +2076,7 @@ def _buscar_valor(value, lookup):
 
 
 
+        ('Reemplazar portafolio actual', 'Anexar al portafolio actual'),
 
 
 
@@ -1924,66 +2084,119 @@ def _buscar_valor(value, lookup):
 
 
 
+        key='upload_action',
 
 
 
-def _parse_fecha(value):
 
 
 
 
+    )
 
 
 
-    if not value or pd.isna(value):
 
 
 
 
+    if not HAS_OPENPYXL and uploaded_file.name.lower().endswith(('xlsx', 'xls')):
 
 
 
-        return None
 
 
 
 
+        st.error('No es posible leer archivos Excel porque openpyxl no esta instalado.')
 
 
 
-    try:
 
 
 
 
+    elif st.button('Aplicar carga del archivo', key='btn_aplicar_carga', use_container_width=True):
 
 
 
-        return pd.to_datetime(value)
 
 
 
 
+        try:
+            chunks, total_filas = portfolio_import.read_upload_chunks(uploaded_file, uploaded_file.name)
+            primer_bloque = next(chunks, None)
+            if primer_bloque is None or primer_bloque.empty:
+                st.warning('El archivo no contiene registros.', icon='⚠️')
+            else:
+                anexar = action == 'Anexar al portafolio actual' and not portafolio_df.empty
+                invalids: dict[str, set] = {}
+                progreso = st.progress(0.0, text='Procesando archivo...')
+                # Cada bloque se normaliza y se escribe antes de leer el siguiente
+                bloques = _iter_upload_chunks(
+                    chain([primer_bloque], chunks), total_filas, progreso,
+                    portafolio_df, score_tables, invalids,
+                )
+                if anexar:
+                    # Solo se escriben las filas nuevas o modificadas (upsert por id_innovacion)
+                    stats = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+                    for bloque in bloques:
+                        for key, value in db.upsert_merge(bloque).items():
+                            stats[key] += value
+                    resumen_carga = (
+                        f" ({stats['inserted']} nuevos, {stats['updated']} actualizados, "
+                        f"{stats['unchanged']} sin cambios)"
+                    )
+                else:
+                    db.replace_all_chunked(bloques)
+                    resumen_carga = ''
+                progreso.empty()
+                portafolio_df = db.fetch_portfolio()
+                if invalids:
+                    details = ' | '.join(f"{col}: {', '.join(sorted(vals))}" for col, vals in invalids.items())
+                    st.warning(f'Valores fuera de catalogo detectados en la carga: {details}. Se limpiaron para revision.')
+                st.session_state['portafolio_loaded_at'] = datetime.now().strftime("%Y-%m-%d %H:%M")
+                st.session_state.pop('fase0_result', None)
+                st.session_state.pop('fase1_payload', None)
+                st.session_state.pop('fase1_ready', None)
+                st.success(f'Portafolio actualizado correctamente desde la carga de archivo{resumen_carga}.')
 
+        except Exception as exc:
 
+            st.error(f'No se pudo procesar el archivo: {exc}')
 
-    except Exception:
 
 
 
 
 
 
+else:
 
-        return None
 
 
 
 
 
 
+    st.caption('Selecciona un archivo para activar la carga masiva.')
 
+st.markdown('---')
+st.markdown('### 📝 Editor de Proyectos')
+st.caption('Visualiza y edita manualmente los proyectos de tu portafolio')
 
+display_df = portafolio_df.drop(columns=RESULT_COLUMNS, errors='ignore')
+with st.expander('📋 Ver tabla de proyectos', expanded=True):
+    portafolio_editado = st.data_editor(
+        display_df,
+        num_rows='dynamic',
+        hide_index=True,
+        use_container_width=True,
+        column_config=_portafolio_column_config(score_tables),
+        key='editor_portafolio',
+    )
+    st.markdown('</div>', unsafe_allow_html=True)
 
 
 
@@ -1999,7 +2212,7 @@ def _parse_fecha(value):
 
 
 
-def calcular_puntaje(row, tablas):
+if st.button('Guardar portafolio', key='btn_guardar_portafolio'):
 
 
 
@@ -2007,7 +2220,7 @@ def calcular_puntaje(row, tablas):
 
 
 
-    activo = str(row.get('activo_pm', '')).strip().lower()
+    try:
 
 
 
@@ -2015,7 +2228,14 @@ def calcular_puntaje(row, tablas):
 
 
 
-    estado = str(row.get('estado_pm', '')).strip().lower()
+        df_norm = utils.normalize_df(portafolio_editado)
+        df_norm, invalids = _enforce_catalog_values(df_norm, score_tables)
+        df_norm = _restore_result_columns(df_norm, portafolio_df)
+        if invalids:
+            details = ' | '.join(f"{col}: {', '.join(vals)}" for col, vals in invalids.items())
+            st.warning(f'Valores fuera de catalogo corregidos: {details}. Revisa y ajusta antes de guardar nuevamente.')
+        db.replace_all(df_norm)
+        portafolio_df = df_norm
 
 
 
@@ -2023,7 +2243,9 @@ def calcular_puntaje(row, tablas):
 
 
 
-    if activo == 'no' or estado == 'cerrado':
+        st.session_state.pop('fase0_result', None)
+        st.session_state.pop('fase1_payload', None)
+        st.session_state.pop('fase1_ready', None)
 
 
 
@@ -2031,7 +2253,7 @@ def calcular_puntaje(row, tablas):
 
 
 
-        return 0.0
+        st.success('Portafolio actualizado correctamente.')
 
 
 
@@ -2039,7 +2261,7 @@ def calcular_puntaje(row, tablas):
 
 
 
-    total = 0.0
+    except Exception as exc:
 
 
 
@@ -2047,7 +2269,7 @@ def calcular_puntaje(row, tablas):
 
 
 
-    total += _buscar_valor(row.get('estatus'), tablas['estatus'])
+        st.error(f'Error al guardar: {exc}')
 
 
 
@@ -2055,7 +2277,6 @@ def calcular_puntaje(row, tablas):
 
 
 
-    total += _buscar_valor(row.get('impacto'), tablas['impacto'])
 
 
 
@@ -2063,23 +2284,22 @@ def calcular_puntaje(row, tablas):
 
 
 
-    total += _buscar_valor(row.get('estado_pm'), tablas['estado_pm'])
 
+st.markdown('</div>', unsafe_allow_html=True)
 
 
 
 
 
 
-    total += _buscar_valor(row.get('potencial_transferencia'), tablas['potencial_transferencia'])
 
+st.divider()
 
 
 
 
 
 
-    total += _buscar_valor(row.get('activo_pm'), tablas['activo_pm'])
 
 
 
@@ -2087,31 +2307,30 @@ def calcular_puntaje(row, tablas):
 
 
 
-    total += _buscar_valor(row.get('tiene_resp_in'), tablas['tiene_resp_in'])
 
 
+st.markdown('<div class="section-card">', unsafe_allow_html=True)
 
 
 
 
 
-    fecha = _parse_fecha(row.get('fecha_termino_pm'))
 
 
+st.markdown('### Calculo de candidatos')
 
 
 
 
 
-    if fecha is not None and pd.Timestamp(datetime.now().date()) <= fecha.normalize():
 
 
+st.caption('La estimacion usa los puntajes configurados y otorga un bono si la fecha declarada sigue vigente.')
 
 
 
 
 
-        total += 10.0
 
 
 
@@ -2119,10 +2338,13 @@ def calcular_puntaje(row, tablas):
 
 
 
-    return total
 
 
 
+# Verificar si hay datos cargados
+if portafolio_df.empty:
+    st.info('⚪ No hay proyectos cargados. Carga datos de ejemplo o un archivo para calcular el ranking.')
+elif st.button('Calcular ranking de candidatos', key='btn_calcular'):
 
 
 
@@ -2130,6 +2352,7 @@ def calcular_puntaje(row, tablas):
 
 
 
+    df_eval = db.fetch_portfolio()
 
 
 
@@ -2137,85 +2360,86 @@ def calcular_puntaje(row, tablas):
 
 
 
+    if df_eval.empty:
 
 
 
 
 
 
-def generar_recomendacion(row, puntaje, tablas):
 
+        st.warning('No hay proyectos para evaluar.')
 
 
 
 
 
 
-    partes = []
 
+    else:
 
 
 
 
 
 
-    estado = str(row.get('estado_pm', '')).strip().lower()
 
+        columnas = ['estatus', 'impacto', 'estado_pm', 'activo_pm', 'potencial_transferencia', 'tiene_resp_in', 'fecha_termino_pm']
 
 
 
 
 
 
-    if estado == 'cerrado':
 
+        for col in columnas:
 
 
 
 
 
 
-        partes.append('Proy. cerrado')
 
+            if col not in df_eval.columns:
 
 
 
 
 
 
-    fecha = _parse_fecha(row.get('fecha_termino_pm'))
 
+                df_eval[col] = ''
 
+        df_eval = scoring.evaluate_portfolio(df_eval, score_tables)
 
 
 
 
 
-    if fecha is not None:
 
 
+        df_eval = df_eval.sort_values('evaluacion_calculada', ascending=False).reset_index(drop=True)
 
 
 
 
 
-        if pd.Timestamp(datetime.now().date()) > fecha.normalize():
 
 
+        df_eval['ranking'] = np.arange(1, len(df_eval) + 1)
 
 
 
 
 
-            partes.append('Fuera de plazo')
 
 
+        st.session_state['fase0_result'] = df_eval
 
 
 
 
 
-        else:
 
 
 
@@ -2223,975 +2447,42 @@ def generar_recomendacion(row, puntaje, tablas):
 
 
 
-            partes.append('Dentro de plazo')
 
 
 
+resultado = st.session_state.get('fase0_result')
 
 
 
 
-    if str(row.get('impacto', '')).strip().lower() == 'alto':
 
 
 
+if resultado is not None and not resultado.empty:
 
 
 
 
-        partes.append('Impacto alto')
 
 
 
+    umbrales = scoring.thresholds(score_tables['evaluacion'])
 
 
 
 
-    if str(row.get('tiene_resp_in', '')).strip().lower() == 'no':
 
 
 
+    total = len(resultado)
 
 
 
 
-        partes.append('Sin Resp IN')
 
 
 
-
-
-
-
-    umbrales = _thresholds(tablas['evaluacion'])
-    media_lim = umbrales['media']
-    alta_lim = umbrales['alta']
-    if puntaje <= media_lim:
-        partes.append('Prioridad baja')
-    elif puntaje <= alta_lim:
-        partes.append('Prioridad media')
-    else:
-        partes.append('Prioridad alta')
-
-
-
-
-
-
-
-    return '; '.join(partes)
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-fase1_page = next(Path('pages').glob('03_*_Fase_1_IRL.py'), None)
-
-# Inicializar session_state para portafolio si no existe
-if 'portafolio' not in st.session_state:
-    st.session_state.portafolio = None
-if 'portafolio_loaded_at' not in st.session_state:
-    st.session_state.portafolio_loaded_at = None
-
-
-st.title('Fase 0 - Portafolio y filtro inicial')
-
-
-
-
-
-
-
-st.caption('Carga, normaliza y evalua iniciativas antes de avanzar a la radiografia IRL.')
-
-# Indicador de estado
-col_status1, col_status2, col_status3 = st.columns(3)
-with col_status1:
-    if st.session_state.portafolio is not None and len(st.session_state.portafolio) > 0:
-        st.success(f"🟢 **{len(st.session_state.portafolio)} proyectos** cargados")
-    else:
-        st.info("⚪ **Sin datos** - Descarga la plantilla para empezar")
-with col_status2:
-    if st.session_state.portafolio_loaded_at is not None:
-        st.caption(f"📅 Última carga: {st.session_state.portafolio_loaded_at}")
-    else:
-        st.caption("📅 Sin historial de carga")
-with col_status3:
-    st.caption("💡 Tip: Usa 'Anexar' para agregar proyectos sin borrar los existentes")
-
-st.divider()
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-if 'score_tables' not in st.session_state:
-
-
-
-
-
-
-
-    st.session_state['score_tables'] = _default_tables()
-
-
-
-
-
-
-
-score_tables = st.session_state['score_tables']
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-with st.expander('⚙️ Configurar tablas de puntaje', expanded=False):
-    st.info('💡 **Fórmula de puntaje:** Estatus + Impacto + Estado PM + Activo PM + Potencial transferencia + Responsable IN + Bono plazo (10 pts si fecha vigente)')
-    
-    # Crear pestañas para organizar las tablas
-    tab1, tab2, tab3 = st.tabs(['📊 Criterios Principales', '🎯 Criterios Secundarios', '📈 Evaluación y Umbrales'])
-    
-    with tab1:
-        st.caption('Configuración de puntajes para los criterios principales de evaluación')
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.markdown('**📍 Estatus**')
-            score_tables['estatus'] = st.data_editor(
-                score_tables['estatus'],
-                num_rows='dynamic',
-                hide_index=True,
-                use_container_width=True,
-                key='tabla_estatus',
-            )
-        
-        with col2:
-            st.markdown('**💥 Impacto**')
-            score_tables['impacto'] = st.data_editor(
-                score_tables['impacto'],
-                num_rows='dynamic',
-                hide_index=True,
-                use_container_width=True,
-                key='tabla_impacto',
-            )
-        
-        with col3:
-            st.markdown('**📋 Estado PM**')
-            score_tables['estado_pm'] = st.data_editor(
-                score_tables['estado_pm'],
-                num_rows='dynamic',
-                hide_index=True,
-                use_container_width=True,
-                key='tabla_estado_pm',
-            )
-    
-    with tab2:
-        st.caption('Configuración de puntajes para criterios complementarios')
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.markdown('**✅ Activo PM**')
-            score_tables['activo_pm'] = st.data_editor(
-                score_tables['activo_pm'],
-                num_rows='dynamic',
-                hide_index=True,
-                use_container_width=True,
-                key='tabla_activo_pm',
-            )
-        
-        with col2:
-            st.markdown('**🔄 Potencial Transferencia**')
-            score_tables['potencial_transferencia'] = st.data_editor(
-                score_tables['potencial_transferencia'],
-                num_rows='dynamic',
-                hide_index=True,
-                use_container_width=True,
-                key='tabla_potencial_transferencia',
-            )
-        
-        with col3:
-            st.markdown('**👤 Tiene Resp IN**')
-            score_tables['tiene_resp_in'] = st.data_editor(
-                score_tables['tiene_resp_in'],
-                num_rows='dynamic',
-                hide_index=True,
-                use_container_width=True,
-                key='tabla_tiene_resp_in',
-            )
-    
-    with tab3:
-        st.caption('Define los umbrales de evaluación para categorizar proyectos según su puntaje')
-        st.markdown('**📊 Evaluación y Umbrales**')
-        score_tables['evaluacion'] = st.data_editor(
-            score_tables['evaluacion'],
-            num_rows='dynamic',
-            hide_index=True,
-            use_container_width=True,
-            key='tabla_evaluacion',
-        )
-
-portafolio_df = utils.normalize_df(db.fetch_df())
-
-# ============================================================================
-# SECCIÓN: GESTIÓN DE PORTAFOLIO
-# ============================================================================
-
-st.markdown('---')
-st.markdown('### 📁 Gestión de Portafolio')
-
-col_reset, col_ejemplo, col_plantilla, col_instructivo = st.columns(4)
-
-with col_reset:
-    st.markdown("**🔄 Resetear**")
-    if st.button("Resetear", use_container_width=True, type="secondary", key="btn_reset", disabled=portafolio_df.empty):
-        empty_df = pd.DataFrame(columns=portafolio_df.columns) if not portafolio_df.empty else pd.DataFrame()
-        db.replace_all(empty_df)
-        for key in list(st.session_state.keys()):
-            if any(x in key.lower() for x in ['ranking', 'fase', 'portafolio', 'payload']):
-                del st.session_state[key]
-        st.cache_data.clear()
-        st.rerun()
-
-with col_ejemplo:
-    st.markdown("**🎯 Ejemplo**")
-    if st.button("Cargar", use_container_width=True, type="primary", key="btn_ejemplo"):
-        sample = utils.normalize_df(_sample_portafolio())
-        db.replace_all(sample)
-        for key in ['ranking', 'fase1_payload', 'fase0_resultado']:
-            st.session_state.pop(key, None)
-        st.toast("✅ Ejemplo cargado correctamente", icon="✅")
-        st.rerun()
-
-with col_plantilla:
-    st.markdown("**📥 Plantilla**")
-    template_xlsx = _build_template_excel(_portafolio_template())
-    if template_xlsx:
-        st.download_button('Descargar', data=template_xlsx, file_name=f'plantilla.xlsx',
-                          mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                          key='btn_template', use_container_width=True)
-
-with col_instructivo:
-    st.markdown("**📖 Instructivo**")
-    instructivo_xlsx = _build_instructive_excel(_template_instructions())
-    if instructivo_xlsx:
-        st.download_button('Descargar', data=instructivo_xlsx, file_name=f'instructivo.xlsx',
-                          mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                          key='btn_instructivo', use_container_width=True)
-
-st.markdown('---')
-st.markdown('### 📤 Carga Masiva')
-st.caption('Sube un archivo Excel o CSV con múltiples proyectos')
-
-uploaded_file = st.file_uploader(
-    'Selecciona archivo',
-    type=['csv', 'xlsx', 'xls'],
-
-
-
-
-
-
-
-    key='upload_portafolio',
-
-
-
-
-
-
-
-)
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-if uploaded_file is not None:
-
-
-
-
-
-
-
-    action = st.radio(
-
-
-
-
-
-
-
-        'Como aplicar la carga?',
-
-
-
-
-
-
-
-        ('Reemplazar portafolio actual', 'Anexar al portafolio actual'),
-
-
-
-
-
-
-
-        key='upload_action',
-
-
-
-
-
-
-
-    )
-
-
-
-
-
-
-
-    if not HAS_OPENPYXL and uploaded_file.name.lower().endswith(('xlsx', 'xls')):
-
-
-
-
-
-
-
-        st.error('No es posible leer archivos Excel porque openpyxl no esta instalado.')
-
-
-
-
-
-
-
-    elif st.button('Aplicar carga del archivo', key='btn_aplicar_carga', use_container_width=True):
-
-
-
-
-
-
-
-        try:
-
-
-
-
-
-
-
-            if uploaded_file.name.lower().endswith('.csv'):
-
-
-
-
-
-
-
-                df_import = pd.read_csv(uploaded_file)
-
-
-
-
-
-
-
-            else:
-
-
-
-
-
-
-
-                df_import = pd.read_excel(uploaded_file)
-
-
-
-
-
-
-
-            if df_import.empty:
-
-
-
-
-
-
-
-                st.warning('El archivo no contiene registros.', icon='⚠️')
-
-
-
-
-
-
-
-            else:
-
-
-
-
-
-
-
-                df_import = utils.normalize_df(df_import)
-
-
-
-
-
-
-
-                base_columns = portafolio_df.columns.tolist()
-
-
-
-
-
-
-
-                if not base_columns:
-
-
-
-
-
-
-
-                    base_columns = df_import.columns.tolist()
-
-
-
-
-
-
-
-                additional_cols = [col for col in df_import.columns if col not in base_columns]
-
-
-
-
-
-
-
-                all_columns = list(dict.fromkeys(base_columns + additional_cols))
-
-
-
-
-
-
-
-                if action == 'Anexar al portafolio actual' and not portafolio_df.empty:
-
-
-
-
-
-
-
-                    existing_aligned = portafolio_df.reindex(columns=all_columns)
-
-
-
-
-
-
-
-                    import_aligned = df_import.reindex(columns=all_columns)
-
-
-
-
-
-
-
-                    combined = pd.concat([existing_aligned, import_aligned], ignore_index=True)
-
-
-
-
-
-
-
-                else:
-
-
-
-
-
-
-
-                    combined = df_import.reindex(columns=all_columns)
-
-
-
-
-
-
-
-                df_norm = utils.normalize_df(combined)
-                df_norm, invalids = _enforce_catalog_values(df_norm, score_tables)
-                df_norm = _restore_result_columns(df_norm, portafolio_df)
-                if invalids:
-                    details = ' | '.join(f"{col}: {', '.join(vals)}" for col, vals in invalids.items())
-                    st.warning(f'Valores fuera de catalogo detectados en la carga: {details}. Se limpiaron para revision.')
-                db.replace_all(df_norm)
-                portafolio_df = df_norm
-                st.session_state['portafolio_loaded_at'] = datetime.now().strftime("%Y-%m-%d %H:%M")
-                st.session_state.pop('fase0_result', None)
-                st.session_state.pop('fase1_payload', None)
-                st.session_state.pop('fase1_ready', None)
-
-
-
-
-
-
-
-                st.success('Portafolio actualizado correctamente desde la carga de archivo.')
-
-
-
-
-
-
-
-        except Exception as exc:
-
-
-
-
-
-
-
-            st.error(f'No se pudo procesar el archivo: {exc}')
-
-
-
-
-
-
-
-else:
-
-
-
-
-
-
-
-    st.caption('Selecciona un archivo para activar la carga masiva.')
-
-st.markdown('---')
-st.markdown('### 📝 Editor de Proyectos')
-st.caption('Visualiza y edita manualmente los proyectos de tu portafolio')
-
-display_df = portafolio_df.drop(columns=RESULT_COLUMNS, errors='ignore')
-with st.expander('📋 Ver tabla de proyectos', expanded=True):
-    portafolio_editado = st.data_editor(
-        display_df,
-        num_rows='dynamic',
-        hide_index=True,
-        use_container_width=True,
-        column_config=_portafolio_column_config(score_tables),
-        key='editor_portafolio',
-    )
-    st.markdown('</div>', unsafe_allow_html=True)
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-if st.button('Guardar portafolio', key='btn_guardar_portafolio'):
-
-
-
-
-
-
-
-    try:
-
-
-
-
-
-
-
-        df_norm = utils.normalize_df(portafolio_editado)
-        df_norm, invalids = _enforce_catalog_values(df_norm, score_tables)
-        df_norm = _restore_result_columns(df_norm, portafolio_df)
-        if invalids:
-            details = ' | '.join(f"{col}: {', '.join(vals)}" for col, vals in invalids.items())
-            st.warning(f'Valores fuera de catalogo corregidos: {details}. Revisa y ajusta antes de guardar nuevamente.')
-        db.replace_all(df_norm)
-        portafolio_df = df_norm
-
-
-
-
-
-
-
-        st.session_state.pop('fase0_result', None)
-        st.session_state.pop('fase1_payload', None)
-        st.session_state.pop('fase1_ready', None)
-
-
-
-
-
-
-
-        st.success('Portafolio actualizado correctamente.')
-
-
-
-
-
-
-
-    except Exception as exc:
-
-
-
-
-
-
-
-        st.error(f'Error al guardar: {exc}')
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-st.markdown('</div>', unsafe_allow_html=True)
-
-
-
-
-
-
-
-st.divider()
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-st.markdown('<div class="section-card">', unsafe_allow_html=True)
-
-
-
-
-
-
-
-st.markdown('### Calculo de candidatos')
-
-
-
-
-
-
-
-st.caption('La estimacion usa los puntajes configurados y otorga un bono si la fecha declarada sigue vigente.')
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-# Verificar si hay datos cargados
-if portafolio_df.empty:
-    st.info('⚪ No hay proyectos cargados. Carga datos de ejemplo o un archivo para calcular el ranking.')
-elif st.button('Calcular ranking de candidatos', key='btn_calcular'):
-
-
-
-
-
-
-
-    df_eval = utils.normalize_df(db.fetch_df())
-
-
-
-
-
-
-
-    if df_eval.empty:
-
-
-
-
-
-
-
-        st.warning('No hay proyectos para evaluar.')
-
-
-
-
-
-
-
-    else:
-
-
-
-
-
-
-
-        columnas = ['estatus', 'impacto', 'estado_pm', 'activo_pm', 'potencial_transferencia', 'tiene_resp_in', 'fecha_termino_pm']
-
-
-
-
-
-
-
-        for col in columnas:
-
-
-
-
-
-
-
-            if col not in df_eval.columns:
-
-
-
-
-
-
-
-                df_eval[col] = ''
-
-        # Definir pares de columnas para lookups
-        pairs = [
-            ('estatus', 'Estatus'),
-            ('impacto', 'Impacto'),
-            ('estado_pm', 'Estado PM'),
-            ('activo_pm', 'Activo PM'),
-            ('potencial_transferencia', 'Potencial transferencia'),
-            ('tiene_resp_in', 'Tiene Resp IN'),
-        ]
-
-        lookups = {key: _prepare_lookup(score_tables[key]) for key, _ in pairs}
-
-
-
-
-
-
-
-        df_eval['evaluacion_calculada'] = df_eval.apply(lambda row: calcular_puntaje(row, lookups), axis=1)
-
-
-
-
-
-
-
-        df_eval['recomendacion'] = df_eval.apply(
-
-
-
-
-
-
-
-            lambda row: generar_recomendacion(row, row['evaluacion_calculada'], score_tables),
-
-
-
-
-
-
-
-            axis=1,
-
-
-
-
-
-
-
-        )
-
-
-
-
-
-
-
-        df_eval = df_eval.sort_values('evaluacion_calculada', ascending=False).reset_index(drop=True)
-
-
-
-
-
-
-
-        df_eval['ranking'] = np.arange(1, len(df_eval) + 1)
-
-
-
-
-
-
-
-        st.session_state['fase0_result'] = df_eval
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-resultado = st.session_state.get('fase0_result')
-
-
-
-
-
-
-
-if resultado is not None and not resultado.empty:
-
-
-
-
-
-
-
-    umbrales = _thresholds(score_tables['evaluacion'])
-
-
-
-
-
-
-
-    total = len(resultado)
-
-
-
-
-
-
-
-    candidatos_media = int((resultado['evaluacion_calculada'] > umbrales['media']).sum())
+    candidatos_media = int((resultado['evaluacion_calculada'] > umbrales['media']).sum())
 
 
 
@@ -3339,111 +2630,112 @@ if resultado is not None and not resultado.empty:
         )
 
         if HAS_OPENPYXL:
-            eval_buffer = BytesIO()
-
-            with pd.ExcelWriter(eval_buffer, engine='openpyxl') as writer:
-                resultado.to_excel(writer, index=False, sheet_name='Evaluacion')
-
-                resumen_df = pd.DataFrame([
-                    {'Indicador': 'Total proyectos', 'Valor': total},
-                    {'Indicador': 'Candidatos >= prioridad media', 'Valor': candidatos_media},
-                    {'Indicador': 'Puntaje maximo', 'Valor': f"{resultado['evaluacion_calculada'].max():.1f}"},
-                    {'Indicador': 'Puntaje promedio', 'Valor': f"{resultado['evaluacion_calculada'].mean():.1f}"},
-                    {'Indicador': 'Umbral prioridad baja', 'Valor': umbrales['baja']},
-                    {'Indicador': 'Umbral prioridad media', 'Valor': umbrales['media']},
-                    {'Indicador': 'Umbral prioridad alta', 'Valor': umbrales['alta']},
-                ])
-
-                resumen_df.to_excel(writer, index=False, sheet_name='Resumen')
-
-                fase2_sheet_name = 'Fase 2 EBCT'
-                fase2_intro_lines = [
-                    'Objetivos de la plataforma',
-                    '• Guiar EBCT desde la ideación hasta la internacionalización.',
-                    '• Visualizar la hoja de ruta con etapas, capacidades y próximos pasos según su madurez.',
-                    '• Identificar fuentes de financiamiento, programas y aliados clave.',
-                    '• Reducir la incertidumbre para mejorar la gestión estratégica de las EBCT.',
-                    '• Detectar brechas y saturación para orientar coordinación pública.',
-                    'Hito objetivo: Agosto 2025',
-                    '',
-                    'Funcionalidades clave',
-                    '• Mapa base de actores por región (universidades, OTL, incubadoras, fondos).',
-                    '• Rutas personalizadas según autodiagnóstico tecnológico y comercial.',
-                    '• Directorio actualizado de programas y financiamiento con filtros.',
-                    '• Canal de vinculación con instituciones del ecosistema.',
-                    '• Seguimiento del avance, contactos y resultados.',
-                    '• Visualización clara desde investigación hasta mercados.',
-                    '',
-                    'Público objetivo',
-                    '• Equipos científicos que inician valorización tecnológica.',
-                    '• Spin-offs en validación técnica o comercial.',
-                    '• Startups tecnológicas que buscan clientes o inversión.',
-                    '• EBCT consolidadas que requieren apoyo para escalar o internacionalizarse.',
-                    '• Actores de apoyo que necesitan información integrada del ecosistema.',
-                    '• Abierta a proyectos dinámicos con alto nivel de innovación.',
-                    '',
-                    'Evaluación de trayectoria (proyecto seleccionado)',
-                ]
-
-                fase2_sheet = writer.book.create_sheet(title=fase2_sheet_name)
-                writer.sheets[fase2_sheet_name] = fase2_sheet
-
-                if Alignment is not None:
-                    fase2_sheet.column_dimensions['A'].width = 105
-
-                for idx, line in enumerate(fase2_intro_lines, start=1):
-                    cell = fase2_sheet.cell(row=idx, column=1, value=line)
-                    if Alignment is not None:
-                        cell.alignment = Alignment(wrap_text=True, vertical='top')
-
-                selection_columns = [
-                    'ranking',
-                    'id_innovacion',
-                    'nombre_innovacion',
-                    'potencial_transferencia',
-                    'impacto',
-                    'estatus',
-                    'responsable_innovacion',
-                    'evaluacion_calculada',
-                    'recomendacion',
-                ]
-                available_columns = [col for col in selection_columns if col in resultado.columns]
-
-                if available_columns and not resultado.empty:
-                    orden_df = resultado.sort_values('ranking') if 'ranking' in resultado.columns else resultado
-                    seleccion_df = orden_df.loc[:, available_columns].head(1).copy()
-
-                    if 'evaluacion_calculada' in seleccion_df.columns:
-                        seleccion_df.loc[:, 'evaluacion_calculada'] = pd.to_numeric(
-                            seleccion_df['evaluacion_calculada'], errors='coerce'
-                        ).round(1)
-
-                    column_labels = {
-                        'ranking': 'Ranking fase 0',
-                        'id_innovacion': 'ID innovación',
-                        'nombre_innovacion': 'Proyecto seleccionado',
-                        'potencial_transferencia': 'Potencial de transferencia',
-                        'impacto': 'Impacto estratégico',
-                        'estatus': 'Estado actual',
-                        'responsable_innovacion': 'Responsable de innovación',
-                        'evaluacion_calculada': 'Evaluación Fase 0',
-                        'recomendacion': 'Recomendación automática',
-                    }
-                    seleccion_df = seleccion_df.rename(columns=column_labels)
-
-                    seleccion_df.to_excel(
-                        writer,
-                        index=False,
-                        sheet_name=fase2_sheet_name,
-                        startrow=len(fase2_intro_lines),
-                    )
+            resumen_df = pd.DataFrame([
+                {'Indicador': 'Total proyectos', 'Valor': total},
+                {'Indicador': 'Candidatos >= prioridad media', 'Valor': candidatos_media},
+                {'Indicador': 'Puntaje maximo', 'Valor': f"{resultado['evaluacion_calculada'].max():.1f}"},
+                {'Indicador': 'Puntaje promedio', 'Valor': f"{resultado['evaluacion_calculada'].mean():.1f}"},
+                {'Indicador': 'Umbral prioridad baja', 'Valor': umbrales['baja']},
+                {'Indicador': 'Umbral prioridad media', 'Valor': umbrales['media']},
+                {'Indicador': 'Umbral prioridad alta', 'Valor': umbrales['alta']},
+            ])
+
+            def _build_evaluacion_excel() -> bytes:
+                eval_buffer = BytesIO()
+                with pd.ExcelWriter(eval_buffer, engine='openpyxl') as writer:
+                    resultado.to_excel(writer, index=False, sheet_name='Evaluacion')
+                    resumen_df.to_excel(writer, index=False, sheet_name='Resumen')
+
+                    fase2_sheet_name = 'Fase 2 EBCT'
+                    fase2_intro_lines = [
+                        'Objetivos de la plataforma',
+                        '• Guiar EBCT desde la ideación hasta la internacionalización.',
+                        '• Visualizar la hoja de ruta con etapas, capacidades y próximos pasos según su madurez.',
+                        '• Identificar fuentes de financiamiento, programas y aliados clave.',
+                        '• Reducir la incertidumbre para mejorar la gestión estratégica de las EBCT.',
+                        '• Detectar brechas y saturación para orientar coordinación pública.',
+                        'Hito objetivo: Agosto 2025',
+                        '',
+                        'Funcionalidades clave',
+                        '• Mapa base de actores por región (universidades, OTL, incubadoras, fondos).',
+                        '• Rutas personalizadas según autodiagnóstico tecnológico y comercial.',
+                        '• Directorio actualizado de programas y financiamiento con filtros.',
+                        '• Canal de vinculación con instituciones del ecosistema.',
+                        '• Seguimiento del avance, contactos y resultados.',
+                        '• Visualización clara desde investigación hasta mercados.',
+                        '',
+                        'Público objetivo',
+                        '• Equipos científicos que inician valorización tecnológica.',
+                        '• Spin-offs en validación técnica o comercial.',
+                        '• Startups tecnológicas que buscan clientes o inversión.',
+                        '• EBCT consolidadas que requieren apoyo para escalar o internacionalizarse.',
+                        '• Actores de apoyo que necesitan información integrada del ecosistema.',
+                        '• Abierta a proyectos dinámicos con alto nivel de innovación.',
+                        '',
+                        'Evaluación de trayectoria (proyecto seleccionado)',
+                    ]
+
+                    fase2_sheet = writer.book.create_sheet(title=fase2_sheet_name)
+                    writer.sheets[fase2_sheet_name] = fase2_sheet
 
-            st.download_button(
+                    if Alignment is not None:
+                        fase2_sheet.column_dimensions['A'].width = 105
+
+                    for idx, line in enumerate(fase2_intro_lines, start=1):
+                        cell = fase2_sheet.cell(row=idx, column=1, value=line)
+                        if Alignment is not None:
+                            cell.alignment = Alignment(wrap_text=True, vertical='top')
+
+                    selection_columns = [
+                        'ranking',
+                        'id_innovacion',
+                        'nombre_innovacion',
+                        'potencial_transferencia',
+                        'impacto',
+                        'estatus',
+                        'responsable_innovacion',
+                        'evaluacion_calculada',
+                        'recomendacion',
+                    ]
+                    available_columns = [col for col in selection_columns if col in resultado.columns]
+
+                    if available_columns and not resultado.empty:
+                        orden_df = resultado.sort_values('ranking') if 'ranking' in resultado.columns else resultado
+                        seleccion_df = orden_df.loc[:, available_columns].head(1).copy()
+
+                        if 'evaluacion_calculada' in seleccion_df.columns:
+                            seleccion_df.loc[:, 'evaluacion_calculada'] = pd.to_numeric(
+                                seleccion_df['evaluacion_calculada'], errors='coerce'
+                            ).round(1)
+
+                        column_labels = {
+                            'ranking': 'Ranking fase 0',
+                            'id_innovacion': 'ID innovación',
+                            'nombre_innovacion': 'Proyecto seleccionado',
+                            'potencial_transferencia': 'Potencial de transferencia',
+                            'impacto': 'Impacto estratégico',
+                            'estatus': 'Estado actual',
+                            'responsable_innovacion': 'Responsable de innovación',
+                            'evaluacion_calculada': 'Evaluación Fase 0',
+                            'recomendacion': 'Recomendación automática',
+                        }
+                        seleccion_df = seleccion_df.rename(columns=column_labels)
+
+                        seleccion_df.to_excel(
+                            writer,
+                            index=False,
+                            sheet_name=fase2_sheet_name,
+                            startrow=len(fase2_intro_lines),
+                        )
+                return eval_buffer.getvalue()
+
+            # El libro solo se genera cuando el usuario lo pide
+            exports.download_button(
                 'Descargar evaluacion (Excel)',
-                data=eval_buffer.getvalue(),
-                file_name='evaluacion_fase0.xlsx',
-                mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
                 key='download_eval',
+                export_key=exports.content_key('evaluacion_fase0', resultado, resumen_df),
+                builder=_build_evaluacion_excel,
+                file_name='evaluacion_fase0.xlsx',
             )
         else:
             st.info('Instala openpyxl para exportar la evaluacion en Excel.')
@@ -12,10 +12,10 @@ from io import BytesIO
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils.dataframe import dataframe_to_rows
-from core import irl_level_flow, trl, db, utils
+from core import batch_import, irl_drafts, irl_engine, irl_import, irl_level_flow, irl_store, templates, trl, db
 from core.components import render_irl_banner
 from core.theme import load_theme
-from core.db_trl import save_trl_result, get_trl_history
+from core.db_trl import init_db_trl, save_trl_result, save_trl_results, get_trl_history
 from core.data_table import render_table
 
 # Utilidades locales mínimas
@@ -42,6 +42,10 @@ def _safe_load_theme() -> None:
         pass
 
 
+# Versión de diseño de generate_irl_excel_template (ver core.templates)
+IRL_TEMPLATE_LAYOUT = 1
+
+
 def generate_irl_excel_template() -> bytes:
     """Genera plantilla Excel con todas las preguntas IRL para evaluación offline."""
     wb = Workbook()
@@ -161,133 +165,18 @@ def generate_irl_excel_template() -> bytes:
 def load_irl_excel_responses(uploaded_file) -> dict:
     """Carga respuestas desde Excel con mapeo inteligente y validación robusta."""
     try:
-        df = pd.read_excel(uploaded_file, sheet_name="Evaluación IRL", header=0)
-        
-        # 🔍 PASO 1: Detectar columnas automáticamente
-        col_dimension = None
-        col_nivel = None
-        col_num_pregunta = None
-        col_pregunta = None
-        col_respuesta = None
-        col_evidencia = None
-        
-        for col in df.columns:
-            col_lower = str(col).lower()
-            if "dimensión" in col_lower or "dimension" in col_lower:
-                col_dimension = col
-            elif "nivel" in col_lower:
-                col_nivel = col
-            elif "#" in col_lower and "pregunta" in col_lower:
-                col_num_pregunta = col
-            elif "pregunta" in col_lower and "#" not in col_lower:
-                col_pregunta = col
-            elif "respuesta" in col_lower:
-                col_respuesta = col
-            elif "evidencia" in col_lower:
-                col_evidencia = col
-        
-        # Mostrar columnas detectadas
-        st.info(f"🔍 **Mapeo de columnas detectado:**\n- Dimensión: `{col_dimension}`\n- Nivel: `{col_nivel}`\n- # Pregunta: `{col_num_pregunta}`\n- Respuesta: `{col_respuesta}`\n- Evidencia: `{col_evidencia}`")
+        df = pd.read_excel(uploaded_file, sheet_name=irl_import.SHEET_NAME, header=0)
         
-        # Validar que se encontraron todas las columnas necesarias
-        if not all([col_dimension, col_nivel, col_num_pregunta, col_respuesta, col_evidencia]):
-            st.error("❌ No se pudieron detectar todas las columnas necesarias")
-            st.error(f"Columnas disponibles: {list(df.columns)}")
+        # 🔍 PASO 1 y 2: Detectar columnas y validar todas las filas de una vez
+        try:
+            respuestas, stats = irl_import.load_irl_responses(df, LEVEL_DEFINITIONS)
+        except ValueError as exc:
+            st.error(f"❌ {exc}")
             return {}
         
-        # 🔍 PASO 2: Procesar filas con validación detallada
-        respuestas = {}
-        stats = {
-            'total': 0,
-            'validas': 0,
-            'invalidas': 0,
-            'ejemplo': 0,
-            'vacias': 0,
-            'errores': []
-        }
-        
-        for idx_row, row in df.iterrows():
-            try:
-                stats['total'] += 1
-                
-                # Leer dimensión
-                dimension_full = str(row[col_dimension]) if pd.notna(row[col_dimension]) else ""
-                if not dimension_full or dimension_full == 'nan':
-                    stats['vacias'] += 1
-                    continue
-                
-                dimension = dimension_full.split(" - ")[0].strip()
-                
-                # Leer nivel y número de pregunta
-                if not pd.notna(row[col_nivel]) or not pd.notna(row[col_num_pregunta]):
-                    stats['vacias'] += 1
-                    continue
-                
-                level_id = int(row[col_nivel])
-                pregunta_num = int(row[col_num_pregunta])
-                
-                # Leer y limpiar respuesta - IMPORTANTE: Excel convierte VERDADERO/FALSO a booleanos
-                respuesta_raw = row[col_respuesta]
-                
-                # Manejar valores booleanos de Excel
-                if isinstance(respuesta_raw, bool):
-                    respuesta = "VERDADERO" if respuesta_raw else "FALSO"
-                elif pd.notna(respuesta_raw):
-                    respuesta_str = str(respuesta_raw).strip().upper().replace("\n", "").replace("\r", "").replace(" ", "").replace("\t", "")
-                    
-                    # Convertir variantes comunes
-                    if respuesta_str in ["TRUE", "T", "1"]:
-                        respuesta = "VERDADERO"
-                    elif respuesta_str in ["FALSE", "F", "0"]:
-                        respuesta = "FALSO"
-                    elif respuesta_str in ["VERDADERO", "V"]:
-                        respuesta = "VERDADERO"
-                    elif respuesta_str in ["FALSO"]:
-                        respuesta = "FALSO"
-                    else:
-                        respuesta = respuesta_str
-                else:
-                    respuesta = ""
-                
-                # DEBUG: Si es vacío o "NAN", registrar
-                if not respuesta or respuesta == "NAN":
-                    stats['vacias'] += 1
-                    continue
-                
-                # Validar respuesta final
-                if respuesta not in ["VERDADERO", "FALSO"]:
-                    stats['invalidas'] += 1
-                    stats['errores'].append({
-                        'fila': idx_row + 2,
-                        'dimension': dimension,
-                        'nivel': level_id,
-                        'pregunta_num': pregunta_num,
-                        'respuesta_raw': f"'{respuesta_raw}' (tipo: {type(respuesta_raw).__name__})",
-                        'respuesta_limpia': f"'{respuesta}'",
-                        'motivo': f'No se pudo normalizar a VERDADERO/FALSO'
-                    })
-                    continue
-                
-                # Leer evidencia
-                evidencia = str(row[col_evidencia]) if pd.notna(row[col_evidencia]) else ""
-                
-                # Crear keys en el formato correcto
-                resp_key = f"resp_{dimension}_{level_id}_{pregunta_num}"
-                toggle_key = f"toggle_{dimension}_{level_id}_{pregunta_num}"
-                evid_key = f"evid_{dimension}_{level_id}_{pregunta_num}"
-                
-                respuestas[resp_key] = respuesta
-                respuestas[toggle_key] = (respuesta == "VERDADERO")
-                respuestas[evid_key] = evidencia.strip()
-                
-                stats['validas'] += 1
-                
-            except Exception as e:
-                stats['invalidas'] += 1
-                stats['errores'].append({
-                    'fila': idx_row + 2,
-                    'motivo': f'Error: {str(e)}'
-                })
+        # Mostrar columnas detectadas
+        columnas = stats['columnas']
+        st.info(f"🔍 **Mapeo de columnas detectado:**\n- Dimensión: `{columnas.get('dimension')}`\n- Nivel: `{columnas.get('nivel')}`\n- # Pregunta: `{columnas.get('num_pregunta')}`\n- Respuesta: `{columnas.get('respuesta')}`\n- Evidencia: `{columnas.get('evidencia')}`")
         
         # 📊 PASO 3: Mostrar reporte detallado
         st.markdown("---")
@@ -881,6 +770,11 @@ _QUESTION_PROGRESS_KEY = "irl_question_progress"
 # Claves adicionales usadas para restauración/estilos
 _RESTORE_ON_EDIT_KEY = "irl_restore_on_edit"
 _PENDING_RESTORE_QUEUE_KEY = "irl_pending_restore_queue"
+# Respuestas de la evaluación en curso y versión por dimensión ya sincronizada
+_ANSWER_STORE_KEY = "irl_answer_store"
+_SYNCED_VERSIONS_KEY = "irl_synced_versions"
+# Fecha del borrador restaurado al abrir el proyecto (si existía)
+_DRAFT_RESTORED_KEY = "irl_draft_restored"
 
 # Mapa de estados → clase CSS (solo para estilos visuales)
 _STATUS_CLASS_MAP = {
@@ -897,12 +791,117 @@ def _is_evidence_valid(texto: str | None) -> bool:
 
     Si STEP_CONFIG["evidence_obligatoria_strict"] es True, exige tamaño mínimo.
     """
-    txt = _clean_text(texto)
-    if not txt:
-        return False
-    if STEP_CONFIG.get("evidence_obligatoria_strict"):
-        return len(txt) >= int(STEP_CONFIG.get("min_evidence_chars", 1))
-    return True
+    return irl_engine.evidence_valid(texto, **_evidence_rules())
+
+
+def _evidence_rules() -> dict:
+    return {
+        "strict": bool(STEP_CONFIG.get("evidence_obligatoria_strict")),
+        "min_chars": int(STEP_CONFIG.get("min_evidence_chars", 1)),
+    }
+
+
+def _answer_store() -> irl_store.AnswerStore:
+    """Almacén de respuestas del proyecto en curso.
+
+    Se crea una sola vez (tomando las claves resp_/evid_ que ya existan en la
+    sesión); después los widgets y la carga Excel escriben directamente en él.
+    """
+    store = st.session_state.get(_ANSWER_STORE_KEY)
+    if not isinstance(store, irl_store.AnswerStore):
+        store = irl_store.AnswerStore.from_flat(
+            LEVEL_DEFINITIONS,
+            st.session_state,
+            st.session_state.get("fase2_last_project_id"),
+            **_evidence_rules(),
+        )
+        st.session_state[_ANSWER_STORE_KEY] = store
+    return store
+
+
+def _reset_answer_store(values: dict | None = None) -> irl_store.AnswerStore:
+    """Reemplaza el almacén (vacío o con ``values``) y fuerza recalcular los estados derivados."""
+    store = irl_store.AnswerStore.from_flat(
+        LEVEL_DEFINITIONS,
+        values or {},
+        st.session_state.get("fase2_last_project_id"),
+        **_evidence_rules(),
+    )
+    st.session_state[_ANSWER_STORE_KEY] = store
+    st.session_state.pop(_SYNCED_VERSIONS_KEY, None)
+    return store
+
+
+def _store_answer(
+    dimension: str,
+    level_id: int,
+    idx: int = 0,
+    respuesta: str | None = None,
+    evidencia: str | None = None,
+) -> None:
+    """Escribe una respuesta de widget en el almacén; ``None`` conserva el valor actual.
+
+    Si nada cambia no se invalida ningún cálculo derivado.
+    """
+    store = _answer_store()
+    if (dimension, int(level_id), int(idx)) not in store:
+        return
+    if respuesta is None:
+        respuesta = store.get(dimension, level_id, idx)[0]
+    if store.set(dimension, level_id, idx, respuesta, evidencia):
+        _queue_draft(store)
+
+
+def _queue_draft(store: irl_store.AnswerStore | None = None) -> None:
+    """Encola en el borrador del proyecto las respuestas cambiadas (se escriben en segundo plano).
+
+    Con el autoguardado desactivado los cambios quedan pendientes en el almacén
+    y se encolan al volver a activarlo.
+    """
+    store = store or _answer_store()
+    if store.project_id is None or not st.session_state.get(_AUTO_SAVE_KEY, True):
+        return
+    irl_drafts.enqueue(store.project_id, store.take_changes())
+
+
+def _activate_project_answers(project_id: int) -> None:
+    """Deja en el almacén las respuestas del proyecto seleccionado.
+
+    Al cambiar de proyecto se encolan los cambios del anterior, se restaura el
+    borrador guardado del nuevo (una lectura por clave primaria) y se
+    recalculan desde él los estados de nivel, los puntajes y el puntaje global,
+    para que nada del proyecto anterior se guarde con el nuevo ``project_id``.
+    """
+    store = st.session_state.get(_ANSWER_STORE_KEY)
+    if isinstance(store, irl_store.AnswerStore):
+        if store.project_id == project_id:
+            return
+        _queue_draft(store)
+    values, actualizado = irl_drafts.load_draft(project_id)
+    store = _reset_answer_store(values)
+    store.take_changes()  # lo restaurado ya está guardado
+    for key in (
+        _STATE_KEY,
+        _ERROR_KEY,
+        _BANNER_KEY,
+        _EDIT_MODE_KEY,
+        _READY_KEY,
+        _RESTORE_ON_EDIT_KEY,
+        _QUESTION_PROGRESS_KEY,
+        _PENDING_RESTORE_QUEUE_KEY,
+        "irl_scores",
+        "irl_last_puntaje",
+    ):
+        st.session_state.pop(key, None)
+    _update_level_states_from_responses()
+    _sync_all_scores()
+    st.session_state[_DRAFT_RESTORED_KEY] = actualizado
+    st.session_state.irl_responses_applied = bool(values)
+
+
+def _dimension_answers(dimension: str) -> irl_engine.DimensionAnswers:
+    """Respuestas de la dimensión como máscaras de bits, leídas del almacén."""
+    return _answer_store().answers(dimension)
 
 def _ensure_question_progress(dimension: str, level_id: int, total_questions: int) -> dict:
     """Asegura y devuelve el progreso de preguntas para un nivel."""
@@ -962,35 +961,18 @@ def _level_state(dimension: str, level_id: int) -> dict:
         }
     return st.session_state[_STATE_KEY][dimension][level_id]
 
-def _update_ready_flag(dimension: str, level_id: int) -> None:
+def _update_ready_flag(
+    dimension: str,
+    level_id: int,
+    answers: irl_engine.DimensionAnswers | None = None,
+) -> None:
     """Recalcula el flag ready para un nivel en base a los widgets actuales."""
-    niveles = LEVEL_DEFINITIONS.get(dimension, [])
-    level_data = next((lvl for lvl in niveles if lvl.get("nivel") == level_id), None)
+    if answers is None:
+        answers = _dimension_answers(dimension)
     if _READY_KEY not in st.session_state:
         st.session_state[_READY_KEY] = {dim: {} for dim in STEP_TABS}
-    if level_data is None:
-        st.session_state[_READY_KEY].setdefault(dimension, {})[level_id] = False
-        return
-    preguntas = level_data.get("preguntas") or []
-    if preguntas:
-        listo = True
-        for idx in range(1, len(preguntas) + 1):
-            resp_key = f"resp_{dimension}_{level_id}_{idx}"
-            evid_key = f"evid_{dimension}_{level_id}_{idx}"
-            valor = st.session_state.get(resp_key)
-            if valor not in {"VERDADERO", "FALSO"}:
-                listo = False
-                break
-            if valor == "VERDADERO" and not _is_evidence_valid(st.session_state.get(evid_key)):
-                listo = False
-                break
-    else:
-        answer_key = f"resp_{dimension}_{level_id}"
-        evidencia_key = f"evid_{dimension}_{level_id}"
-        valor = st.session_state.get(answer_key)
-        listo = valor in {"VERDADERO", "FALSO"}
-        if listo and valor == "VERDADERO":
-            listo = _is_evidence_valid(st.session_state.get(evidencia_key))
+    pos = answers.position(level_id)
+    listo = pos is not None and answers.level_ready(pos)
     st.session_state[_READY_KEY].setdefault(dimension, {})[level_id] = bool(listo)
 
 def _rerun_app() -> None:
@@ -1023,18 +1005,17 @@ def _render_level_question_flow(
     if descripcion:
         st.caption(descripcion)
 
+    store = _answer_store()
     for idx, pregunta in enumerate(preguntas, start=1):
-        resp_key = f"resp_{dimension}_{level_id}_{idx}"
         toggle_key = f"toggle_{dimension}_{level_id}_{idx}"
         evid_key = f"evid_{dimension}_{level_id}_{idx}"
+        guardada, evidencia_guardada = store.get(dimension, level_id, idx)
 
-        # Defaults seguros (solo si faltan)
-        if resp_key not in st.session_state:
-            st.session_state[resp_key] = "FALSO"
+        # Los widgets se inicializan desde el almacén (solo si faltan)
         if toggle_key not in st.session_state:
-            st.session_state[toggle_key] = st.session_state[resp_key] == "VERDADERO"
+            st.session_state[toggle_key] = guardada == "VERDADERO"
         if evid_key not in st.session_state:
-            st.session_state[evid_key] = ""
+            st.session_state[evid_key] = evidencia_guardada
 
         st.write(f"**Pregunta {idx}/{total_questions}**: {pregunta}")
 
@@ -1044,8 +1025,8 @@ def _render_level_question_flow(
             key=toggle_key,
             disabled=locked,
         )
-        # Sincronizamos la respuesta textual (no es widget)
-        st.session_state[resp_key] = "VERDADERO" if selected else "FALSO"
+        # Sincronizamos la respuesta en el almacén (no es widget)
+        respuesta = "VERDADERO" if selected else "FALSO"
 
         # Campo de evidencia (solo si VERDADERO). Importante: NO escribimos
         # sobre evid_key cuando el widget ya existe en esta misma ejecución.
@@ -1063,8 +1044,8 @@ def _render_level_question_flow(
             if evid_key not in st.session_state or st.session_state.get(evid_key):
                 st.session_state[evid_key] = ""
 
-        respuestas[str(idx)] = st.session_state.get(resp_key)
-        evidencias[str(idx)] = st.session_state.get(evid_key, "")
+        store.set(dimension, level_id, idx, respuesta, st.session_state.get(evid_key, ""))
+        respuestas[str(idx)], evidencias[str(idx)] = store.get(dimension, level_id, idx)
 
     evidencias_texto = "\n".join(
         t.strip() for t in evidencias.values() if isinstance(t, str) and t.strip()
@@ -1151,8 +1132,12 @@ def _init_irl_state() -> None:
         st.session_state[_PENDING_RESTORE_QUEUE_KEY] = []
     if "irl_scores" not in st.session_state:
         st.session_state["irl_scores"] = {dim: 0 for dim in STEP_TABS}
+    if _SYNCED_VERSIONS_KEY not in st.session_state:
+        st.session_state[_SYNCED_VERSIONS_KEY] = {}
 
     # niveles por dimensión
+    store = _answer_store()
+    synced = st.session_state[_SYNCED_VERSIONS_KEY]
     for dimension in STEP_TABS:
         st.session_state[_STATE_KEY].setdefault(dimension, {})
         st.session_state[_ERROR_KEY].setdefault(dimension, {})
@@ -1161,7 +1146,14 @@ def _init_irl_state() -> None:
         st.session_state[_RESTORE_ON_EDIT_KEY].setdefault(dimension, {})
         st.session_state[_QUESTION_PROGRESS_KEY].setdefault(dimension, {})
 
+        # Solo se recalcula lo derivado si las respuestas cambiaron desde la última pasada
+        version = store.dimension_version(dimension)
+        if synced.get(dimension) == version:
+            continue
+        synced[dimension] = version
+
         niveles = LEVEL_DEFINITIONS.get(dimension, [])
+        answers = store.answers(dimension)
         for level in niveles:
             nivel_id = level.get("nivel")
             # estado base del nivel
@@ -1189,7 +1181,7 @@ def _init_irl_state() -> None:
             # progreso preguntas
             _ensure_question_progress(dimension, nivel_id, len(preguntas))
             # ready flag
-            _update_ready_flag(dimension, nivel_id)
+            _update_ready_flag(dimension, nivel_id, answers)
 
 
 def _set_level_state(
@@ -1266,30 +1258,32 @@ def _restore_level_form_values(dimension: str, level_id: int) -> None:
         state_resp = state.get("respuestas_preguntas", {})
         state_evid = state.get("evidencias_preguntas", {}) 
         evidencias_agregadas = []
+        store = _answer_store()
 
         # Restaurar cada pregunta individual
         for idx, _ in enumerate(preguntas, start=1):
             clave = str(idx)
             
             # Keys para esta pregunta
-            resp_key = f"resp_{dimension}_{level_id}_{idx}"
             toggle_key = f"toggle_{dimension}_{level_id}_{idx}"
             evid_key = f"evid_{dimension}_{level_id}_{idx}"
             
             # Restaurar respuesta solo si no existe
             resp_valor = state_resp.get(clave)
-            if resp_key not in st.session_state:
-                st.session_state[resp_key] = resp_valor if resp_valor in {"VERDADERO", "FALSO"} else "FALSO"
+            if store.get(dimension, level_id, idx)[0] is None:
+                store.set(dimension, level_id, idx, resp_valor if resp_valor in {"VERDADERO", "FALSO"} else "FALSO")
                 
             # Sincronizar toggle con respuesta
             if toggle_key not in st.session_state:
-                st.session_state[toggle_key] = st.session_state[resp_key] == "VERDADERO"
+                st.session_state[toggle_key] = store.get(dimension, level_id, idx)[0] == "VERDADERO"
             
             # Restaurar evidencia
             evid_texto = state_evid.get(clave, "")
             if evid_texto:
                 if evid_key not in st.session_state:
                     st.session_state[evid_key] = evid_texto
+                if not store.get(dimension, level_id, idx)[1]:
+                    store.set(dimension, level_id, idx, evidencia=evid_texto)
                 evidencias_agregadas.append(evid_texto.strip())
                 
         # Agregar evidencias concatenadas
@@ -1324,6 +1318,12 @@ def _restore_level_form_values(dimension: str, level_id: int) -> None:
         evidencia_val = state.get("evidencia", "")
         if evidencia_key not in st.session_state:
             st.session_state[evidencia_key] = "" if evidencia_val is None else str(evidencia_val)
+        _store_answer(
+            dimension,
+            level_id,
+            respuesta=st.session_state[answer_key],
+            evidencia=st.session_state[evidencia_key],
+        )
             
     # Asegurar que el selector exista
     if selector_key not in st.session_state:
@@ -1364,25 +1364,18 @@ def _process_pending_restores(dimension: str) -> None:
     st.session_state[_PENDING_RESTORE_QUEUE_KEY] = remaining
 
 
-def _sync_dimension_score(dimension: str) -> int:
-    niveles = LEVEL_DEFINITIONS.get(dimension, [])
-    if not niveles:
-        st.session_state["irl_scores"][dimension] = 0
-        return 0
-    niveles_sorted = sorted(niveles, key=lambda lvl: lvl.get("nivel", 0))
-    baseline = niveles_sorted[0].get("nivel", 0)
-    highest = baseline - 1
-    for level in niveles_sorted:
-        nivel_actual = level.get("nivel", baseline)
-        expected_next = highest + 1
-        if nivel_actual != expected_next:
-            break
+def _approved_level_from_states(dimension: str) -> int:
+    """Nivel acreditado según los estados de nivel (flujo manual o Excel)."""
+    niveles = sorted(level.get("nivel", 0) for level in LEVEL_DEFINITIONS.get(dimension, []))
+    aprobados = []
+    for nivel_actual in niveles:
         level_state = _level_state(dimension, nivel_actual)
-        if level_state["respuesta"] == "VERDADERO" and level_state["en_calculo"]:
-            highest = nivel_actual
-        else:
-            break
-    approved_level = highest if highest >= baseline else 0
+        aprobados.append(level_state["respuesta"] == "VERDADERO" and bool(level_state["en_calculo"]))
+    return irl_engine.approved_level(niveles, aprobados)
+
+
+def _sync_dimension_score(dimension: str) -> int:
+    approved_level = _approved_level_from_states(dimension)
     st.session_state["irl_scores"][dimension] = approved_level
     return approved_level
 
@@ -1397,68 +1390,17 @@ def _update_level_states_from_responses() -> None:
     _init_irl_state()
     
     for dimension in STEP_TABS:
-        niveles = LEVEL_DEFINITIONS.get(dimension, [])
-        for level in niveles:
-            level_id = level.get("nivel")
+        # Un nivel queda "Completo" cuando todas sus preguntas son VERDADERO.
+        # Desde Excel se acepta sin evidencia (el flujo manual sí la exige).
+        estados = irl_engine.level_states(_dimension_answers(dimension))
+        for level_id, estado in estados.items():
             if not level_id:
                 continue
-            
-            preguntas = level.get("preguntas", [])
-            
-            # Verificar si todas las preguntas tienen respuesta VERDADERO
-            if preguntas:
-                todas_verdadero = True
-                alguna_evidencia = False
-                
-                for idx in range(1, len(preguntas) + 1):
-                    resp_key = f"resp_{dimension}_{level_id}_{idx}"
-                    evid_key = f"evid_{dimension}_{level_id}_{idx}"
-                    
-                    respuesta = st.session_state.get(resp_key, "FALSO")
-                    evidencia = st.session_state.get(evid_key, "")
-                    
-                    if respuesta != "VERDADERO":
-                        todas_verdadero = False
-                        break
-                    
-                    if evidencia and evidencia.strip() != "":
-                        alguna_evidencia = True
-                
-                # Actualizar estado del nivel
-                level_state = _level_state(dimension, level_id)
-                if todas_verdadero:
-                    level_state["respuesta"] = "VERDADERO"
-                    # IMPORTANTE: Marcar en_calculo=True aunque no haya evidencia
-                    # Para permitir cálculo de niveles desde Excel
-                    level_state["en_calculo"] = True
-                    level_state["estado"] = "Completo"
-                    level_state["estado_auto"] = "Completo"
-                    # Nota: En el flujo manual se puede requerir evidencia, pero desde Excel aceptamos sin evidencia
-                else:
-                    level_state["respuesta"] = "FALSO"
-                    level_state["en_calculo"] = False
-                    level_state["estado"] = "Incompleto"
-                    level_state["estado_auto"] = "Incompleto"
-            else:
-                # Nivel sin preguntas específicas
-                resp_key = f"resp_{dimension}_{level_id}"
-                evid_key = f"evid_{dimension}_{level_id}"
-                
-                respuesta = st.session_state.get(resp_key, "FALSO")
-                evidencia = st.session_state.get(evid_key, "")
-                
-                level_state = _level_state(dimension, level_id)
-                level_state["respuesta"] = respuesta
-                
-                if respuesta == "VERDADERO":
-                    # IMPORTANTE: Marcar en_calculo=True aunque no haya evidencia
-                    level_state["en_calculo"] = True
-                    level_state["estado"] = "Completo"
-                    level_state["estado_auto"] = "Completo"
-                else:
-                    level_state["en_calculo"] = False
-                    level_state["estado"] = "Incompleto"
-                    level_state["estado_auto"] = "Incompleto"
+            level_state = _level_state(dimension, level_id)
+            level_state["respuesta"] = estado.respuesta
+            level_state["en_calculo"] = estado.en_calculo
+            level_state["estado"] = estado.estado
+            level_state["estado_auto"] = estado.estado
 
 
 def _compute_dimension_counts(dimension: str) -> dict:
@@ -1526,6 +1468,8 @@ def _handle_manual_answer_change(*, answer_key: str, evidencia_key: str) -> None
     answer = st.session_state.get(answer_key)
     if answer != "VERDADERO":
         st.session_state[evidencia_key] = ""
+    _, dimension, level_id = answer_key.split("_", 2)
+    _store_answer(dimension, int(level_id), respuesta=answer, evidencia=st.session_state.get(evidencia_key, ""))
 
 
 def _handle_question_evidence_change(
@@ -1543,6 +1487,7 @@ def _handle_question_evidence_change(
     evitar el error de Streamlit de modificar un widget luego de instanciarlo.
     Solo dejamos registro de que la pregunta tiene cambios pendientes.
     """
+    _store_answer(dimension, level_id, idx, evidencia=st.session_state.get(evidencia_key, ""))
     _mark_question_pending(dimension, level_id, idx, total_questions)
 
 
@@ -1568,7 +1513,7 @@ def _handle_question_toggle_change(
     
     # Convertir a VERDADERO/FALSO manteniendo consistencia
     nuevo_valor = "VERDADERO" if toggle_state else "FALSO"
-    st.session_state[pregunta_key] = nuevo_valor
+    _store_answer(dimension, level_id, idx, nuevo_valor, None if toggle_state else "")
     
     # Si se cambia a FALSO, limpiar evidencia
     if not toggle_state:
@@ -1612,14 +1557,13 @@ def _validate_level(dimension: str, level_id: int) -> tuple[bool, list[str]]:
 
     preguntas = level_data.get("preguntas") or []
     if preguntas:
+        store = _answer_store()
         for idx, _ in enumerate(preguntas, start=1):
-            resp_key = f"resp_{dimension}_{level_id}_{idx}"
-            evid_key = f"evid_{dimension}_{level_id}_{idx}"
-            resp = st.session_state.get(resp_key)
+            resp, evidencia = store.get(dimension, level_id, idx)
             if resp not in {"VERDADERO", "FALSO"}:
                 errores.append(f"Pregunta {idx}: selecciona VERDADERO o FALSO.")
                 continue
-            if resp == "VERDADERO" and not _is_evidence_valid(st.session_state.get(evid_key)):
+            if resp == "VERDADERO" and not _is_evidence_valid(evidencia):
                 min_chars = STEP_CONFIG.get("min_evidence_chars", 0)
                 errores.append(
                     f"Pregunta {idx}: cuando es VERDADERO debes agregar antecedentes (mínimo {min_chars} caracteres si aplica)."
@@ -1679,17 +1623,16 @@ def _save_level_answers(
         respuestas: dict[str, str] = {}
         evidencias: dict[str, str] = {}
         
+        store = _answer_store()
         for idx, _ in enumerate(preguntas, start=1):
-            pregunta_key = f"resp_{dimension}_{level_id}_{idx}"
-            evidencia_key = f"evid_{dimension}_{level_id}_{idx}"
             clave = str(idx)
             
-            respuesta = st.session_state.get(pregunta_key)
+            respuesta, evidencia = store.get(dimension, level_id, idx)
             if respuesta not in {"VERDADERO", "FALSO"}:
                 respuesta = "FALSO"
             respuestas[clave] = respuesta
             
-            evidencia = st.session_state.get(evidencia_key, "").strip()
+            evidencia = evidencia.strip()
             evidencias[clave] = evidencia if respuesta == "VERDADERO" else ""
             
         # Determinar respuesta agregada
@@ -1880,6 +1823,7 @@ def _render_dimension_tab(dimension: str) -> None:
                     max_chars=STEP_CONFIG["max_char_limit"],
                     disabled=locked or respuesta_manual != "VERDADERO",
                 )
+                _store_answer(dimension, level_id, respuesta=respuesta_manual, evidencia=evidencia_texto)
 
                 if respuesta_manual == "VERDADERO":
                     contador = len(_clean_text(evidencia_texto))
@@ -1943,9 +1887,7 @@ def _render_dimension_tab(dimension: str) -> None:
                     try:
                         df_all = _collect_dimension_responses()
                         if not df_all.empty:
-                            st.session_state["irl_last_puntaje"] = trl.calcular_trl(
-                                df_all[["dimension", "nivel", "evidencia"]]
-                            )
+                            st.session_state["irl_last_puntaje"] = irl_engine.global_score(df_all["nivel"])
                         else:
                             st.session_state["irl_last_puntaje"] = None
                     except Exception:
@@ -1988,23 +1930,13 @@ def _collect_dimension_responses() -> pd.DataFrame:
                 }
             )
             continue
-        niveles_sorted = sorted(niveles, key=lambda lvl: lvl.get("nivel", 0))
-        baseline = niveles_sorted[0].get("nivel", 0)
-        highest = baseline - 1
-        for level in niveles_sorted:
-            nivel_actual = level.get("nivel", baseline)
-            expected_next = highest + 1
-            if nivel_actual != expected_next:
+        approved_level = _approved_level_from_states(dimension)
+        for nivel_actual in sorted(level.get("nivel", 0) for level in niveles):
+            if nivel_actual > approved_level:
                 break
-            data = _level_state(dimension, nivel_actual)
-            if data.get("respuesta") == "VERDADERO" and data.get("en_calculo"):
-                highest = nivel_actual
-                evidencia_txt = (data.get("evidencia") or "").strip()
-                if evidencia_txt:
-                    evidencias.append(evidencia_txt)
-            else:
-                break
-        approved_level = highest if highest >= baseline else 0
+            evidencia_txt = (_level_state(dimension, nivel_actual).get("evidencia") or "").strip()
+            if evidencia_txt:
+                evidencias.append(evidencia_txt)
         st.session_state["irl_scores"][dimension] = approved_level
         registros.append(
             {
@@ -2050,59 +1982,90 @@ def _format_answer_display(valor: str | None, state: dict | None) -> str:
     return "No respondido"
 
 
+def _dimension_navigator(key: str, labels: dict[str, str], summaries: dict[str, str]) -> str:
+    """Selector de dimensión que reemplaza a st.tabs: solo la elegida se renderiza.
+
+    La selección vive en ``st.session_state[key]``; el resto de dimensiones se
+    resume en una línea con los conteos ya calculados.
+    """
+    opciones = list(labels)
+    if st.session_state.get(key) not in opciones:
+        st.session_state[key] = opciones[0]
+    seleccion = st.radio(
+        "Dimensión",
+        options=opciones,
+        format_func=lambda dim: labels[dim],
+        horizontal=True,
+        key=key,
+        label_visibility="collapsed",
+    )
+    otras = [f"{dim}: {summaries[dim]}" for dim in opciones if dim != seleccion and summaries.get(dim)]
+    if otras:
+        st.caption(" · ".join(otras))
+    return seleccion
+
+
 def _collect_dimension_details() -> dict[str, dict[str, Any]]:
+    """Etiqueta y resumen por dimensión; las filas se arman con ``_dimension_detail_rows``."""
     _init_irl_state()
     dimensiones_ids = trl.ids_dimensiones()
     etiquetas = dict(zip(dimensiones_ids, trl.labels_dimensiones()))
     detalles: dict[str, dict[str, Any]] = {}
 
     for dimension in dimensiones_ids:
-        niveles = LEVEL_DEFINITIONS.get(dimension, [])
-        filas: list[dict[str, Any]] = []
-        for level in niveles:
-            nivel_id = level.get("nivel")
-            state = _level_state(dimension, nivel_id)
-            estado_nivel = state.get("estado", "Pendiente")
-            preguntas = level.get("preguntas") or []
-            if preguntas:
-                respuestas = state.get("respuestas_preguntas") or {}
-                evidencias_preguntas = state.get("evidencias_preguntas") or {}
-                for idx, pregunta in enumerate(preguntas, start=1):
-                    idx_str = str(idx)
-                    filas.append(
-                        {
-                            "Nivel": nivel_id,
-                            "Descripción del nivel": level.get("descripcion", ""),
-                            "Pregunta": pregunta,
-                            "Respuesta": _format_answer_display(
-                                respuestas.get(idx_str), state
-                            ),
-                            "Antecedentes de verificación": evidencias_preguntas.get(idx_str) or "—",
-                            "Estado del nivel": estado_nivel,
-                        }
-                    )
-            else:
+        counts = _compute_dimension_counts(dimension)
+        detalles[dimension] = {
+            "label": etiquetas.get(dimension, dimension),
+            "resumen": f"{counts['completed']}/{counts['total']} niveles",
+        }
+
+    return detalles
+
+
+def _dimension_detail_rows(dimension: str) -> list[dict[str, Any]]:
+    """Filas de preguntas y respuestas de una dimensión para la tabla de detalle."""
+    niveles = LEVEL_DEFINITIONS.get(dimension, [])
+    filas: list[dict[str, Any]] = []
+    for level in niveles:
+        nivel_id = level.get("nivel")
+        state = _level_state(dimension, nivel_id)
+        estado_nivel = state.get("estado", "Pendiente")
+        preguntas = level.get("preguntas") or []
+        if preguntas:
+            respuestas = state.get("respuestas_preguntas") or {}
+            evidencias_preguntas = state.get("evidencias_preguntas") or {}
+            for idx, pregunta in enumerate(preguntas, start=1):
+                idx_str = str(idx)
                 filas.append(
                     {
                         "Nivel": nivel_id,
                         "Descripción del nivel": level.get("descripcion", ""),
-                        "Pregunta": "—",
-                        "Respuesta": _format_answer_display(state.get("respuesta"), state),
-                        "Antecedentes de verificación": state.get("evidencia") or "—",
+                        "Pregunta": pregunta,
+                        "Respuesta": _format_answer_display(
+                            respuestas.get(idx_str), state
+                        ),
+                        "Antecedentes de verificación": evidencias_preguntas.get(idx_str) or "—",
                         "Estado del nivel": estado_nivel,
                     }
                 )
+        else:
+            filas.append(
+                {
+                    "Nivel": nivel_id,
+                    "Descripción del nivel": level.get("descripcion", ""),
+                    "Pregunta": "—",
+                    "Respuesta": _format_answer_display(state.get("respuesta"), state),
+                    "Antecedentes de verificación": state.get("evidencia") or "—",
+                    "Estado del nivel": estado_nivel,
+                }
+            )
 
-        detalles[dimension] = {
-            "label": etiquetas.get(dimension, dimension),
-            "rows": filas,
-        }
-
-    return detalles
+    return filas
 
 
 st.set_page_config(page_title="Fase 1 - Evaluación IRL", page_icon="🌲", layout="wide")
 _safe_load_theme()
+init_db_trl()
 
 st.markdown(
     """
@@ -3194,7 +3157,7 @@ if st.session_state.irl_mode == 'conectado':
     ranking_keys = ranking_df[['id_innovacion', 'ranking']].copy()
     ranking_keys['id_str'] = ranking_keys['id_innovacion'].astype(str)
 
-    df_port = utils.normalize_df(db.fetch_df())
+    df_port = db.fetch_portfolio()
     df_port['id_str'] = df_port['id_innovacion'].astype(str)
     df_port = df_port[df_port['id_str'].isin(ranking_keys['id_str'])].copy()
     if df_port.empty:
@@ -3215,7 +3178,7 @@ else:
         st.session_state["fase2_ready"] = False
     
     # Obtener todos los proyectos disponibles del portafolio maestro
-    df_port = utils.normalize_df(db.fetch_df())
+    df_port = db.fetch_portfolio()
     
     if df_port.empty:
         st.warning('⚠️ No hay proyectos en el portafolio maestro. Carga proyectos en Fase 0 primero.')
@@ -3262,6 +3225,7 @@ if previous_project_id is not None and previous_project_id != project_id:
     st.session_state["fase2_ready"] = False
     st.session_state.pop("fase2_payload", None)
 st.session_state["fase2_last_project_id"] = project_id
+_activate_project_answers(project_id)
 
 selected_project = df_port.loc[df_port["id_innovacion"] == project_id].iloc[0]
 impacto_txt = selected_project.get("impacto") or "No informado"
@@ -3340,6 +3304,22 @@ with st.container():
         st.caption("Aplica al sistema")
     
     st.markdown("---")
+
+    col_autosave, col_draft = st.columns([1, 2])
+    with col_autosave:
+        st.session_state.setdefault(_AUTO_SAVE_KEY, True)
+        st.toggle(
+            "💾 Guardar borrador automáticamente",
+            key=_AUTO_SAVE_KEY,
+            help="Las respuestas aplicadas se guardan como borrador del proyecto hasta finalizar la evaluación.",
+        )
+    with col_draft:
+        draft_restored = st.session_state.get(_DRAFT_RESTORED_KEY)
+        if draft_restored:
+            st.caption(f"Se restauró el borrador de este proyecto guardado el {draft_restored}.")
+    _queue_draft()  # cambios hechos con el autoguardado desactivado
+
+    st.markdown("---")
     
     # Sección de descarga
     st.markdown("#### 📥 Paso 1: Descargar Plantilla de Evaluación")
@@ -3347,7 +3327,12 @@ with st.container():
     col_download, col_info = st.columns([1, 2])
     
     with col_download:
-        excel_template = generate_irl_excel_template()
+        excel_template = templates.get_template(
+            "irl",
+            templates.catalog_version(IRL_TEMPLATE_LAYOUT, IRL_DIMENSIONS, LEVEL_DEFINITIONS),
+            generate_irl_excel_template,
+            persist=True,
+        )
         st.download_button(
             label="⬇️ Descargar Plantilla Excel",
             data=excel_template,
@@ -3431,9 +3416,9 @@ with st.container():
         
         with col_aplicar:
             if st.button("✅ Aplicar respuestas al sistema", use_container_width=True, type="primary"):
-                # Aplicar todas las respuestas al session_state
-                for key, value in st.session_state.pending_irl_responses.items():
-                    st.session_state[key] = value
+                # Aplicar todas las respuestas al almacén de la evaluación
+                _answer_store().update(st.session_state.pending_irl_responses)
+                _queue_draft()
                 
                 # Inicializar estado y actualizar estados de niveles basados en respuestas
                 _init_irl_state()
@@ -3609,43 +3594,40 @@ with st.container():
         
         # Expander con detalle completo de preguntas/respuestas
         with st.expander("📋 Ver Detalle Completo de Respuestas por Dimensión", expanded=False):
-            tab_labels = [f"{r['dimension']} - {r['descripcion']}" for r in dimension_results]
-            tabs = st.tabs(tab_labels)
+            dimension = _dimension_navigator(
+                "irl_detalle_respuestas_dimension",
+                {r['dimension']: f"{r['dimension']} - {r['descripcion']}" for r in dimension_results},
+                {r['dimension']: f"N{r['nivel']} · {r['completado']}/{r['total']}" for r in dimension_results},
+            )
+            store = _answer_store()
+            levels = LEVEL_DEFINITIONS.get(dimension, [])
             
-            for idx, result in enumerate(dimension_results):
-                with tabs[idx]:
-                    dimension = result['dimension']
-                    levels = LEVEL_DEFINITIONS.get(dimension, [])
+            for level in levels:
+                level_id = level["nivel"]
+                descripcion = level.get("descripcion", "")
+                preguntas = level.get("preguntas", [])
+                
+                st.markdown(f"**Nivel {level_id}**: {descripcion}")
+                
+                # Mostrar respuestas
+                for idx_p, pregunta in enumerate(preguntas, start=1):
+                    respuesta, evidencia = store.get(dimension, level_id, idx_p)
+                    respuesta = respuesta or "FALSO"
                     
-                    for level in levels:
-                        level_id = level["nivel"]
-                        descripcion = level.get("descripcion", "")
-                        preguntas = level.get("preguntas", [])
-                        
-                        st.markdown(f"**Nivel {level_id}**: {descripcion}")
-                        
-                        # Mostrar respuestas
-                        for idx_p, pregunta in enumerate(preguntas, start=1):
-                            resp_key = f"resp_{dimension}_{level_id}_{idx_p}"
-                            evid_key = f"evid_{dimension}_{level_id}_{idx_p}"
-                            
-                            respuesta = st.session_state.get(resp_key, "FALSO")
-                            evidencia = st.session_state.get(evid_key, "")
-                            
-                            icon = "✅" if respuesta == "VERDADERO" else "❌"
-                            color = "#2e7d32" if respuesta == "VERDADERO" else "#d32f2f"
-                            
-                            evidencia_html = f"<br><em>Evidencia:</em> {evidencia}" if evidencia else ""
-                            st.markdown(f"""
-                                <div style="background: rgba(0,0,0,0.02); padding: 0.8rem; 
-                                            border-left: 4px solid {color}; margin: 0.5rem 0; border-radius: 4px;">
-                                    <strong>{icon} Pregunta {idx_p}:</strong> {pregunta}<br>
-                                    <em>Respuesta:</em> <strong style="color: {color};">{respuesta}</strong>
-                                    {evidencia_html}
-                                </div>
-                            """, unsafe_allow_html=True)
-                        
-                        st.markdown("---")
+                    icon = "✅" if respuesta == "VERDADERO" else "❌"
+                    color = "#2e7d32" if respuesta == "VERDADERO" else "#d32f2f"
+                    
+                    evidencia_html = f"<br><em>Evidencia:</em> {evidencia}" if evidencia else ""
+                    st.markdown(f"""
+                        <div style="background: rgba(0,0,0,0.02); padding: 0.8rem; 
+                                    border-left: 4px solid {color}; margin: 0.5rem 0; border-radius: 4px;">
+                            <strong>{icon} Pregunta {idx_p}:</strong> {pregunta}<br>
+                            <em>Respuesta:</em> <strong style="color: {color};">{respuesta}</strong>
+                            {evidencia_html}
+                        </div>
+                    """, unsafe_allow_html=True)
+                
+                st.markdown("---")
         
         # Botón para limpiar y volver a evaluar
         st.markdown("---")
@@ -3656,6 +3638,9 @@ with st.container():
                 keys_to_delete = [k for k in st.session_state.keys() if k.startswith(('resp_', 'toggle_', 'evid_'))]
                 for k in keys_to_delete:
                     del st.session_state[k]
+                _reset_answer_store()
+                irl_drafts.discard_draft(project_id)
+                st.session_state.pop(_DRAFT_RESTORED_KEY, None)
                 
                 # Limpiar flags
                 st.session_state.irl_responses_applied = False
@@ -3664,6 +3649,32 @@ with st.container():
                 
                 st.rerun()
     
+    batch_import.render_batch_upload(
+        title="📦 Evaluación por lotes (varios proyectos)",
+        caption=(
+            "Sube un Excel con la hoja 'Evaluación IRL' y una columna ID_Proyecto "
+            "(id_innovacion del portafolio). Se calcula el IRL de cada proyecto y se guardan "
+            "todas las evaluaciones en una sola operación."
+        ),
+        key_prefix="irl_batch",
+        sheet_name=irl_import.SHEET_NAME,
+        file_types=["xlsx"],
+        kind="IRL",
+        known_ids=db.fetch_portfolio()["id_innovacion"],
+        load=lambda batch_df: irl_import.load_irl_responses_by_project(batch_df, LEVEL_DEFINITIONS),
+        prepare=lambda respuestas: irl_engine.dimension_rows(
+            LEVEL_DEFINITIONS, respuestas, trl.ids_dimensiones()
+        ),
+        summarize=lambda proyecto, datos: {
+            "ID_Proyecto": proyecto,
+            **datos[1].levels,
+            "IRL global": round(datos[1].global_score, 2) if datos[1].global_score is not None else None,
+        },
+        save=lambda batch_ready: save_trl_results(
+            {proyecto: (rows, score.global_score) for proyecto, (rows, score) in batch_ready.items()}
+        ),
+    )
+    
     st.markdown("</div>", unsafe_allow_html=True)
 
 with st.container():
@@ -3676,26 +3687,24 @@ with st.container():
             st.info("Aún no hay niveles respondidos en esta evaluación.")
 
         if detalles_dimensiones:
-            tab_labels = [
-                f"{info['label']}" if info["label"] else dimension
-                for dimension, info in detalles_dimensiones.items()
-            ]
             st.markdown("**Preguntas y respuestas por dimensión**")
-            tabs = st.tabs(tab_labels)
-            for idx, (dimension, info) in enumerate(detalles_dimensiones.items()):
-                with tabs[idx]:
-                    detalle_df = pd.DataFrame(info["rows"])
-                    if detalle_df.empty:
-                        st.info("No hay niveles configurados para esta dimensión.")
-                    else:
-                        render_table(
-                            detalle_df,
-                            key=f'fase1_detalle_dimensiones_{dimension}',
-                            include_actions=False,
-                            hide_index=True,
-                            page_size_options=(10, 25, 50),
-                            default_page_size=10,
-                        )
+            dimension = _dimension_navigator(
+                "irl_detalle_niveles_dimension",
+                {dim: info["label"] or dim for dim, info in detalles_dimensiones.items()},
+                {dim: info["resumen"] for dim, info in detalles_dimensiones.items()},
+            )
+            detalle_df = pd.DataFrame(_dimension_detail_rows(dimension))
+            if detalle_df.empty:
+                st.info("No hay niveles configurados para esta dimensión.")
+            else:
+                render_table(
+                    detalle_df,
+                    key=f'fase1_detalle_dimensiones_{dimension}',
+                    include_actions=False,
+                    hide_index=True,
+                    page_size_options=(10, 25, 50),
+                    default_page_size=10,
+                )
         else:
             st.warning("No se encontraron definiciones de niveles para las dimensiones IRL.")
     st.markdown("</div>", unsafe_allow_html=True)
@@ -3711,7 +3720,7 @@ with st.container():
             # If we don't have a cached puntaje, compute it now (user-triggered expensive op)
             if puntaje is None and not df_respuestas.empty:
                 try:
-                    computed = trl.calcular_trl(df_respuestas[["dimension", "nivel", "evidencia"]])
+                    computed = irl_engine.global_score(df_respuestas["nivel"])
                     st.session_state["irl_last_puntaje"] = computed
                     puntaje = computed
                 except Exception:
@@ -3729,6 +3738,8 @@ with st.container():
                     df_respuestas[["dimension", "nivel", "evidencia"]],
                     trl_value,
                 )
+                irl_drafts.discard_draft(project_id)
+                st.session_state.pop(_DRAFT_RESTORED_KEY, None)
                 _sync_all_scores()
                 historial = get_trl_history(project_id)
                 fecha_eval = historial["fecha_eval"].iloc[0] if not historial.empty else None
@@ -7,20 +7,22 @@ from html import escape
 from pathlib import Path
 from datetime import datetime
 
-from core import db, utils
+from core import batch_import, db, ebct_import, exports, templates
 from core.config import DIMENSIONES_TRL
 from core.data_table import render_table
-from core.db_trl import get_trl_history
+from core.db_trl import get_trl_history, init_db_trl
 from core.db_ebct import (
-    get_ebct_history,
+    get_latest_ebct_evaluation,
     init_db_ebct,
     save_ebct_evaluation,
+    save_ebct_evaluations,
 )
 from core.ebct import (
     EBCT_CHARACTERISTICS,
     EBCT_PHASES,
     get_characteristics_by_phase,
 )
+from core.ebct_import import OPTION_NO, OPTION_PARTIAL, OPTION_SCORES, OPTION_YES
 from core.ebct_panel import build_phase_summary, format_weight, prepare_panel_data
 from core.theme import load_theme
 
@@ -36,6 +38,10 @@ def _display_text(value, default: str) -> str:
     return str(value)
 
 
+# Versión de diseño de generate_excel_template (ver core.templates)
+EBCT_TEMPLATE_LAYOUT = 1
+
+
 def generate_excel_template() -> bytes:
     """Genera un archivo Excel con la plantilla de evaluación EBCT con instructivo."""
     # Crear DataFrame con todas las características
@@ -109,34 +115,16 @@ def generate_excel_template() -> bytes:
 def load_excel_responses(uploaded_file) -> dict:
     """Carga respuestas desde un archivo Excel y retorna un diccionario ID->Respuesta."""
     try:
-        df = pd.read_excel(uploaded_file, sheet_name='Evaluación EBCT')
-        
-        # Validar columnas requeridas
-        required_cols = ["ID", "Respuesta"]
-        if not all(col in df.columns for col in required_cols):
-            st.error(f"❌ El Excel debe contener las columnas: {', '.join(required_cols)}")
-            return {}
-        
-        # Crear diccionario de respuestas
-        responses = {}
-        valid_responses = ["No cumple", "En desarrollo", "Sí cumple", 
-                          "🔴 No cumple", "🟡 En desarrollo", "🟢 Sí cumple"]
-        
-        for _, row in df.iterrows():
-            char_id = int(row["ID"])
-            respuesta = str(row["Respuesta"]).strip()
-            
-            # Normalizar respuesta
-            if "No cumple" in respuesta or "No" in respuesta or "🔴" in respuesta:
-                responses[char_id] = "🔴 No cumple"
-            elif "desarrollo" in respuesta or "En" in respuesta or "🟡" in respuesta:
-                responses[char_id] = "🟡 En desarrollo"
-            elif "cumple" in respuesta or "Sí" in respuesta or "🟢" in respuesta:
-                responses[char_id] = "🟢 Sí cumple"
-            else:
-                responses[char_id] = "🔴 No cumple"  # Default
-        
+        df = pd.read_excel(uploaded_file, sheet_name=ebct_import.SHEET_NAME)
+        responses, stats = ebct_import.load_ebct_responses(df)
+        if stats['invalidas']:
+            st.warning(f"⚠️ {stats['invalidas']} fila(s) omitidas: " + "; ".join(
+                f"Fila {error['fila']}: {error['motivo']}" for error in stats['errores'][:10]
+            ))
         return responses
+    except ValueError as e:
+        st.error(f"❌ {str(e)}")
+        return {}
     except Exception as e:
         st.error(f"❌ Error al leer el archivo Excel: {str(e)}")
         return {}
@@ -208,35 +196,25 @@ def render_phase_overview(panel_map: dict[int, bool]) -> None:
                 st.info("No hay características asociadas a esta fase.")
 
 
-OPTION_NO = "🔴 No cumple"
-OPTION_PARTIAL = "🟡 En desarrollo"
-OPTION_YES = "🟢 Sí cumple"
-
-# Mapeo de opciones a valores numéricos para scoring y ayuda
+# Color y ayuda de cada opción (los puntajes están en core.ebct_import.OPTION_SCORES)
 OPTION_INFO = {
     OPTION_NO: {
-        "score": 0.0,
         "color": "#ff4d4d",  # Rojo
         "help": "La característica no está implementada o no cumple los criterios mínimos.",
         "icon": "🔴",
     },
     OPTION_PARTIAL: {
-        "score": 0.5,
         "color": "#ffd700",  # Amarillo
         "help": "La característica está en proceso de implementación o cumple parcialmente.",
         "icon": "🟡",
     },
     OPTION_YES: {
-        "score": 1.0,
         "color": "#1f6b36",  # Verde
         "help": "La característica cumple completamente con los criterios establecidos.",
         "icon": "🟢",
     }
 }
 
-# Shortcuts para scoring
-OPTION_SCORES = {opt: info["score"] for opt, info in OPTION_INFO.items()}
-
 SUMMARY_SECTIONS = [
     {
         "title": "Objetivos de la Plataforma",
@@ -276,6 +254,7 @@ SUMMARY_FOOTER = "Agosto, 2025"
 
 st.set_page_config(page_title="Fase 2 - Trayectoria EBCT", page_icon="🌲", layout="wide")
 load_theme()
+init_db_trl()
 init_db_ebct()
 
 # ========================================
@@ -847,16 +826,17 @@ if previous_project is not None and previous_project != project_id:
     st.session_state.pop("ebct_last_eval_timestamp", None)
 st.session_state["fase2_active_project_id"] = project_id
 
-history_df = get_ebct_history(project_id)
+latest_eval_df = get_latest_ebct_evaluation(project_id)
 last_eval_map: dict[int, bool] | None = None
 last_eval_timestamp: str | None = None
-if not history_df.empty:
-    last_eval_timestamp = history_df["fecha_eval"].iloc[0]
-    latest_eval_df = history_df[history_df["fecha_eval"] == last_eval_timestamp]
-    last_eval_map = {
-        int(row["caracteristica_id"]): bool(row["cumple"])
-        for _, row in latest_eval_df.iterrows()
-    }
+if not latest_eval_df.empty:
+    last_eval_timestamp = latest_eval_df["fecha_eval"].iloc[0]
+    last_eval_map = dict(
+        zip(
+            latest_eval_df["caracteristica_id"].astype(int).tolist(),
+            latest_eval_df["cumple"].astype(bool).tolist(),
+        )
+    )
     st.session_state["ebct_last_eval_timestamp"] = last_eval_timestamp
 
 panel_map = st.session_state.get("ebct_panel_map")
@@ -899,7 +879,7 @@ if not responses_df.empty:
 
 
 snapshot = payload.get("project_snapshot", {}).copy()
-df_port = utils.normalize_df(db.fetch_df())
+df_port = db.fetch_portfolio()
 project_row = df_port.loc[df_port["id_innovacion"] == project_id]
 if not project_row.empty:
     row = project_row.iloc[0]
@@ -1024,7 +1004,12 @@ col_download, col_upload = st.columns([1, 1])
 
 with col_download:
     # Botón de descarga con instructivo
-    excel_data = generate_excel_template()
+    excel_data = templates.get_template(
+        "ebct",
+        templates.catalog_version(EBCT_TEMPLATE_LAYOUT, EBCT_CHARACTERISTICS, EBCT_PHASES),
+        generate_excel_template,
+        persist=True,
+    )
     st.download_button(
         label="📥 Descargar plantilla Excel",
         data=excel_data,
@@ -1081,6 +1066,32 @@ if st.session_state.get('excel_applied', False):
     st.success("✅ Respuestas aplicadas correctamente. Ahora puedes modificarlas manualmente en el cuestionario o guardar la evaluación.")
     st.session_state.excel_applied = False
 
+# ========================================
+# CARGA MASIVA: VARIOS PROYECTOS EN UN ARCHIVO
+# ========================================
+batch_import.render_batch_upload(
+    title="📦 Carga masiva de evaluaciones (varios proyectos)",
+    caption=(
+        "Sube un Excel con la hoja 'Evaluación EBCT' y una columna ID_Proyecto "
+        "(id_innovacion del portafolio). Se guarda una evaluación por proyecto en una sola operación."
+    ),
+    key_prefix="ebct_batch",
+    sheet_name=ebct_import.SHEET_NAME,
+    file_types=["xlsx", "xls"],
+    kind="EBCT",
+    known_ids=df_port["id_innovacion"],
+    load=ebct_import.load_ebct_responses_by_project,
+    summarize=lambda proyecto, respuestas: {
+        "ID_Proyecto": proyecto,
+        "Respuestas": len(respuestas),
+        "🟢 Sí cumple": sum(r == OPTION_YES for r in respuestas.values()),
+        "🟡 En desarrollo": sum(r == OPTION_PARTIAL for r in respuestas.values()),
+    },
+    save=lambda batch_ready: save_ebct_evaluations(
+        {proyecto: ebct_import.evaluation_rows(respuestas) for proyecto, respuestas in batch_ready.items()}
+    ),
+)
+
 # Espacio antes del contenido principal
 st.markdown("<br>", unsafe_allow_html=True)
 
@@ -1713,7 +1724,6 @@ with st.container():
             st.session_state["show_save_message"] = True
             panel_map = responses_map
             last_eval_timestamp = timestamp
-            history_df = get_ebct_history(project_id)
             last_eval_map = responses_map
             # No rerun, solo mostrar mensaje en la siguiente renderización
         except Exception as error:
@@ -2294,30 +2304,30 @@ with st.container():
         # Renderizar tabla HTML
         st.markdown(html_table, unsafe_allow_html=True)
         
-        # Botón de descarga como Excel
-        excel_buf = io.BytesIO()
-        with pd.ExcelWriter(excel_buf, engine='openpyxl') as writer:
-            display_df_final.to_excel(writer, sheet_name='Evaluación EBCT', index=False)
-            
-            # Opcional: ajustar anchos de columnas
-            worksheet = writer.sheets['Evaluación EBCT']
-            worksheet.column_dimensions['A'].width = 8   # ID
-            worksheet.column_dimensions['B'].width = 25  # Fase
-            worksheet.column_dimensions['C'].width = 40  # Característica
-            worksheet.column_dimensions['D'].width = 50  # Dimensiones
-            worksheet.column_dimensions['E'].width = 18  # Estado
-            worksheet.column_dimensions['F'].width = 10  # Score
-            worksheet.column_dimensions['G'].width = 10  # Peso
-        
-        excel_data = excel_buf.getvalue()
-        
-        st.download_button(
+        # Botón de descarga como Excel (el libro se genera solo al pedirlo)
+        def _build_detalle_excel() -> bytes:
+            excel_buf = io.BytesIO()
+            with pd.ExcelWriter(excel_buf, engine='openpyxl') as writer:
+                display_df_final.to_excel(writer, sheet_name='Evaluación EBCT', index=False)
+                
+                # Opcional: ajustar anchos de columnas
+                worksheet = writer.sheets['Evaluación EBCT']
+                worksheet.column_dimensions['A'].width = 8   # ID
+                worksheet.column_dimensions['B'].width = 25  # Fase
+                worksheet.column_dimensions['C'].width = 40  # Característica
+                worksheet.column_dimensions['D'].width = 50  # Dimensiones
+                worksheet.column_dimensions['E'].width = 18  # Estado
+                worksheet.column_dimensions['F'].width = 10  # Score
+                worksheet.column_dimensions['G'].width = 10  # Peso
+            return excel_buf.getvalue()
+        
+        exports.download_button(
             "📥 Descargar tabla detallada (Excel)",
-            excel_data,
+            key=f"download_excel_detalle_{project_id}",
+            export_key=exports.content_key("ebct_detalle", display_df_final, params=project_id),
+            builder=_build_detalle_excel,
             file_name=f"evaluacion_ebct_detallada_proyecto_{project_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             help="Descarga la tabla completa con todas las características evaluadas",
-            key=f"download_excel_detalle_{project_id}"
         )
 
     st.markdown("</div>", unsafe_allow_html=True)
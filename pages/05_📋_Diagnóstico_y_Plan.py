@@ -10,6 +10,8 @@ import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import io
 
+from core import exports
+
 # Configuración de la página
 st.set_page_config(
     page_title="Diagnóstico y Plan de Acción",
@@ -845,53 +847,54 @@ if st.session_state.plan_accion:
             'completado': 'Completado'
         })
         
-        # Crear archivo Excel en memoria
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            # Hoja principal con el plan de acción
-            df_export_final.to_excel(writer, sheet_name='Plan de Acción', index=False)
-            
-            # Hoja con resumen de recursos por acción
-            recursos_por_accion = []
-            for accion in st.session_state.plan_accion:
-                if isinstance(accion['recursos'], list) and accion['recursos']:
-                    for recurso in accion['recursos']:
-                        recursos_por_accion.append({
-                            'ID Acción': accion['id'],
-                            'Característica': accion['caracteristica'],
-                            'Recurso': recurso['nombre'],
-                            'Tipo': recurso['tipo'],
-                            'Costo (USD)': recurso['costo']
-                        })
-            
-            if recursos_por_accion:
-                df_recursos = pd.DataFrame(recursos_por_accion)
-                df_recursos.to_excel(writer, sheet_name='Detalle Recursos', index=False)
-            
-            # Ajustar anchos de columnas en la hoja principal
-            worksheet = writer.sheets['Plan de Acción']
-            worksheet.column_dimensions['A'].width = 12
-            worksheet.column_dimensions['B'].width = 18
-            worksheet.column_dimensions['C'].width = 40
-            worksheet.column_dimensions['D'].width = 20
-            worksheet.column_dimensions['E'].width = 40
-            worksheet.column_dimensions['F'].width = 25
-            worksheet.column_dimensions['G'].width = 50
-            worksheet.column_dimensions['H'].width = 20
-            worksheet.column_dimensions['I'].width = 20
-            worksheet.column_dimensions['J'].width = 15
-            worksheet.column_dimensions['K'].width = 15
-            worksheet.column_dimensions['L'].width = 12
-            worksheet.column_dimensions['M'].width = 12
+        # Hoja con resumen de recursos por acción
+        recursos_por_accion = []
+        for accion in st.session_state.plan_accion:
+            if isinstance(accion['recursos'], list) and accion['recursos']:
+                for recurso in accion['recursos']:
+                    recursos_por_accion.append({
+                        'ID Acción': accion['id'],
+                        'Característica': accion['caracteristica'],
+                        'Recurso': recurso['nombre'],
+                        'Tipo': recurso['tipo'],
+                        'Costo (USD)': recurso['costo']
+                    })
+        df_recursos = pd.DataFrame(recursos_por_accion) if recursos_por_accion else None
         
-        output.seek(0)
+        # El archivo Excel se crea en memoria solo cuando se solicita
+        def _build_plan_excel() -> bytes:
+            output = io.BytesIO()
+            with pd.ExcelWriter(output, engine='openpyxl') as writer:
+                # Hoja principal con el plan de acción
+                df_export_final.to_excel(writer, sheet_name='Plan de Acción', index=False)
+                
+                if df_recursos is not None:
+                    df_recursos.to_excel(writer, sheet_name='Detalle Recursos', index=False)
+                
+                # Ajustar anchos de columnas en la hoja principal
+                worksheet = writer.sheets['Plan de Acción']
+                worksheet.column_dimensions['A'].width = 12
+                worksheet.column_dimensions['B'].width = 18
+                worksheet.column_dimensions['C'].width = 40
+                worksheet.column_dimensions['D'].width = 20
+                worksheet.column_dimensions['E'].width = 40
+                worksheet.column_dimensions['F'].width = 25
+                worksheet.column_dimensions['G'].width = 50
+                worksheet.column_dimensions['H'].width = 20
+                worksheet.column_dimensions['I'].width = 20
+                worksheet.column_dimensions['J'].width = 15
+                worksheet.column_dimensions['K'].width = 15
+                worksheet.column_dimensions['L'].width = 12
+                worksheet.column_dimensions['M'].width = 12
+            return output.getvalue()
         
-        st.download_button(
-            label="📊 Descargar Plan (Excel)",
-            data=output,
+        exports.download_button(
+            "📊 Descargar Plan (Excel)",
+            key="download_plan_excel",
+            export_key=exports.content_key("plan_accion", df_export_final, df_recursos),
+            builder=_build_plan_excel,
             file_name=f"plan_accion_{datetime.now().strftime('%Y%m%d')}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            use_container_width=True
+            use_container_width=True,
         )
     
     with col_exp2:
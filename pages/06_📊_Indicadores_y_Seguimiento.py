@@ -17,7 +17,9 @@ from pathlib import Path
 # Agregar path para importar módulos core
 sys.path.append(str(Path(__file__).parent.parent))
 
+from core import db_indicadores, figure_cache, snapshots, templates
 from core.ebct import EBCT_CHARACTERISTICS
+from core.indicadores import calcular_indicadores, cargar_libro_proyectos, formato_archivo, libro_digest
 
 # Configuración de la página
 st.set_page_config(
@@ -55,8 +57,9 @@ if st.session_state.get('eliminar_base', False):
     st.session_state.proyecto_actual_idx = None
     st.session_state.eliminar_base = False
     
-    # Limpiar cache
+    # Limpiar cache y la base consolidada guardada en db.sqlite
     st.cache_data.clear()
+    db_indicadores.clear_bundle()
     
     st.success("✅ Base de ejemplo eliminada correctamente. Ahora puedes cargar nuevos datos.")
     st.stop()
@@ -297,40 +300,17 @@ def generar_plantilla_proyectos() -> bytes:
 # ============================================================================
 
 def cargar_proyectos_desde_excel(file) -> dict:
-    """Carga proyectos desde archivo Excel"""
+    """Carga proyectos desde archivo Excel o paquete Arrow .zip (una sola lectura, cacheada por contenido)"""
     try:
-        # Leer todas las hojas
-        indice = pd.read_excel(file, sheet_name='Índice_Proyectos')
-        irl = pd.read_excel(file, sheet_name='Niveles_IRL')
-        ebct = pd.read_excel(file, sheet_name='Características_EBCT')
-        acciones = pd.read_excel(file, sheet_name='Plan_Acción')
-        indicadores = pd.read_excel(file, sheet_name='Indicadores_Desempeño')
-        
-        # Convertir códigos numéricos a etiquetas con emojis para visualización
-        if 'Estado_Color' in ebct.columns:
-            mapeo_estados = {
-                1: '🔴 Rojo',
-                2: '🟡 Amarillo',
-                3: '🟢 Verde'
-            }
-            ebct['Estado_Display'] = ebct['Estado_Color'].map(mapeo_estados)
-            # Usar Estado_Display como Estado_Actual para compatibilidad
-            ebct['Estado_Actual'] = ebct['Estado_Display']
-        
-        # Intentar cargar hoja de preguntas IRL si existe
-        preguntas_irl = None
-        try:
-            preguntas_irl = pd.read_excel(file, sheet_name='Preguntas_IRL')
-        except:
-            pass
-        
+        content = file.getvalue() if hasattr(file, 'getvalue') else file.read()
+        hojas = cargar_libro_proyectos(content, formato_archivo(getattr(file, 'name', '')))
         return {
-            'indice': indice,
-            'irl': irl,
-            'ebct': ebct,
-            'acciones': acciones,
-            'indicadores': indicadores,
-            'preguntas_irl': preguntas_irl,
+            'indice': hojas['Índice_Proyectos'],
+            'irl': hojas['Niveles_IRL'],
+            'ebct': hojas['Características_EBCT'],
+            'acciones': hojas['Plan_Acción'],
+            'indicadores': hojas['Indicadores_Desempeño'],
+            'preguntas_irl': hojas['Preguntas_IRL'],
             'timestamp': datetime.now()
         }
     except Exception as e:
@@ -362,51 +342,7 @@ with col_ejemplo:
                 st.session_state.proyectos_db = datos
                 
                 # ===== RECALCULAR INDICADORES AUTOMÁTICAMENTE =====
-                indicadores_recalculados = []
-                
-                for _, proyecto in datos['indice'].iterrows():
-                    id_proy = proyecto['ID_Proyecto']
-                    
-                    # IRL promedio
-                    irl_proy = datos['irl'][datos['irl']['ID_Proyecto'] == id_proy]
-                    irl_promedio = irl_proy['Nivel_Alcanzado'].mean() if len(irl_proy) > 0 else 0
-                    
-                    # EBCT por colores
-                    ebct_proy = datos['ebct'][datos['ebct']['ID_Proyecto'] == id_proy]
-                    if 'Estado_Color' in ebct_proy.columns:
-                        total_ebct = len(ebct_proy)
-                        verdes = len(ebct_proy[ebct_proy['Estado_Color'] == 3])
-                        amarillos = len(ebct_proy[ebct_proy['Estado_Color'] == 2])
-                        rojos = len(ebct_proy[ebct_proy['Estado_Color'] == 1])
-                        cumplimiento_ebct = (verdes / total_ebct * 100) if total_ebct > 0 else 0
-                        pct_verde = (verdes / total_ebct * 100) if total_ebct > 0 else 0
-                        pct_amarillo = (amarillos / total_ebct * 100) if total_ebct > 0 else 0
-                        pct_rojo = (rojos / total_ebct * 100) if total_ebct > 0 else 0
-                    else:
-                        cumplimiento_ebct = 0
-                        pct_verde = pct_amarillo = pct_rojo = 0
-                    
-                    # Avance de acciones
-                    acciones_proy = datos['acciones'][datos['acciones']['ID_Proyecto'] == id_proy]
-                    avance_acciones = acciones_proy['Avance_Porcentaje'].mean() if len(acciones_proy) > 0 else 0
-                    
-                    # Madurez global
-                    madurez_global = (irl_promedio / 9 * 40 + cumplimiento_ebct * 0.6)
-                    
-                    indicadores_recalculados.append({
-                        'ID_Proyecto': id_proy,
-                        'Nombre_Proyecto': proyecto['Nombre_Proyecto'],
-                        'Indicador_IRL_Promedio': irl_promedio,
-                        'Indicador_Cumplimiento_EBCT': cumplimiento_ebct,
-                        'Indicador_Caracteristicas_Verde': pct_verde,
-                        'Indicador_Caracteristicas_Amarillo': pct_amarillo,
-                        'Indicador_Caracteristicas_Rojo': pct_rojo,
-                        'Indicador_Avance_Acciones': avance_acciones,
-                        'Indicador_Madurez_Global': madurez_global
-                    })
-                
-                # Guardar indicadores recalculados
-                datos['indicadores_calculados'] = pd.DataFrame(indicadores_recalculados)
+                datos['indicadores_calculados'] = calcular_indicadores(datos)
                 st.session_state.proyectos_db = datos
                 
                 st.success("✅ Datos de ejemplo cargados correctamente")
@@ -417,7 +353,10 @@ with col_plantilla:
     st.caption("Descarga plantilla para completar con tus datos reales")
     
     if st.button("🔽 Generar Plantilla", use_container_width=True, type="secondary", key="btn_descargar_plantilla"):
-        plantilla_bytes = generar_plantilla_proyectos()
+        # La plantilla lleva la fecha del día como Fecha_Actualizacion
+        plantilla_bytes = templates.get_template(
+            "indicadores", datetime.now().strftime('%Y-%m-%d'), generar_plantilla_proyectos
+        )
         st.download_button(
             label="📄 Descargar Excel",
             data=plantilla_bytes,
@@ -434,79 +373,42 @@ with col_upload:
     
     uploaded_file = st.file_uploader(
         "Selecciona archivo",
-        type=['xlsx'],
-        help="Archivo Excel con estructura de plantilla",
+        type=['xlsx', 'zip'] if snapshots.HAS_ARROW else ['xlsx'],
+        help="Archivo Excel con estructura de plantilla (o paquete Arrow .zip con las mismas hojas)",
         key="uploader_datos"
     )
     
     if uploaded_file:
-        datos = cargar_proyectos_desde_excel(uploaded_file)
-        if datos:
-            st.session_state.proyectos_db = datos
-            
-            # ===== RECALCULAR INDICADORES AUTOMÁTICAMENTE =====
-            with st.spinner("🔄 Recalculando indicadores..."):
-                # Recalcular indicadores por proyecto
-                indicadores_recalculados = []
-                
-                for _, proyecto in datos['indice'].iterrows():
-                    id_proy = proyecto['ID_Proyecto']
-                    
-                    # IRL promedio
-                    irl_proy = datos['irl'][datos['irl']['ID_Proyecto'] == id_proy]
-                    irl_promedio = irl_proy['Nivel_Alcanzado'].mean() if len(irl_proy) > 0 else 0
-                    
-                    # EBCT por colores
-                    ebct_proy = datos['ebct'][datos['ebct']['ID_Proyecto'] == id_proy]
-                    if 'Estado_Color' in ebct_proy.columns:
-                        total_ebct = len(ebct_proy)
-                        verdes = len(ebct_proy[ebct_proy['Estado_Color'] == 3])
-                        amarillos = len(ebct_proy[ebct_proy['Estado_Color'] == 2])
-                        rojos = len(ebct_proy[ebct_proy['Estado_Color'] == 1])
-                        cumplimiento_ebct = (verdes / total_ebct * 100) if total_ebct > 0 else 0
-                        pct_verde = (verdes / total_ebct * 100) if total_ebct > 0 else 0
-                        pct_amarillo = (amarillos / total_ebct * 100) if total_ebct > 0 else 0
-                        pct_rojo = (rojos / total_ebct * 100) if total_ebct > 0 else 0
-                    else:
-                        cumplimiento_ebct = 0
-                        pct_verde = pct_amarillo = pct_rojo = 0
-                    
-                    # Avance de acciones
-                    acciones_proy = datos['acciones'][datos['acciones']['ID_Proyecto'] == id_proy]
-                    avance_acciones = acciones_proy['Avance_Porcentaje'].mean() if len(acciones_proy) > 0 else 0
-                    
-                    # Madurez global
-                    madurez_global = (irl_promedio / 9 * 40 + cumplimiento_ebct * 0.6)
-                    
-                    indicadores_recalculados.append({
-                        'ID_Proyecto': id_proy,
-                        'Nombre_Proyecto': proyecto['Nombre_Proyecto'],
-                        'Indicador_IRL_Promedio': round(irl_promedio, 2),
-                        'Indicador_Cumplimiento_EBCT': round(cumplimiento_ebct, 1),
-                        'Indicador_Avance_Acciones': round(avance_acciones, 1),
-                        'Indicador_Caracteristicas_Verde': round(pct_verde, 1),
-                        'Indicador_Caracteristicas_Amarillo': round(pct_amarillo, 1),
-                        'Indicador_Caracteristicas_Rojo': round(pct_rojo, 1),
-                        'Indicador_Madurez_Global': round(madurez_global, 1),
-                        'Total_Caracteristicas': len(ebct_proy),
-                        'Total_Acciones': len(acciones_proy)
-                    })
-                
-                # Actualizar indicadores en sesión
-                datos['indicadores_calculados'] = pd.DataFrame(indicadores_recalculados)
-                st.session_state.proyectos_db = datos
-            
+        digest = libro_digest(uploaded_file.getvalue())
+        # Solo se importa cuando el archivo cambia; las recargas leen la base guardada
+        importado = db_indicadores.bundle_digest() == digest
+        if not importado:
+            datos = cargar_proyectos_desde_excel(uploaded_file)
+            if datos:
+                # ===== RECALCULAR INDICADORES AUTOMÁTICAMENTE =====
+                with st.spinner("🔄 Recalculando indicadores..."):
+                    datos['indicadores_calculados'] = calcular_indicadores(datos)
+                    db_indicadores.import_bundle(datos, digest)
+                importado = True
+        
+        if importado:
+            # La sesión no guarda copia propia: los datos se leen desde db.sqlite
+            st.session_state.proyectos_db = []
+            datos = db_indicadores.load_bundle()
             st.success(f"✅ Base de datos cargada: {len(datos['indice'])} proyectos")
             st.success(f"🔄 Indicadores recalculados automáticamente")
             st.info(f"📅 Última actualización: {datos['timestamp'].strftime('%Y-%m-%d %H:%M:%S')}")
 
+# Datos de ejemplo de la sesión o, si no hay, la base consolidada guardada
+datos_actuales = st.session_state.proyectos_db or db_indicadores.load_bundle()
+
 st.markdown("---")
 
 # ============================================================================
 # BOTÓN PARA ELIMINAR BASE DE EJEMPLO
 # ============================================================================
 
-if st.session_state.proyectos_db:
+if datos_actuales:
     col_info, col_btn = st.columns([3, 1])
     
     with col_info:
@@ -523,8 +425,8 @@ st.markdown("---")
 # SECCIÓN 2: PANEL DE INDICADORES GENERALES
 # ============================================================================
 
-if st.session_state.proyectos_db:
-    datos = st.session_state.proyectos_db
+if datos_actuales:
+    datos = datos_actuales
     df_indice = datos['indice']
     df_irl = datos['irl']
     df_ebct = datos['ebct']
@@ -536,6 +438,9 @@ if st.session_state.proyectos_db:
     else:
         df_indicadores = datos['indicadores']
     
+    # Huella de los datos cargados: clave de las figuras reutilizables (core.figure_cache)
+    huella_datos = figure_cache.fingerprint(df_indice, df_irl, df_ebct, df_indicadores)
+    
     # ============================================================================
     # TABS: GENERALES vs COMPARATIVOS vs INDIVIDUALES
     # ============================================================================
@@ -573,158 +478,162 @@ if st.session_state.proyectos_db:
         st.markdown("### 📊 Niveles IRL por Dimensión y Proyecto")
         st.caption("🔵 Escala: 1 (mínimo) a 9 (máximo logro) | Las 6 dimensiones IRL se evalúan independientemente")
         
-        # Preparar datos agrupados por dimensión
-        irl_por_dimension = df_irl.groupby(['Dimension', 'ID_Proyecto'])['Nivel_Alcanzado'].first().reset_index()
-        irl_con_nombres = irl_por_dimension.merge(
-            df_indice[['ID_Proyecto', 'Nombre_Proyecto']], 
-            on='ID_Proyecto'
-        )
+        def _fig_irl_dimensiones():
+            # Preparar datos agrupados por dimensión
+            irl_por_dimension = df_irl.groupby(['Dimension', 'ID_Proyecto'])['Nivel_Alcanzado'].first().reset_index()
+            irl_con_nombres = irl_por_dimension.merge(
+                df_indice[['ID_Proyecto', 'Nombre_Proyecto']], 
+                on='ID_Proyecto'
+            )
         
-        # Agregar información de cumplimiento para tooltips
-        irl_con_nombres = irl_con_nombres.merge(
-            df_indicadores[['ID_Proyecto', 'Indicador_Cumplimiento_EBCT', 'Indicador_Madurez_Global']],
-            on='ID_Proyecto',
-            how='left'
-        )
+            # Agregar información de cumplimiento para tooltips
+            irl_con_nombres = irl_con_nombres.merge(
+                df_indicadores[['ID_Proyecto', 'Indicador_Cumplimiento_EBCT', 'Indicador_Madurez_Global']],
+                on='ID_Proyecto',
+                how='left'
+            )
         
-        # Crear texto personalizado para tooltips
-        irl_con_nombres['Tooltip_Info'] = irl_con_nombres.apply(
-            lambda row: (
-                f"<b>{row['Nombre_Proyecto']}</b><br>"
-                f"<b>Dimensión:</b> {row['Dimension']}<br>"
-                f"<b>Nivel Alcanzado:</b> {row['Nivel_Alcanzado']}/9<br>"
-                f"<b>Progreso:</b> {(row['Nivel_Alcanzado']/9*100):.1f}%<br>"
-                f"<b>Cumplimiento EBCT:</b> {row['Indicador_Cumplimiento_EBCT']:.0f}%<br>"
-                f"<b>Madurez Global:</b> {row['Indicador_Madurez_Global']:.1f}%<br>"
-                f"<b>Estado:</b> {'⭐ Máximo' if row['Nivel_Alcanzado'] == 9 else '🔄 En progreso'}"
-            ),
-            axis=1
-        )
+            # Crear texto personalizado para tooltips
+            irl_con_nombres['Tooltip_Info'] = irl_con_nombres.apply(
+                lambda row: (
+                    f"<b>{row['Nombre_Proyecto']}</b><br>"
+                    f"<b>Dimensión:</b> {row['Dimension']}<br>"
+                    f"<b>Nivel Alcanzado:</b> {row['Nivel_Alcanzado']}/9<br>"
+                    f"<b>Progreso:</b> {(row['Nivel_Alcanzado']/9*100):.1f}%<br>"
+                    f"<b>Cumplimiento EBCT:</b> {row['Indicador_Cumplimiento_EBCT']:.0f}%<br>"
+                    f"<b>Madurez Global:</b> {row['Indicador_Madurez_Global']:.1f}%<br>"
+                    f"<b>Estado:</b> {'⭐ Máximo' if row['Nivel_Alcanzado'] == 9 else '🔄 En progreso'}"
+                ),
+                axis=1
+            )
         
-        # Paleta de colores profesional para dimensiones (6 colores distintos)
-        color_dimension_map = {
-            'Investigación y Validación Técnica': '#1E88E5',  # Azul
-            'Estrategia de Propiedad Intelectual': '#43A047',  # Verde
-            'Preparación del Mercado': '#FB8C00',  # Naranja
-            'Preparación Organizacional': '#8E24AA',  # Púrpura
-            'Evaluación de Riesgos y Financiamiento': '#E53935',  # Rojo
-            'Estrategia y Gestión para Exportación': '#00ACC1'  # Cyan
-        }
+            # Paleta de colores profesional para dimensiones (6 colores distintos)
+            color_dimension_map = {
+                'Investigación y Validación Técnica': '#1E88E5',  # Azul
+                'Estrategia de Propiedad Intelectual': '#43A047',  # Verde
+                'Preparación del Mercado': '#FB8C00',  # Naranja
+                'Preparación Organizacional': '#8E24AA',  # Púrpura
+                'Evaluación de Riesgos y Financiamiento': '#E53935',  # Rojo
+                'Estrategia y Gestión para Exportación': '#00ACC1'  # Cyan
+            }
         
-        # Asignar colores
-        irl_con_nombres['Color'] = irl_con_nombres['Dimension'].map(color_dimension_map)
+            # Asignar colores
+            irl_con_nombres['Color'] = irl_con_nombres['Dimension'].map(color_dimension_map)
         
-        # Crear gráfico de barras con diseño profesional
-        fig_irl_dimensiones = go.Figure()
+            # Crear gráfico de barras con diseño profesional
+            fig_irl_dimensiones = go.Figure()
         
-        # Agrupar por proyecto para crear barras agrupadas
-        for proyecto_id in irl_con_nombres['ID_Proyecto'].unique():
-            datos_proyecto = irl_con_nombres[irl_con_nombres['ID_Proyecto'] == proyecto_id]
-            nombre_proyecto = datos_proyecto['Nombre_Proyecto'].iloc[0]
+            # Agrupar por proyecto para crear barras agrupadas
+            for proyecto_id in irl_con_nombres['ID_Proyecto'].unique():
+                datos_proyecto = irl_con_nombres[irl_con_nombres['ID_Proyecto'] == proyecto_id]
+                nombre_proyecto = datos_proyecto['Nombre_Proyecto'].iloc[0]
             
-            fig_irl_dimensiones.add_trace(go.Bar(
-                name=nombre_proyecto,
-                x=datos_proyecto['Dimension'],
-                y=datos_proyecto['Nivel_Alcanzado'],
-                marker=dict(
-                    color=datos_proyecto['Color'],
-                    line=dict(color='white', width=2),
-                    pattern_shape="",  # Sin patrón por defecto
-                ),
-                text=datos_proyecto['Nivel_Alcanzado'],
-                textposition='outside',
-                textfont=dict(size=11, color='#333', family='Arial Black'),
-                hovertemplate='%{customdata}<extra></extra>',
-                customdata=datos_proyecto['Tooltip_Info'],
-                showlegend=True,
-                legendgroup=proyecto_id
-            ))
+                fig_irl_dimensiones.add_trace(go.Bar(
+                    name=nombre_proyecto,
+                    x=datos_proyecto['Dimension'],
+                    y=datos_proyecto['Nivel_Alcanzado'],
+                    marker=dict(
+                        color=datos_proyecto['Color'],
+                        line=dict(color='white', width=2),
+                        pattern_shape="",  # Sin patrón por defecto
+                    ),
+                    text=datos_proyecto['Nivel_Alcanzado'],
+                    textposition='outside',
+                    textfont=dict(size=11, color='#333', family='Arial Black'),
+                    hovertemplate='%{customdata}<extra></extra>',
+                    customdata=datos_proyecto['Tooltip_Info'],
+                    showlegend=True,
+                    legendgroup=proyecto_id
+                ))
         
-        # Configuración del layout profesional
-        fig_irl_dimensiones.update_layout(
-            barmode='group',
-            xaxis=dict(
-                title=None,  # Sin título en eje X
-                showticklabels=False,  # Ocultar etiquetas del eje X
-                showgrid=False,
-                linecolor='#e0e0e0',
-                linewidth=2
-            ),
-            yaxis=dict(
-                title=dict(
-                    text="<b>Nivel Alcanzado (1-9)</b>",
-                    font=dict(size=14, family='Arial', color='#1a237e')
+            # Configuración del layout profesional
+            fig_irl_dimensiones.update_layout(
+                barmode='group',
+                xaxis=dict(
+                    title=None,  # Sin título en eje X
+                    showticklabels=False,  # Ocultar etiquetas del eje X
+                    showgrid=False,
+                    linecolor='#e0e0e0',
+                    linewidth=2
                 ),
-                range=[0, 10],
-                dtick=1,
-                showgrid=True,
-                gridwidth=1,
-                gridcolor='#e8eaf6',
-                linecolor='#e0e0e0',
-                linewidth=2,
-                tickfont=dict(size=11)
-            ),
-            plot_bgcolor='#fafafa',
-            paper_bgcolor='white',
-            height=550,
-            hovermode='closest',
-            hoverlabel=dict(
-                bgcolor="white",
-                font_size=12,
-                font_family="Arial",
-                bordercolor="#1E88E5"
-            ),
-            showlegend=False,  # Ocultar leyenda de proyectos
-            margin=dict(l=80, r=40, t=40, b=80),  # Reducir margen inferior
-            font=dict(family='Arial, sans-serif')
-        )
+                yaxis=dict(
+                    title=dict(
+                        text="<b>Nivel Alcanzado (1-9)</b>",
+                        font=dict(size=14, family='Arial', color='#1a237e')
+                    ),
+                    range=[0, 10],
+                    dtick=1,
+                    showgrid=True,
+                    gridwidth=1,
+                    gridcolor='#e8eaf6',
+                    linecolor='#e0e0e0',
+                    linewidth=2,
+                    tickfont=dict(size=11)
+                ),
+                plot_bgcolor='#fafafa',
+                paper_bgcolor='white',
+                height=550,
+                hovermode='closest',
+                hoverlabel=dict(
+                    bgcolor="white",
+                    font_size=12,
+                    font_family="Arial",
+                    bordercolor="#1E88E5"
+                ),
+                showlegend=False,  # Ocultar leyenda de proyectos
+                margin=dict(l=80, r=40, t=40, b=80),  # Reducir margen inferior
+                font=dict(family='Arial, sans-serif')
+            )
         
-        # Agregar línea de referencia para nivel máximo
-        fig_irl_dimensiones.add_hline(
-            y=9, 
-            line_dash="dash", 
-            line_color="#1565C0", 
-            line_width=2,
-            annotation_text="Nivel Máximo (9)",
-            annotation_position="right",
-            annotation_font_size=10,
-            annotation_font_color="#1565C0"
-        )
+            # Agregar línea de referencia para nivel máximo
+            fig_irl_dimensiones.add_hline(
+                y=9, 
+                line_dash="dash", 
+                line_color="#1565C0", 
+                line_width=2,
+                annotation_text="Nivel Máximo (9)",
+                annotation_position="right",
+                annotation_font_size=10,
+                annotation_font_color="#1565C0"
+            )
         
-        # Agregar sombreado para zonas de madurez
-        fig_irl_dimensiones.add_hrect(
-            y0=7, y1=9, 
-            fillcolor="#C8E6C9", 
-            opacity=0.15, 
-            layer="below", 
-            line_width=0,
-            annotation_text="Alto",
-            annotation_position="left",
-            annotation_font_size=9,
-            annotation_font_color="#2E7D32"
-        )
-        fig_irl_dimensiones.add_hrect(
-            y0=4, y1=7, 
-            fillcolor="#FFF9C4", 
-            opacity=0.15, 
-            layer="below", 
-            line_width=0,
-            annotation_text="Medio",
-            annotation_position="left",
-            annotation_font_size=9,
-            annotation_font_color="#F57C00"
-        )
-        fig_irl_dimensiones.add_hrect(
-            y0=0, y1=4, 
-            fillcolor="#FFCDD2", 
-            opacity=0.15, 
-            layer="below", 
-            line_width=0,
-            annotation_text="Bajo",
-            annotation_position="left",
-            annotation_font_size=9,
-            annotation_font_color="#C62828"
-        )
+            # Agregar sombreado para zonas de madurez
+            fig_irl_dimensiones.add_hrect(
+                y0=7, y1=9, 
+                fillcolor="#C8E6C9", 
+                opacity=0.15, 
+                layer="below", 
+                line_width=0,
+                annotation_text="Alto",
+                annotation_position="left",
+                annotation_font_size=9,
+                annotation_font_color="#2E7D32"
+            )
+            fig_irl_dimensiones.add_hrect(
+                y0=4, y1=7, 
+                fillcolor="#FFF9C4", 
+                opacity=0.15, 
+                layer="below", 
+                line_width=0,
+                annotation_text="Medio",
+                annotation_position="left",
+                annotation_font_size=9,
+                annotation_font_color="#F57C00"
+            )
+            fig_irl_dimensiones.add_hrect(
+                y0=0, y1=4, 
+                fillcolor="#FFCDD2", 
+                opacity=0.15, 
+                layer="below", 
+                line_width=0,
+                annotation_text="Bajo",
+                annotation_position="left",
+                annotation_font_size=9,
+                annotation_font_color="#C62828"
+            )
+            return fig_irl_dimensiones
+        
+        fig_irl_dimensiones = figure_cache.cached_figure("irl_dimensiones", huella_datos, (), _fig_irl_dimensiones)
         
         st.plotly_chart(fig_irl_dimensiones, use_container_width=True, key="chart_irl_dimensiones_pro")
         
@@ -756,33 +665,43 @@ if st.session_state.proyectos_db:
         with col_chart1:
             st.markdown("#### 🎯 Cumplimiento EBCT por Proyecto")
             st.caption("Porcentaje de características en estado 🟢 Verde")
-            fig_ebct_cumpl = px.bar(
-                df_indicadores.sort_values('Indicador_Cumplimiento_EBCT', ascending=False),
-                x='Nombre_Proyecto',
-                y='Indicador_Cumplimiento_EBCT',
-                color='Indicador_Cumplimiento_EBCT',
-                color_continuous_scale='Teal',
-                labels={'Indicador_Cumplimiento_EBCT': 'Cumplimiento %', 'Nombre_Proyecto': 'Proyecto'}
-            )
-            fig_ebct_cumpl.update_layout(height=400, showlegend=False)
-            fig_ebct_cumpl.update_xaxes(tickangle=-45)
-            fig_ebct_cumpl.update_yaxes(range=[0, 100])
+            def _fig_ebct_cumpl():
+                fig_ebct_cumpl = px.bar(
+                    df_indicadores.sort_values('Indicador_Cumplimiento_EBCT', ascending=False),
+                    x='Nombre_Proyecto',
+                    y='Indicador_Cumplimiento_EBCT',
+                    color='Indicador_Cumplimiento_EBCT',
+                    color_continuous_scale='Teal',
+                    labels={'Indicador_Cumplimiento_EBCT': 'Cumplimiento %', 'Nombre_Proyecto': 'Proyecto'}
+                )
+                fig_ebct_cumpl.update_layout(height=400, showlegend=False)
+                fig_ebct_cumpl.update_xaxes(tickangle=-45)
+                fig_ebct_cumpl.update_yaxes(range=[0, 100])
+                return fig_ebct_cumpl
+            
+            fig_ebct_cumpl = figure_cache.cached_figure("ebct_cumplimiento", huella_datos, (), _fig_ebct_cumpl)
+            
             st.plotly_chart(fig_ebct_cumpl, use_container_width=True, key="chart_ebct_cumpl")
         
         with col_chart2:
             st.markdown("#### 🏆 Índice de Madurez Global")
             st.caption("📐 Fórmula: (IRL_promedio/9 × 40%) + (EBCT_cumplimiento × 60%)")
-            fig_madurez = px.bar(
-                df_indicadores.sort_values('Indicador_Madurez_Global', ascending=False),
-                x='Nombre_Proyecto',
-                y='Indicador_Madurez_Global',
-                color='Indicador_Madurez_Global',
-                color_continuous_scale='Blues',
-                labels={'Indicador_Madurez_Global': 'Madurez %', 'Nombre_Proyecto': 'Proyecto'}
-            )
-            fig_madurez.update_layout(height=400, showlegend=False)
-            fig_madurez.update_xaxes(tickangle=-45)
-            fig_madurez.update_yaxes(range=[0, 100])
+            def _fig_madurez():
+                fig_madurez = px.bar(
+                    df_indicadores.sort_values('Indicador_Madurez_Global', ascending=False),
+                    x='Nombre_Proyecto',
+                    y='Indicador_Madurez_Global',
+                    color='Indicador_Madurez_Global',
+                    color_continuous_scale='Blues',
+                    labels={'Indicador_Madurez_Global': 'Madurez %', 'Nombre_Proyecto': 'Proyecto'}
+                )
+                fig_madurez.update_layout(height=400, showlegend=False)
+                fig_madurez.update_xaxes(tickangle=-45)
+                fig_madurez.update_yaxes(range=[0, 100])
+                return fig_madurez
+            
+            fig_madurez = figure_cache.cached_figure("madurez_global", huella_datos, (), _fig_madurez)
+            
             st.plotly_chart(fig_madurez, use_container_width=True, key="chart_madurez")
         
         st.markdown("---")
@@ -903,49 +822,53 @@ if st.session_state.proyectos_db:
                     
                     for col_idx, proy in enumerate(proyectos_seleccionados[start_idx:end_idx]):
                         with cols[col_idx]:
-                            ebct_proy = ebct_comparacion[ebct_comparacion['ID_Proyecto'] == proy]
+                            def _fig_pie_comparativo():
+                                ebct_proy = ebct_comparacion[ebct_comparacion['ID_Proyecto'] == proy]
                             
-                            verdes = len(ebct_proy[ebct_proy['Estado_Color'] == 3])
-                            amarillos = len(ebct_proy[ebct_proy['Estado_Color'] == 2])
-                            rojos = len(ebct_proy[ebct_proy['Estado_Color'] == 1])
-                            total = len(ebct_proy)
+                                verdes = len(ebct_proy[ebct_proy['Estado_Color'] == 3])
+                                amarillos = len(ebct_proy[ebct_proy['Estado_Color'] == 2])
+                                rojos = len(ebct_proy[ebct_proy['Estado_Color'] == 1])
+                                total = len(ebct_proy)
                             
-                            # Crear gráfico de pie profesional
-                            fig_pie = go.Figure(data=[go.Pie(
-                                labels=['🟢 Verde', '🟡 Amarillo', '🔴 Rojo'],
-                                values=[verdes, amarillos, rojos],
-                                marker=dict(
-                                    colors=['#2e7d32', '#f57c00', '#c62828'],
-                                    line=dict(color='white', width=3)
-                                ),
-                                textinfo='label+percent',
-                                textposition='inside',
-                                textfont=dict(size=11, color='white', family='Arial Black'),
-                                hovertemplate='<b>%{label}</b><br>Cantidad: %{value}<br>Porcentaje: %{percent}<extra></extra>',
-                                hole=0.4,  # Donut chart
-                                pull=[0.05 if verdes == max(verdes, amarillos, rojos) else 0,
-                                      0.05 if amarillos == max(verdes, amarillos, rojos) else 0,
-                                      0.05 if rojos == max(verdes, amarillos, rojos) else 0]
-                            )])
+                                # Crear gráfico de pie profesional
+                                fig_pie = go.Figure(data=[go.Pie(
+                                    labels=['🟢 Verde', '🟡 Amarillo', '🔴 Rojo'],
+                                    values=[verdes, amarillos, rojos],
+                                    marker=dict(
+                                        colors=['#2e7d32', '#f57c00', '#c62828'],
+                                        line=dict(color='white', width=3)
+                                    ),
+                                    textinfo='label+percent',
+                                    textposition='inside',
+                                    textfont=dict(size=11, color='white', family='Arial Black'),
+                                    hovertemplate='<b>%{label}</b><br>Cantidad: %{value}<br>Porcentaje: %{percent}<extra></extra>',
+                                    hole=0.4,  # Donut chart
+                                    pull=[0.05 if verdes == max(verdes, amarillos, rojos) else 0,
+                                          0.05 if amarillos == max(verdes, amarillos, rojos) else 0,
+                                          0.05 if rojos == max(verdes, amarillos, rojos) else 0]
+                                )])
                             
-                            fig_pie.update_layout(
-                                title=dict(
-                                    text=f"<b>{proyectos_nombres[proy]}</b><br><sub>{total} características</sub>",
-                                    font=dict(size=13, family='Arial'),
-                                    x=0.5,
-                                    xanchor='center'
-                                ),
-                                showlegend=False,
-                                height=280,
-                                margin=dict(t=60, b=20, l=20, r=20),
-                                paper_bgcolor='rgba(0,0,0,0)',
-                                annotations=[dict(
-                                    text=f'<b>{verdes}</b><br>Verde',
-                                    x=0.5, y=0.5,
-                                    font=dict(size=14, color='#2e7d32'),
-                                    showarrow=False
-                                )]
-                            )
+                                fig_pie.update_layout(
+                                    title=dict(
+                                        text=f"<b>{proyectos_nombres[proy]}</b><br><sub>{total} características</sub>",
+                                        font=dict(size=13, family='Arial'),
+                                        x=0.5,
+                                        xanchor='center'
+                                    ),
+                                    showlegend=False,
+                                    height=280,
+                                    margin=dict(t=60, b=20, l=20, r=20),
+                                    paper_bgcolor='rgba(0,0,0,0)',
+                                    annotations=[dict(
+                                        text=f'<b>{verdes}</b><br>Verde',
+                                        x=0.5, y=0.5,
+                                        font=dict(size=14, color='#2e7d32'),
+                                        showarrow=False
+                                    )]
+                                )
+                                return fig_pie
+                            
+                            fig_pie = figure_cache.cached_figure("pie_comparativo", huella_datos, proy, _fig_pie_comparativo)
                             
                             st.plotly_chart(fig_pie, use_container_width=True, key=f"pie_comp_{proy}")
             
@@ -960,58 +883,62 @@ if st.session_state.proyectos_db:
                 st.markdown("#### 📡 Radar IRL - 6 Dimensiones")
                 st.caption("Comparación de niveles alcanzados por dimensión IRL")
                 
-                # Preparar datos IRL para radar
-                irl_comparacion = df_irl[df_irl['ID_Proyecto'].isin(proyectos_seleccionados)].copy()
-                
-                fig_radar_irl = go.Figure()
-                
                 # Paleta de colores para proyectos
                 colores_proyectos = ['#1E88E5', '#43A047', '#FB8C00', '#8E24AA', '#E53935', '#00ACC1', 
                                      '#FDD835', '#F06292', '#7CB342', '#5E35B1']
                 
-                for idx, proy in enumerate(proyectos_seleccionados):
-                    irl_proy = irl_comparacion[irl_comparacion['ID_Proyecto'] == proy].sort_values('Dimension')
+                def _fig_radar_irl_comparativo():
+                    # Preparar datos IRL para radar
+                    irl_comparacion = df_irl[df_irl['ID_Proyecto'].isin(proyectos_seleccionados)].copy()
+                
+                    fig_radar_irl = go.Figure()
+                
+                    for idx, proy in enumerate(proyectos_seleccionados):
+                        irl_proy = irl_comparacion[irl_comparacion['ID_Proyecto'] == proy].sort_values('Dimension')
                     
-                    fig_radar_irl.add_trace(go.Scatterpolar(
-                        r=irl_proy['Nivel_Alcanzado'].tolist(),
-                        theta=irl_proy['Dimension'].tolist(),
-                        fill='toself',
-                        name=proyectos_nombres[proy],
-                        line=dict(color=colores_proyectos[idx % len(colores_proyectos)], width=3),
-                        fillcolor=f"rgba{tuple(list(int(colores_proyectos[idx % len(colores_proyectos)][i:i+2], 16) for i in (1, 3, 5)) + [0.15])}",
-                        hovertemplate='<b>%{theta}</b><br>Nivel: %{r}/9<extra></extra>'
-                    ))
+                        fig_radar_irl.add_trace(go.Scatterpolar(
+                            r=irl_proy['Nivel_Alcanzado'].tolist(),
+                            theta=irl_proy['Dimension'].tolist(),
+                            fill='toself',
+                            name=proyectos_nombres[proy],
+                            line=dict(color=colores_proyectos[idx % len(colores_proyectos)], width=3),
+                            fillcolor=f"rgba{tuple(list(int(colores_proyectos[idx % len(colores_proyectos)][i:i+2], 16) for i in (1, 3, 5)) + [0.15])}",
+                            hovertemplate='<b>%{theta}</b><br>Nivel: %{r}/9<extra></extra>'
+                        ))
                 
-                fig_radar_irl.update_layout(
-                    polar=dict(
-                        radialaxis=dict(
-                            visible=True,
-                            range=[0, 9],
-                            tickmode='linear',
-                            tick0=0,
-                            dtick=1,
-                            gridcolor='#e0e0e0',
-                            gridwidth=1
+                    fig_radar_irl.update_layout(
+                        polar=dict(
+                            radialaxis=dict(
+                                visible=True,
+                                range=[0, 9],
+                                tickmode='linear',
+                                tick0=0,
+                                dtick=1,
+                                gridcolor='#e0e0e0',
+                                gridwidth=1
+                            ),
+                            angularaxis=dict(
+                                gridcolor='#e0e0e0',
+                                linecolor='#bdbdbd'
+                            ),
+                            bgcolor='#fafafa'
                         ),
-                        angularaxis=dict(
-                            gridcolor='#e0e0e0',
-                            linecolor='#bdbdbd'
+                        showlegend=True,
+                        legend=dict(
+                            orientation='h',
+                            yanchor='bottom',
+                            y=-0.3,
+                            xanchor='center',
+                            x=0.5,
+                            font=dict(size=10)
                         ),
-                        bgcolor='#fafafa'
-                    ),
-                    showlegend=True,
-                    legend=dict(
-                        orientation='h',
-                        yanchor='bottom',
-                        y=-0.3,
-                        xanchor='center',
-                        x=0.5,
-                        font=dict(size=10)
-                    ),
-                    height=500,
-                    margin=dict(t=40, b=100, l=40, r=40),
-                    paper_bgcolor='white'
-                )
+                        height=500,
+                        margin=dict(t=40, b=100, l=40, r=40),
+                        paper_bgcolor='white'
+                    )
+                    return fig_radar_irl
+                
+                fig_radar_irl = figure_cache.cached_figure("radar_irl_comparativo", huella_datos, tuple(proyectos_seleccionados), _fig_radar_irl_comparativo)
                 
                 st.plotly_chart(fig_radar_irl, use_container_width=True, key="radar_irl_comp")
             
@@ -1019,84 +946,88 @@ if st.session_state.proyectos_db:
                 st.markdown("#### 🎯 Radar EBCT - 4 Fases")
                 st.caption("Comparación de cumplimiento por fase EBCT")
                 
-                # Preparar datos EBCT para radar por fases
-                ebct_comp_radar = ebct_comparacion.copy()
+                def _fig_radar_ebct_comparativo():
+                    # Preparar datos EBCT para radar por fases
+                    ebct_comp_radar = ebct_comparacion.copy()
                 
-                # Normalizar nombres de fase
-                mapeo_fases_radar = {
-                    "Fase 1": "Fase Incipiente",
-                    "Fase 2": "Fase Validación y PI",
-                    "Fase 3": "Fase Preparación para Mercado",
-                    "Fase 4": "Fase Internacionalización"
-                }
+                    # Normalizar nombres de fase
+                    mapeo_fases_radar = {
+                        "Fase 1": "Fase Incipiente",
+                        "Fase 2": "Fase Validación y PI",
+                        "Fase 3": "Fase Preparación para Mercado",
+                        "Fase 4": "Fase Internacionalización"
+                    }
                 
-                if 'Fase' in ebct_comp_radar.columns:
-                    ebct_comp_radar['Fase_Normalizada'] = ebct_comp_radar['Fase'].map(mapeo_fases_radar).fillna(ebct_comp_radar['Fase'])
+                    if 'Fase' in ebct_comp_radar.columns:
+                        ebct_comp_radar['Fase_Normalizada'] = ebct_comp_radar['Fase'].map(mapeo_fases_radar).fillna(ebct_comp_radar['Fase'])
                 
-                fig_radar_ebct = go.Figure()
+                    fig_radar_ebct = go.Figure()
                 
-                fases_orden = [
-                    "Fase Incipiente",
-                    "Fase Validación y PI",
-                    "Fase Preparación para Mercado",
-                    "Fase Internacionalización"
-                ]
+                    fases_orden = [
+                        "Fase Incipiente",
+                        "Fase Validación y PI",
+                        "Fase Preparación para Mercado",
+                        "Fase Internacionalización"
+                    ]
                 
-                for idx, proy in enumerate(proyectos_seleccionados):
-                    ebct_proy = ebct_comp_radar[ebct_comp_radar['ID_Proyecto'] == proy]
+                    for idx, proy in enumerate(proyectos_seleccionados):
+                        ebct_proy = ebct_comp_radar[ebct_comp_radar['ID_Proyecto'] == proy]
                     
-                    # Calcular % cumplimiento por fase (verdes/total * 100)
-                    cumplimiento_por_fase = []
-                    for fase in fases_orden:
-                        fase_data = ebct_proy[ebct_proy.get('Fase_Normalizada', ebct_proy.get('Fase', '')) == fase]
-                        if len(fase_data) > 0:
-                            verdes_fase = len(fase_data[fase_data['Estado_Color'] == 3])
-                            cumplimiento = (verdes_fase / len(fase_data)) * 100
-                        else:
-                            cumplimiento = 0
-                        cumplimiento_por_fase.append(cumplimiento)
+                        # Calcular % cumplimiento por fase (verdes/total * 100)
+                        cumplimiento_por_fase = []
+                        for fase in fases_orden:
+                            fase_data = ebct_proy[ebct_proy.get('Fase_Normalizada', ebct_proy.get('Fase', '')) == fase]
+                            if len(fase_data) > 0:
+                                verdes_fase = len(fase_data[fase_data['Estado_Color'] == 3])
+                                cumplimiento = (verdes_fase / len(fase_data)) * 100
+                            else:
+                                cumplimiento = 0
+                            cumplimiento_por_fase.append(cumplimiento)
                     
-                    fig_radar_ebct.add_trace(go.Scatterpolar(
-                        r=cumplimiento_por_fase,
-                        theta=[f.replace('Fase ', 'F') for f in fases_orden],
-                        fill='toself',
-                        name=proyectos_nombres[proy],
-                        line=dict(color=colores_proyectos[idx % len(colores_proyectos)], width=3),
-                        fillcolor=f"rgba{tuple(list(int(colores_proyectos[idx % len(colores_proyectos)][i:i+2], 16) for i in (1, 3, 5)) + [0.15])}",
-                        hovertemplate='<b>%{theta}</b><br>Cumplimiento: %{r:.1f}%<extra></extra>'
-                    ))
+                        fig_radar_ebct.add_trace(go.Scatterpolar(
+                            r=cumplimiento_por_fase,
+                            theta=[f.replace('Fase ', 'F') for f in fases_orden],
+                            fill='toself',
+                            name=proyectos_nombres[proy],
+                            line=dict(color=colores_proyectos[idx % len(colores_proyectos)], width=3),
+                            fillcolor=f"rgba{tuple(list(int(colores_proyectos[idx % len(colores_proyectos)][i:i+2], 16) for i in (1, 3, 5)) + [0.15])}",
+                            hovertemplate='<b>%{theta}</b><br>Cumplimiento: %{r:.1f}%<extra></extra>'
+                        ))
                 
-                fig_radar_ebct.update_layout(
-                    polar=dict(
-                        radialaxis=dict(
-                            visible=True,
-                            range=[0, 100],
-                            tickmode='linear',
-                            tick0=0,
-                            dtick=20,
-                            ticksuffix='%',
-                            gridcolor='#e0e0e0',
-                            gridwidth=1
+                    fig_radar_ebct.update_layout(
+                        polar=dict(
+                            radialaxis=dict(
+                                visible=True,
+                                range=[0, 100],
+                                tickmode='linear',
+                                tick0=0,
+                                dtick=20,
+                                ticksuffix='%',
+                                gridcolor='#e0e0e0',
+                                gridwidth=1
+                            ),
+                            angularaxis=dict(
+                                gridcolor='#e0e0e0',
+                                linecolor='#bdbdbd'
+                            ),
+                            bgcolor='#fafafa'
                         ),
-                        angularaxis=dict(
-                            gridcolor='#e0e0e0',
-                            linecolor='#bdbdbd'
+                        showlegend=True,
+                        legend=dict(
+                            orientation='h',
+                            yanchor='bottom',
+                            y=-0.3,
+                            xanchor='center',
+                            x=0.5,
+                            font=dict(size=10)
                         ),
-                        bgcolor='#fafafa'
-                    ),
-                    showlegend=True,
-                    legend=dict(
-                        orientation='h',
-                        yanchor='bottom',
-                        y=-0.3,
-                        xanchor='center',
-                        x=0.5,
-                        font=dict(size=10)
-                    ),
-                    height=500,
-                    margin=dict(t=40, b=100, l=40, r=40),
-                    paper_bgcolor='white'
-                )
+                        height=500,
+                        margin=dict(t=40, b=100, l=40, r=40),
+                        paper_bgcolor='white'
+                    )
+                    return fig_radar_ebct
+                
+                fig_radar_ebct = figure_cache.cached_figure("radar_ebct_comparativo", huella_datos, tuple(proyectos_seleccionados), _fig_radar_ebct_comparativo)
                 
                 st.plotly_chart(fig_radar_ebct, use_container_width=True, key="radar_ebct_comp")
             
@@ -1603,32 +1534,37 @@ if st.session_state.proyectos_db:
             with col_graf1:
                 st.markdown("##### 🎯 IRL por Dimensión")
                 st.caption("Escala: 1-9 (logro por dimensión)")
-                fig_radar_irl = go.Figure()
-                fig_radar_irl.add_trace(go.Scatterpolar(
-                    r=proyecto_irl['Nivel_Alcanzado'].tolist(),
-                    theta=proyecto_irl['Dimension'].tolist(),
-                    fill='toself',
-                    name='Nivel Alcanzado',
-                    line_color='#0288d1',
-                    fillcolor='rgba(2, 136, 209, 0.3)',
-                    line_width=2
-                ))
-                fig_radar_irl.update_layout(
-                    polar=dict(
-                        radialaxis=dict(
-                            visible=True, 
-                            range=[0, 9],
-                            tickmode='linear',
-                            tick0=0,
-                            dtick=1,
-                            gridcolor='#e0e0e0'
+                def _fig_radar_irl_individual():
+                    fig_radar_irl = go.Figure()
+                    fig_radar_irl.add_trace(go.Scatterpolar(
+                        r=proyecto_irl['Nivel_Alcanzado'].tolist(),
+                        theta=proyecto_irl['Dimension'].tolist(),
+                        fill='toself',
+                        name='Nivel Alcanzado',
+                        line_color='#0288d1',
+                        fillcolor='rgba(2, 136, 209, 0.3)',
+                        line_width=2
+                    ))
+                    fig_radar_irl.update_layout(
+                        polar=dict(
+                            radialaxis=dict(
+                                visible=True, 
+                                range=[0, 9],
+                                tickmode='linear',
+                                tick0=0,
+                                dtick=1,
+                                gridcolor='#e0e0e0'
+                            ),
+                            angularaxis=dict(gridcolor='#e0e0e0')
                         ),
-                        angularaxis=dict(gridcolor='#e0e0e0')
-                    ),
-                    showlegend=False,
-                    height=350,
-                    margin=dict(l=40, r=40, t=40, b=40)
-                )
+                        showlegend=False,
+                        height=350,
+                        margin=dict(l=40, r=40, t=40, b=40)
+                    )
+                    return fig_radar_irl
+                
+                fig_radar_irl = figure_cache.cached_figure("radar_irl_individual", huella_datos, proyecto_seleccionado, _fig_radar_irl_individual)
+                
                 st.plotly_chart(fig_radar_irl, use_container_width=True, key=f"radar_irl_ind_{proyecto_seleccionado}")
             
             with col_graf2:
@@ -1642,41 +1578,45 @@ if st.session_state.proyectos_db:
                 total = len(proyecto_ebct)
                 
                 if total > 0:
-                    # Crear gráfico de pie con go.Figure (estilo comparativo)
-                    fig_pie = go.Figure(data=[go.Pie(
-                        labels=['� Verde', '🟡 Amarillo', '�🔴 Rojo'],
-                        values=[verdes, amarillos, rojos],
-                        hole=0.4,
-                        marker=dict(
-                            colors=['#2e7d32', '#f57c00', '#c62828'],
-                            line=dict(color='white', width=2)
-                        ),
-                        textposition='outside',
-                        textinfo='percent+label',
-                        pull=[0.1 if verdes == max(verdes, amarillos, rojos) else 0,
-                              0.1 if amarillos == max(verdes, amarillos, rojos) else 0,
-                              0.1 if rojos == max(verdes, amarillos, rojos) else 0]
-                    )])
+                    def _fig_pie_individual():
+                        # Crear gráfico de pie con go.Figure (estilo comparativo)
+                        fig_pie = go.Figure(data=[go.Pie(
+                            labels=['� Verde', '🟡 Amarillo', '�🔴 Rojo'],
+                            values=[verdes, amarillos, rojos],
+                            hole=0.4,
+                            marker=dict(
+                                colors=['#2e7d32', '#f57c00', '#c62828'],
+                                line=dict(color='white', width=2)
+                            ),
+                            textposition='outside',
+                            textinfo='percent+label',
+                            pull=[0.1 if verdes == max(verdes, amarillos, rojos) else 0,
+                                  0.1 if amarillos == max(verdes, amarillos, rojos) else 0,
+                                  0.1 if rojos == max(verdes, amarillos, rojos) else 0]
+                        )])
                     
-                    fig_pie.update_layout(
-                        height=350,
-                        margin=dict(l=20, r=20, t=40, b=20),
-                        showlegend=True,
-                        legend=dict(
-                            orientation="v",
-                            yanchor="middle",
-                            y=0.5,
-                            xanchor="left",
-                            x=1.05
-                        ),
-                        annotations=[dict(
-                            text=f'{verdes}<br>Verdes',
-                            x=0.5, y=0.5,
-                            font_size=18,
-                            font_color='#2e7d32',
-                            showarrow=False
-                        )]
-                    )
+                        fig_pie.update_layout(
+                            height=350,
+                            margin=dict(l=20, r=20, t=40, b=20),
+                            showlegend=True,
+                            legend=dict(
+                                orientation="v",
+                                yanchor="middle",
+                                y=0.5,
+                                xanchor="left",
+                                x=1.05
+                            ),
+                            annotations=[dict(
+                                text=f'{verdes}<br>Verdes',
+                                x=0.5, y=0.5,
+                                font_size=18,
+                                font_color='#2e7d32',
+                                showarrow=False
+                            )]
+                        )
+                        return fig_pie
+                    
+                    fig_pie = figure_cache.cached_figure("pie_individual", huella_datos, proyecto_seleccionado, _fig_pie_individual)
                     
                     st.plotly_chart(fig_pie, use_container_width=True, key=f"pie_ind_{proyecto_seleccionado}")
                 else:
@@ -1700,81 +1640,85 @@ if st.session_state.proyectos_db:
                         st.write("**Primeras 5 filas:**")
                         st.dataframe(radar_df[['Fase', 'Estado_Color', 'ID_Caracteristica']].head())
                     
-                    # Normalizar Fase a texto (puede venir como número o texto del Excel)
-                    if radar_df['Fase'].dtype in ['int64', 'float64']:
-                        # Si es numérico, convertir a texto
-                        fase_mapping_radar = {
-                            1: "Fase 1",
-                            2: "Fase 2",
-                            3: "Fase 3",
-                            4: "Fase 4"
-                        }
-                        radar_df['Fase_Normalizada'] = radar_df['Fase'].map(fase_mapping_radar)
-                    else:
-                        # Si ya es texto, usarlo directamente
-                        radar_df['Fase_Normalizada'] = radar_df['Fase'].astype(str)
+                    def _fig_radar_ebct_individual():
+                        # Normalizar Fase a texto (puede venir como número o texto del Excel)
+                        if radar_df['Fase'].dtype in ['int64', 'float64']:
+                            # Si es numérico, convertir a texto
+                            fase_mapping_radar = {
+                                1: "Fase 1",
+                                2: "Fase 2",
+                                3: "Fase 3",
+                                4: "Fase 4"
+                            }
+                            radar_df['Fase_Normalizada'] = radar_df['Fase'].map(fase_mapping_radar)
+                        else:
+                            # Si ya es texto, usarlo directamente
+                            radar_df['Fase_Normalizada'] = radar_df['Fase'].astype(str)
                     
-                    # Mapeo final a nombres completos
-                    mapeo_fases_completo = {
-                        "Fase 1": "Fase Incipiente",
-                        "1": "Fase Incipiente",
-                        "Fase 2": "Fase Validación y PI",
-                        "2": "Fase Validación y PI",
-                        "Fase 3": "Fase Preparación para Mercado",
-                        "3": "Fase Preparación para Mercado",
-                        "Fase 4": "Fase Internacionalización",
-                        "4": "Fase Internacionalización"
-                    }
-                    radar_df['Fase_Final'] = radar_df['Fase_Normalizada'].map(mapeo_fases_completo).fillna(radar_df['Fase_Normalizada'])
+                        # Mapeo final a nombres completos
+                        mapeo_fases_completo = {
+                            "Fase 1": "Fase Incipiente",
+                            "1": "Fase Incipiente",
+                            "Fase 2": "Fase Validación y PI",
+                            "2": "Fase Validación y PI",
+                            "Fase 3": "Fase Preparación para Mercado",
+                            "3": "Fase Preparación para Mercado",
+                            "Fase 4": "Fase Internacionalización",
+                            "4": "Fase Internacionalización"
+                        }
+                        radar_df['Fase_Final'] = radar_df['Fase_Normalizada'].map(mapeo_fases_completo).fillna(radar_df['Fase_Normalizada'])
                     
-                    # Calcular cumplimiento por fase
-                    fases_orden = [
-                        "Fase Incipiente",
-                        "Fase Validación y PI",
-                        "Fase Preparación para Mercado",
-                        "Fase Internacionalización"
-                    ]
+                        # Calcular cumplimiento por fase
+                        fases_orden = [
+                            "Fase Incipiente",
+                            "Fase Validación y PI",
+                            "Fase Preparación para Mercado",
+                            "Fase Internacionalización"
+                        ]
                     
-                    cumplimiento_por_fase = []
-                    for fase in fases_orden:
-                        fase_data = radar_df[radar_df['Fase_Final'] == fase]
-                        if len(fase_data) > 0:
-                            verdes_fase = len(fase_data[fase_data['Estado_Color'] == 3])
-                            cumplimiento = (verdes_fase / len(fase_data)) * 100
-                        else:
-                            cumplimiento = 0
-                        cumplimiento_por_fase.append(cumplimiento)
-                        cumplimiento_por_fase.append(cumplimiento)
+                        cumplimiento_por_fase = []
+                        for fase in fases_orden:
+                            fase_data = radar_df[radar_df['Fase_Final'] == fase]
+                            if len(fase_data) > 0:
+                                verdes_fase = len(fase_data[fase_data['Estado_Color'] == 3])
+                                cumplimiento = (verdes_fase / len(fase_data)) * 100
+                            else:
+                                cumplimiento = 0
+                            cumplimiento_por_fase.append(cumplimiento)
+                            cumplimiento_por_fase.append(cumplimiento)
                     
-                    # Crear gráfico radar
-                    fig_radar_ebct = go.Figure()
-                    fig_radar_ebct.add_trace(go.Scatterpolar(
-                        r=cumplimiento_por_fase,
-                        theta=[f.replace('Fase ', 'F') for f in fases_orden],
-                        fill='toself',
-                        name='Cumplimiento',
-                        line_color='#1f6b36',
-                        fillcolor='rgba(31, 107, 54, 0.35)',
-                        line_width=2
-                    ))
+                        # Crear gráfico radar
+                        fig_radar_ebct = go.Figure()
+                        fig_radar_ebct.add_trace(go.Scatterpolar(
+                            r=cumplimiento_por_fase,
+                            theta=[f.replace('Fase ', 'F') for f in fases_orden],
+                            fill='toself',
+                            name='Cumplimiento',
+                            line_color='#1f6b36',
+                            fillcolor='rgba(31, 107, 54, 0.35)',
+                            line_width=2
+                        ))
                     
-                    fig_radar_ebct.update_layout(
-                        polar=dict(
-                            radialaxis=dict(
-                                visible=True,
-                                range=[0, 100],
-                                tickmode='linear',
-                                tick0=0,
-                                dtick=20,
-                                ticksuffix='%',
-                                gridcolor='#e0e0e0'
+                        fig_radar_ebct.update_layout(
+                            polar=dict(
+                                radialaxis=dict(
+                                    visible=True,
+                                    range=[0, 100],
+                                    tickmode='linear',
+                                    tick0=0,
+                                    dtick=20,
+                                    ticksuffix='%',
+                                    gridcolor='#e0e0e0'
+                                ),
+                                angularaxis=dict(gridcolor='#e0e0e0')
                             ),
-                            angularaxis=dict(gridcolor='#e0e0e0')
-                        ),
-                        showlegend=False,
-                        height=350,
-                        margin=dict(l=40, r=40, t=40, b=40)
-                    )
+                            showlegend=False,
+                            height=350,
+                            margin=dict(l=40, r=40, t=40, b=40)
+                        )
+                        return fig_radar_ebct
+                    
+                    fig_radar_ebct = figure_cache.cached_figure("radar_ebct_individual", huella_datos, proyecto_seleccionado, _fig_radar_ebct_individual)
                     
                     st.plotly_chart(fig_radar_ebct, use_container_width=True, key=f"radar_ebct_ind_{proyecto_seleccionado}")
                 else:
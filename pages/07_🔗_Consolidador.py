@@ -3,12 +3,22 @@ Página de Consolidación de Evaluaciones
 ========================================
 Permite combinar archivos separados de Portafolio, IRL y EBCT 
 en un archivo consolidado único para la página de Indicadores.
+Cada categoría acepta varios archivos (uno por evaluador o unidad), que se
+leen en paralelo y se deduplican por ID_Proyecto y fecha de evaluación.
 """
 
 import pandas as pd
 import streamlit as st
 from io import BytesIO
 from datetime import datetime
+import sys
+from pathlib import Path
+
+# Agregar path para importar módulos core
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core import snapshots
+from core.consolidacion import consolidar_archivos, libro_indicadores
 
 st.set_page_config(
     page_title="Consolidador de Evaluaciones",
@@ -52,53 +62,71 @@ st.markdown("---")
 
 # Sección de carga de archivos
 st.markdown("### 📤 Paso 1: Cargar archivos individuales")
+st.caption("Puedes cargar varios archivos por categoría (por ejemplo, uno por evaluador); se consolidan en paralelo.")
 
 col_upload1, col_upload2, col_upload3 = st.columns(3)
 
 with col_upload1:
     st.markdown("#### 📂 Portafolio")
-    portafolio_file = st.file_uploader(
-        "Archivo de Portafolio",
+    portafolio_files = st.file_uploader(
+        "Archivos de Portafolio",
         type=['xlsx', 'xls'],
         key='upload_portafolio_cons',
-        help="Archivo descargado desde la Fase 0"
+        accept_multiple_files=True,
+        help="Archivos descargados desde la Fase 0"
     )
-    if portafolio_file:
-        st.success(f"✅ {portafolio_file.name}")
+    for archivo in portafolio_files:
+        st.success(f"✅ {archivo.name}")
 
 with col_upload2:
     st.markdown("#### 📈 IRL")
-    irl_file = st.file_uploader(
-        "Archivo de IRL",
+    irl_files = st.file_uploader(
+        "Archivos de IRL",
         type=['xlsx', 'xls'],
         key='upload_irl_cons',
-        help="Archivo descargado desde la Fase 1"
+        accept_multiple_files=True,
+        help="Archivos descargados desde la Fase 1"
     )
-    if irl_file:
-        st.success(f"✅ {irl_file.name}")
+    for archivo in irl_files:
+        st.success(f"✅ {archivo.name}")
 
 with col_upload3:
     st.markdown("#### 🧭 EBCT")
-    ebct_file = st.file_uploader(
-        "Archivo de EBCT",
+    ebct_files = st.file_uploader(
+        "Archivos de EBCT",
         type=['xlsx', 'xls'],
         key='upload_ebct_cons',
-        help="Archivo descargado desde la Fase 2"
+        accept_multiple_files=True,
+        help="Archivos descargados desde la Fase 2"
     )
-    if ebct_file:
-        st.success(f"✅ {ebct_file.name}")
+    for archivo in ebct_files:
+        st.success(f"✅ {archivo.name}")
 
 st.markdown("---")
 
 # Validación y consolidación
-if portafolio_file and irl_file and ebct_file:
+if portafolio_files and irl_files and ebct_files:
     st.markdown("### 🔍 Paso 2: Validación de datos")
     
     try:
-        # Leer archivos
-        df_portafolio = pd.read_excel(portafolio_file)
-        df_irl = pd.read_excel(irl_file)
-        df_ebct = pd.read_excel(ebct_file)
+        # Leer archivos (en paralelo cuando hay más de uno)
+        tareas = [
+            (categoria, archivo.name, archivo.getvalue())
+            for categoria, archivos in (("Portafolio", portafolio_files), ("IRL", irl_files), ("EBCT", ebct_files))
+            for archivo in archivos
+        ]
+        with st.spinner(f"⏳ Leyendo {len(tareas)} archivos..."):
+            hojas_leidas, reporte = consolidar_archivos(tareas)
+        
+        st.markdown("#### 📋 Reporte por archivo")
+        st.dataframe(reporte, use_container_width=True, hide_index=True)
+        
+        faltantes = [hoja for hoja in ('Indice', 'IRL', 'EBCT') if hoja not in hojas_leidas]
+        if faltantes:
+            raise ValueError(f"Ningún archivo válido para: {', '.join(faltantes)}")
+        df_portafolio = hojas_leidas['Indice']
+        df_irl = hojas_leidas['IRL']
+        df_ebct = hojas_leidas['EBCT']
         
         # Validaciones
         col_val1, col_val2, col_val3 = st.columns(3)
@@ -144,42 +172,65 @@ if portafolio_file and irl_file and ebct_file:
         
         with col_gen1:
             st.info("""
-            **El archivo consolidado contendrá:**
-            - 📄 Hoja 'Indice': Información de portafolio
-            - 📊 Hoja 'IRL': Evaluaciones de madurez tecnológica
-            - 🎯 Hoja 'EBCT': Características organizacionales
-            - 📅 Hoja 'Acciones': Plan de acción (si existe en EBCT)
+            **El archivo consolidado contendrá** (hojas del libro de Indicadores):
+            - 📄 Hoja 'Índice_Proyectos': Información de portafolio
+            - 📊 Hoja 'Niveles_IRL': Evaluaciones de madurez tecnológica
+            - 🎯 Hoja 'Características_EBCT': Características organizacionales
+            - 📅 Hoja 'Plan_Acción': Plan de acción (si existe en EBCT)
+            - 📈 Hoja 'Indicadores_Desempeño': Vacía, se calcula en Indicadores
+            
+            El formato Arrow IPC (.zip, un archivo por hoja) se carga sin
+            procesar Excel y permite lectura mapeada en memoria.
             """)
         
         with col_gen2:
+            formato_salida = st.radio(
+                "Formato de salida",
+                ["Excel (.xlsx)", "Arrow IPC (.zip)"],
+                key="formato_consolidado",
+                disabled=not snapshots.HAS_ARROW,
+                help=None if snapshots.HAS_ARROW else "Instala pyarrow para habilitar el formato Arrow",
+            )
             if st.button("🚀 Generar Consolidado", type="primary", use_container_width=True):
                 try:
-                    # Crear archivo consolidado
-                    buffer = BytesIO()
-                    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                        # Hoja Indice (Portafolio)
-                        df_portafolio.to_excel(writer, sheet_name='Indice', index=False)
-                        
-                        # Hoja IRL
-                        df_irl.to_excel(writer, sheet_name='IRL', index=False)
-                        
-                        # Hoja EBCT
-                        df_ebct.to_excel(writer, sheet_name='EBCT', index=False)
-                        
-                        # Hoja Acciones (si existe)
-                        if 'Descripcion' in df_ebct.columns:  # Asumir que tiene plan de acción
-                            # Extraer columnas de plan de acción
-                            cols_accion = [col for col in df_ebct.columns if 'Accion' in col or 'Responsable' in col or 'Fecha' in col or 'Completado' in col]
-                            if cols_accion:
-                                df_acciones = df_ebct[['ID_Proyecto'] + cols_accion].dropna(subset=['ID_Proyecto'])
-                                df_acciones.to_excel(writer, sheet_name='Acciones', index=False)
+                    # Hojas del consolidado
+                    hojas = {
+                        'Indice': df_portafolio,  # Portafolio
+                        'IRL': df_irl,
+                        'EBCT': df_ebct,
+                    }
+                    
+                    # Hoja Acciones (si existe)
+                    if 'Descripcion' in df_ebct.columns:  # Asumir que tiene plan de acción
+                        # Extraer columnas de plan de acción
+                        cols_accion = [col for col in df_ebct.columns if 'Accion' in col or 'Responsable' in col or 'Fecha' in col or 'Completado' in col or 'Avance' in col]
+                        if cols_accion:
+                            hojas['Acciones'] = df_ebct[['ID_Proyecto'] + cols_accion].dropna(subset=['ID_Proyecto'])
+                    
+                    # Nombres de hojas y columnas que valida la página de Indicadores
+                    hojas = libro_indicadores(hojas)
+                    
+                    marca = datetime.now().strftime('%Y%m%d_%H%M%S')
+                    if formato_salida.startswith("Arrow"):
+                        data = snapshots.bundle_to_bytes(hojas)
+                        file_name = f"CONSOLIDADO_{marca}.zip"
+                        mime = "application/zip"
+                    else:
+                        # Crear archivo consolidado
+                        buffer = BytesIO()
+                        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+                            for nombre_hoja, df_hoja in hojas.items():
+                                df_hoja.to_excel(writer, sheet_name=nombre_hoja, index=False)
+                        data = buffer.getvalue()
+                        file_name = f"CONSOLIDADO_{marca}.xlsx"
+                        mime = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
                     
                     # Botón de descarga
                     st.download_button(
                         label="⬇️ Descargar Archivo Consolidado",
-                        data=buffer.getvalue(),
-                        file_name=f"CONSOLIDADO_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                        data=data,
+                        file_name=file_name,
+                        mime=mime,
                         use_container_width=True
                     )
                     
@@ -202,7 +253,7 @@ if portafolio_file and irl_file and ebct_file:
         st.info("Verifica que los archivos tengan el formato correcto y contengan las columnas esperadas.")
 
 else:
-    st.warning("⚠️ Carga los 3 archivos (Portafolio, IRL y EBCT) para continuar")
+    st.warning("⚠️ Carga al menos un archivo de cada categoría (Portafolio, IRL y EBCT) para continuar")
     
     st.markdown("---")
     
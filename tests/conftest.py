@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core import db_pool
+
+
+@pytest.fixture()
+def temp_db(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Point the pool at an empty ``test.sqlite`` in ``tmp_path`` (yielded)."""
+
+    monkeypatch.setattr(db_pool, "DB_PATH", str(tmp_path / "test.sqlite"))
+    yield tmp_path
+    db_pool.close_all()
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core import batch_import
+
+
+def test_project_column_matches_both_importers_rule() -> None:
+    assert batch_import.project_column(["Dimensión", "ID_Proyecto", "id_innovacion"]) == "ID_Proyecto"
+    assert batch_import.project_column(["Característica", "ID_INNOVACION"]) == "ID_INNOVACION"
+    assert batch_import.project_column(["Característica", "Respuesta"]) is None
+
+
+def test_project_ids_reads_numeric_ids_with_blanks_as_text() -> None:
+    ids = batch_import.project_ids(pd.Series([12.0, None, 7.0]))
+
+    assert ids.tolist()[0] == "12"
+    assert pd.isna(ids.tolist()[1])
+    assert ids.tolist()[2] == "7"
+    assert batch_import.project_ids(pd.Series([" A1 ", "B2"])).tolist() == ["A1", "B2"]
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core import cache, db, db_trl
+
+
+@pytest.fixture()
+def temp_db(temp_db: Path):
+    db.init_db()
+    db_trl.init_db_trl()
+    return temp_db
+
+
+def test_key_invalidation_is_scoped() -> None:
+    table = "tabla_prueba"
+    before_42 = cache.data_version(table, 42)
+    before_7 = cache.data_version(table, 7)
+    before_table = cache.data_version(table)
+
+    cache.invalidate(table, np.int64(42))
+
+    assert cache.data_version(table, 42.0) != before_42
+    assert cache.data_version(table, 7) == before_7
+    # whole-table readers see any write to the table
+    assert cache.data_version(table) != before_table
+
+    cache.invalidate(table)
+    assert cache.data_version(table, 7) != before_7
+
+
+def test_trl_save_only_invalidates_its_project(temp_db: Path) -> None:
+    dims = pd.DataFrame([{"dimension": "TRL", "nivel": 3, "evidencia": "ok"}])
+    db_trl.save_trl_result(1, dims, 3.0)
+    db_trl.save_trl_result(2, dims, 3.0)
+    assert len(db_trl.get_trl_history(1)) == 1
+    version_2 = cache.data_version(db_trl.TABLE_TRL, 2)
+
+    db_trl.save_trl_result(1, dims, 4.0)
+
+    assert len(db_trl.get_trl_history(1)) == 2
+    assert cache.data_version(db_trl.TABLE_TRL, 2) == version_2
+
+
+def test_fetch_df_sees_writes(temp_db: Path) -> None:
+    db.replace_all(pd.DataFrame({"id_innovacion": [1], "nombre_innovacion": ["A"]}))
+    assert db.fetch_df()["id_innovacion"].tolist() == [1]
+
+    db.upsert_merge(pd.DataFrame({"id_innovacion": [2], "nombre_innovacion": ["B"]}))
+    assert db.fetch_df()["id_innovacion"].tolist() == [1, 2]
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import io
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core import consolidacion
+
+
+def to_xlsx(df: pd.DataFrame) -> bytes:
+    buffer = io.BytesIO()
+    df.to_excel(buffer, index=False)
+    return buffer.getvalue()
+
+
+def irl_rows(project: str, fecha: str, niveles: list[int]) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "ID_Proyecto": project,
+            "fecha_eval": fecha,
+            "Dimension": [f"D{i}" for i in range(len(niveles))],
+            "Nivel": niveles,
+        }
+    )
+
+
+def test_combinar_deduplicates_by_project_and_timestamp() -> None:
+    evaluador_a = pd.concat([irl_rows("P1", "2025-03-01 10:00:00", [3, 4]), irl_rows("P2", "2025-03-02", [2, 2])])
+    # P1 repetido (misma evaluación, otro formato de fecha) y una evaluación nueva de P1
+    evaluador_b = pd.concat([irl_rows("P1", "2025-03-01T10:00:00", [3, 4]), irl_rows("P1", "2025-04-01", [5, 5])])
+    portafolio = pd.DataFrame({"ID_Proyecto": ["P1", "P2", None], "Nombre": ["A", "B", "C"]})
+    tareas = [
+        ("Portafolio", "portafolio.xlsx", b""),
+        ("IRL", "irl_a.xlsx", b""),
+        ("IRL", "irl_b.xlsx", b""),
+        ("EBCT", "ebct.xlsx", b""),
+        ("EBCT", "roto.xlsx", b""),
+    ]
+    resultados = [
+        (portafolio, None),
+        (evaluador_a, None),
+        (evaluador_b, None),
+        (pd.DataFrame({"Caracteristica": ["x"]}), None),
+        (None, "archivo dañado"),
+    ]
+
+    hojas, reporte = consolidacion.combinar(tareas, resultados)
+
+    assert set(hojas) == {"Indice", "IRL"}
+    assert hojas["Indice"]["ID_Proyecto"].tolist() == ["P1", "P2"]
+    irl = hojas["IRL"]
+    assert len(irl) == 6
+    assert irl.groupby("ID_Proyecto")["fecha_eval"].nunique().to_dict() == {"P1": 2, "P2": 1}
+
+    reporte = reporte.set_index("Archivo")
+    assert list(reporte.columns) == consolidacion.REPORTE_COLUMNS[1:]
+    assert reporte.loc["irl_b.xlsx", "Filas_Duplicadas"] == 2
+    assert reporte.loc["irl_b.xlsx", "Filas"] == 2
+    assert reporte.loc["portafolio.xlsx", "Filas_Sin_ID"] == 1
+    assert reporte.loc["irl_a.xlsx", "Estado"] == consolidacion.ESTADO_OK
+    assert reporte.loc["ebct.xlsx", "Estado"] == consolidacion.ESTADO_ERROR
+    assert "archivo dañado" in reporte.loc["roto.xlsx", "Detalle"]
+
+
+def test_combinar_keeps_other_evaluators_rows_without_timestamp() -> None:
+    evaluador_a = pd.DataFrame({"ID_Proyecto": ["P1", "P1"], "Caracteristica": ["x", "y"], "Estado_Color": [3, 1]})
+    evaluador_b = pd.DataFrame({"ID_Proyecto": ["P1", "P1"], "Caracteristica": ["x", "y"], "Estado_Color": [2, 2]})
+    tareas = [("EBCT", nombre, b"") for nombre in ("ebct_a.xlsx", "ebct_b.xlsx", "ebct_a_copia.xlsx")]
+    resultados = [(evaluador_a, None), (evaluador_b, None), (evaluador_a.copy(), None)]
+
+    hojas, reporte = consolidacion.combinar(tareas, resultados)
+
+    assert hojas["EBCT"]["Estado_Color"].tolist() == [3, 1, 2, 2]
+    reporte = reporte.set_index("Archivo")
+    assert reporte.loc["ebct_b.xlsx", "Filas_Duplicadas"] == 0
+    assert reporte.loc["ebct_b.xlsx", "Posibles_Duplicados"] == 2
+    assert reporte.loc["ebct_b.xlsx", "Estado"] == consolidacion.ESTADO_ADVERTENCIA
+    assert reporte.loc["ebct_a_copia.xlsx", "Filas_Duplicadas"] == 2
+
+
+def test_leer_archivos_keeps_upload_order() -> None:
+    frames = [irl_rows(f"P{i}", "2025-01-01", [i]) for i in range(3)]
+    tareas = [("IRL", f"irl_{i}.xlsx", to_xlsx(df)) for i, df in enumerate(frames)]
+    tareas.append(("IRL", "vacio.xlsx", b"no es excel"))
+
+    resultados = consolidacion.leer_archivos(tareas, max_workers=2)
+
+    for (df, error), esperado in zip(resultados, frames):
+        assert error is None
+        assert df["ID_Proyecto"].tolist() == esperado["ID_Proyecto"].tolist()
+    assert resultados[-1][0] is None and resultados[-1][1]
+
+
+def test_consolidated_bundle_loads_in_indicadores() -> None:
+    pytest.importorskip("pyarrow")
+    from core import indicadores, snapshots
+
+    hojas = {
+        "Indice": pd.DataFrame({"ID_Proyecto": ["P1", "P2"], "nombre_innovacion": ["Uno", "Dos"]}),
+        "IRL": irl_rows("P1", "2024-01-01", [3, 5]),
+        "EBCT": pd.DataFrame({"ID_Proyecto": ["P1", "P2"], "Estado_Color": [3, 1]}),
+    }
+
+    content = snapshots.bundle_to_bytes(consolidacion.libro_indicadores(hojas))
+    libro = indicadores.leer_libro_proyectos(content, formato="zip")
+
+    assert list(libro["Índice_Proyectos"]["Nombre_Proyecto"]) == ["Uno", "Dos"]
+    resultado = indicadores.calcular_indicadores(
+        {"indice": libro["Índice_Proyectos"], "irl": libro["Niveles_IRL"],
+         "ebct": libro["Características_EBCT"], "acciones": libro["Plan_Acción"]}
+    )
+    assert list(resultado["Indicador_IRL_Promedio"]) == [4.0, 0.0]
+    assert list(resultado["Indicador_Cumplimiento_EBCT"]) == [100.0, 0.0]
+    assert list(resultado["Total_Acciones"]) == [0, 0]
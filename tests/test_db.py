@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core import db
+from core.utils import normalize_df
+
+
+@pytest.fixture()
+def temp_db(temp_db: Path):
+    db.init_db()
+    return temp_db
+
+
+def build_rows(ids: list[int], estado: str = "Abierto") -> pd.DataFrame:
+    return normalize_df(
+        pd.DataFrame(
+            {
+                "id_innovacion": ids,
+                "nombre_innovacion": [f"Proyecto {i}" for i in ids],
+                "estado_pm": estado,
+                "fecha_termino_pm": "2025-01-31",
+                "evaluacion_numerica": "12,5",
+            }
+        )
+    )
+
+
+def read_table() -> pd.DataFrame:
+    return pd.read_sql_query(f"SELECT * FROM {db.TABLE} ORDER BY id_innovacion", db.get_conn())
+
+
+def test_upsert_merge_reports_inserted_updated_unchanged(temp_db: Path) -> None:
+    db.replace_all(build_rows([1, 2, 3]))
+
+    delta = pd.concat([build_rows([1]), build_rows([2], estado="Cerrado"), build_rows([4])])
+    stats = db.upsert_merge(delta)
+
+    assert stats == {"inserted": 1, "updated": 1, "unchanged": 1}
+    table = read_table()
+    assert table["id_innovacion"].tolist() == [1, 2, 3, 4]
+    assert table.set_index("id_innovacion").loc[2, "estado_pm"] == "Cerrado"
+    assert table.set_index("id_innovacion").loc[4, "fecha_termino_pm"] == "2025-01-31 00:00:00"
+
+
+def test_upsert_merge_matches_replace_all_encoding(temp_db: Path) -> None:
+    db.replace_all(build_rows([1]))
+    before = read_table()
+
+    assert db.upsert_merge(build_rows([1])) == {"inserted": 0, "updated": 0, "unchanged": 1}
+    pd.testing.assert_frame_equal(read_table(), before)
+
+
+def test_fetch_portfolio_reuses_parsed_frame_until_write(temp_db: Path) -> None:
+    db.replace_all(build_rows([1, 2]))
+
+    first = db.fetch_portfolio()
+    first["extra"] = 1  # columnas nuevas no alteran el frame compartido
+    second = db.fetch_portfolio()
+    assert "extra" not in second.columns
+    assert second["evaluacion_numerica"].tolist() == [12.5, 12.5]
+    assert pd.api.types.is_datetime64_any_dtype(second["fecha_termino_pm"])
+    assert "en_plazo" in db.fetch_portfolio(flags=True).columns
+
+    db.upsert_merge(build_rows([3]))
+    assert db.fetch_portfolio()["id_innovacion"].tolist() == [1, 2, 3]
+
+
+def test_replace_all_chunked_swaps_table_atomically(temp_db: Path) -> None:
+    db.replace_all(build_rows([1, 2]))
+
+    def failing_chunks():
+        yield build_rows([10])
+        raise RuntimeError("archivo corrupto")
+
+    with pytest.raises(RuntimeError):
+        db.replace_all_chunked(failing_chunks())
+    assert read_table()["id_innovacion"].tolist() == [1, 2]
+
+    written = db.replace_all_chunked(iter([build_rows([5, 6]), build_rows([7])]))
+    assert written == 3
+    assert read_table()["id_innovacion"].tolist() == [5, 6, 7]
+    tables = {r[0] for r in db.get_conn().execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    assert f"{db.TABLE}_carga" not in tables
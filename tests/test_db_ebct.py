@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core import db_ebct, db_pool
+from core.config import TABLE_EVAL
+from core.ebct import EBCT_CHARACTERISTICS
+
+
+@pytest.fixture()
+def temp_db(temp_db: Path):
+    db_ebct.init_db_ebct()
+    return temp_db
+
+
+def build_responses(value: bool) -> list[dict[str, object]]:
+    return [{**item, "value": value} for item in EBCT_CHARACTERISTICS]
+
+
+def backdate(id_innovacion: int, fecha: str) -> None:
+    with db_pool.transaction() as conn:
+        conn.execute(
+            f"UPDATE {TABLE_EVAL} SET fecha_eval = ? WHERE id_innovacion = ?",
+            (fecha, id_innovacion),
+        )
+
+
+def test_latest_evaluation_returns_only_newest_rows(temp_db: Path) -> None:
+    db_ebct.save_ebct_evaluation(7, build_responses(False))
+    backdate(7, "2024-01-01 10:00:00")
+    timestamp = db_ebct.save_ebct_evaluation(7, build_responses(True))
+
+    latest = db_ebct.get_latest_ebct_evaluation(7)
+
+    assert len(db_ebct.get_ebct_history(7)) == 2 * len(EBCT_CHARACTERISTICS)
+    assert len(latest) == len(EBCT_CHARACTERISTICS)
+    assert set(latest["fecha_eval"]) == {timestamp}
+    assert latest["cumple"].eq(1).all()
+
+
+def test_latest_for_projects_uses_one_result_per_project(temp_db: Path) -> None:
+    db_ebct.save_ebct_evaluation(1, build_responses(False))
+    backdate(1, "2024-01-01 10:00:00")
+    db_ebct.save_ebct_evaluation(1, build_responses(True))
+    db_ebct.save_ebct_evaluation(2, build_responses(False))
+
+    bulk = db_ebct.get_latest_ebct_for_projects([2, 1, 99])
+
+    assert bulk.groupby("id_innovacion").size().to_dict() == {
+        1: len(EBCT_CHARACTERISTICS),
+        2: len(EBCT_CHARACTERISTICS),
+    }
+    assert bulk.loc[bulk["id_innovacion"] == 1, "cumple"].eq(1).all()
+
+
+def test_save_ebct_evaluations_is_all_or_nothing(temp_db: Path) -> None:
+    timestamp = db_ebct.save_ebct_evaluations({3: build_responses(True), 4: build_responses(False)})
+
+    latest = db_ebct.get_latest_ebct_for_projects([3, 4])
+    assert set(latest["fecha_eval"]) == {timestamp}
+    assert latest.groupby("id_innovacion")["cumple"].sum().to_dict() == {3: len(EBCT_CHARACTERISTICS), 4: 0}
+
+    broken = [{**item, "value": True} for item in EBCT_CHARACTERISTICS]
+    broken[-1] = {**broken[-1], "id": None}
+    with pytest.raises(TypeError):
+        db_ebct.save_ebct_evaluations({5: build_responses(True), 6: broken})
+    assert db_ebct.get_latest_ebct_for_projects([5, 6]).empty
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core import db_ebct, db_pool, db_trl
+from core.config import TABLE_EBCT, TABLE_EVAL, TABLE_TRL
+
+
+@pytest.fixture()
+def legacy_db(temp_db: Path):
+    conn = sqlite3.connect(temp_db / "test.sqlite")
+    conn.executescript(
+        f"""
+        CREATE TABLE {TABLE_TRL}(
+            id INTEGER PRIMARY KEY AUTOINCREMENT, id_innovacion INTEGER, fecha_eval TEXT,
+            dimension TEXT, nivel INTEGER, evidencia TEXT, trl_global REAL
+        );
+        INSERT INTO {TABLE_TRL} (id_innovacion, fecha_eval, dimension, nivel, evidencia, trl_global) VALUES
+            (1, '2024-05-01 10:00:00', 'TRL', 3, 'a', 2.5),
+            (1, '2024-05-01 10:00:00', 'CRL', 2, 'b', 2.5),
+            (1, '2024-06-01 10:00:00', 'TRL', 5, 'c', 5.0),
+            (2, '2024-04-01 10:00:00', 'TRL', 1, '', 1.0);
+        CREATE TABLE {TABLE_EBCT} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, id_innovacion INTEGER NOT NULL, fecha_eval TEXT NOT NULL,
+            caracteristica_id INTEGER NOT NULL, caracteristica_nombre TEXT NOT NULL, fase_id TEXT NOT NULL,
+            fase_nombre TEXT NOT NULL, peso REAL NOT NULL, cumple INTEGER NOT NULL
+        );
+        INSERT INTO {TABLE_EBCT} (id_innovacion, fecha_eval, caracteristica_id, caracteristica_nombre,
+                                  fase_id, fase_nombre, peso, cumple) VALUES
+            (1, '2024-05-02 10:00:00', 1, 'C1', 'incipiente', 'Fase Incipiente', 1.0, 0),
+            (1, '2024-07-02 10:00:00', 1, 'C1', 'incipiente', 'Fase Incipiente', 1.0, 1);
+        """
+    )
+    conn.commit()
+    conn.close()
+    return temp_db
+
+
+def test_legacy_tables_are_migrated_to_sessions(legacy_db: Path) -> None:
+    db_trl.init_db_trl()
+    db_ebct.init_db_ebct()
+    conn = db_pool.get_connection()
+
+    sessions = conn.execute(
+        f"SELECT id_innovacion, tipo, fecha_eval, puntaje_global FROM {TABLE_EVAL} ORDER BY id"
+    ).fetchall()
+    assert sessions == [
+        (2, "IRL", "2024-04-01 10:00:00", 1.0),
+        (1, "IRL", "2024-05-01 10:00:00", 2.5),
+        (1, "IRL", "2024-06-01 10:00:00", 5.0),
+        (1, "EBCT", "2024-05-02 10:00:00", None),
+        (1, "EBCT", "2024-07-02 10:00:00", None),
+    ]
+    detail_columns = [row[1] for row in conn.execute(f"PRAGMA table_info({TABLE_TRL});")]
+    assert "fecha_eval" not in detail_columns and "evaluacion_id" in detail_columns
+
+    history = db_trl.get_trl_history(1)
+    assert history["id"].tolist() == [3, 2, 1]
+    assert history["trl_global"].tolist() == [5.0, 2.5, 2.5]
+    assert db_ebct.get_latest_ebct_evaluation(1)["cumple"].tolist() == [1]
+
+
+def test_new_saves_reference_a_session(legacy_db: Path) -> None:
+    db_trl.init_db_trl()
+    db_ebct.init_db_ebct()
+    db_ebct.save_ebct_evaluation(1, [{"id": 2, "name": "C2", "phase_id": "x", "phase_name": "X", "value": True}])
+
+    latest = db_ebct.get_latest_ebct_evaluation(1)
+    assert latest["caracteristica_id"].tolist() == [2]
+    assert db_pool.get_connection().execute("PRAGMA foreign_key_check;").fetchall() == []
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core import db_indicadores, db_pool
+
+
+@pytest.fixture()
+def temp_db(temp_db: Path):
+    db_indicadores.init_db_indicadores()
+    return temp_db
+
+
+def build_bundle() -> dict:
+    return {
+        "indice": pd.DataFrame({"ID_Proyecto": ["P1", "P2"], "Nombre_Proyecto": ["A", "B"]}),
+        "irl": pd.DataFrame({"ID_Proyecto": ["P1", "P2"], "Nivel_Alcanzado": [3, 5]}),
+        "ebct": pd.DataFrame({"ID_Proyecto": ["P1"], "Estado_Color": [np.nan], "Cumple": [True]}),
+        "acciones": pd.DataFrame(
+            {"ID_Proyecto": ["P1"], "Fecha_Fin": pd.to_datetime(["2025-06-30"]), "Avance_Porcentaje": [40]}
+        ),
+        "indicadores": pd.DataFrame({"ID_Proyecto": ["P1", "P2"]}),
+        "preguntas_irl": None,
+    }
+
+
+def test_bundle_round_trip(temp_db: Path) -> None:
+    assert db_indicadores.load_bundle() is None
+
+    datos = build_bundle()
+    db_indicadores.import_bundle(datos, "abc")
+    bundle = db_indicadores.load_bundle()
+
+    assert db_indicadores.bundle_digest() == "abc"
+    assert bundle["preguntas_irl"] is None
+    pd.testing.assert_frame_equal(bundle["indice"], datos["indice"])
+    pd.testing.assert_frame_equal(bundle["ebct"], datos["ebct"])
+    assert pd.api.types.is_datetime64_any_dtype(bundle["acciones"]["Fecha_Fin"])
+    assert bundle["acciones"]["Fecha_Fin"].iloc[0] == pd.Timestamp("2025-06-30")
+    indexes = {r[0] for r in db_pool.get_connection().execute("SELECT name FROM sqlite_master WHERE type='index'")}
+    assert "idx_ind_irl_proyecto" in indexes
+
+
+def test_reimport_and_clear(temp_db: Path) -> None:
+    db_indicadores.import_bundle(build_bundle(), "abc")
+    first = db_indicadores.load_bundle()
+    assert db_indicadores.load_bundle()["indice"] is first["indice"]  # frames compartidos
+
+    datos = build_bundle()
+    datos["indice"] = datos["indice"].iloc[:1]
+    db_indicadores.import_bundle(datos, "def")
+    assert len(db_indicadores.load_bundle()["indice"]) == 1
+
+    db_indicadores.clear_bundle()
+    assert db_indicadores.load_bundle() is None
+    assert db_indicadores.bundle_digest() is None
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core import db_pool
+
+
+@pytest.fixture()
+def db_path(tmp_path: Path):
+    path = str(tmp_path / "pool.sqlite")
+    yield path
+    db_pool.close_all()
+
+
+def test_connection_is_reused_per_thread(db_path: str) -> None:
+    conn = db_pool.get_connection(db_path)
+    assert db_pool.get_connection(db_path) is conn
+
+    other: list[object] = []
+    worker = threading.Thread(target=lambda: other.append(db_pool.get_connection(db_path)))
+    worker.start()
+    worker.join()
+    assert other[0] is not conn
+
+
+def test_connection_uses_wal_and_pragmas(db_path: str) -> None:
+    conn = db_pool.get_connection(db_path)
+    assert conn.execute("PRAGMA journal_mode;").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous;").fetchone()[0] == 1  # NORMAL
+    assert conn.execute("PRAGMA temp_store;").fetchone()[0] == 2  # MEMORY
+
+
+def test_transaction_commits_and_rolls_back(db_path: str) -> None:
+    with db_pool.transaction(db_path) as conn:
+        conn.execute("CREATE TABLE t (x INTEGER);")
+        conn.execute("INSERT INTO t VALUES (1);")
+
+    with pytest.raises(RuntimeError):
+        with db_pool.transaction(db_path) as conn:
+            conn.execute("INSERT INTO t VALUES (2);")
+            with db_pool.transaction(db_path) as inner:
+                inner.execute("INSERT INTO t VALUES (3);")
+            raise RuntimeError("boom")
+
+    rows = db_pool.get_connection(db_path).execute("SELECT x FROM t").fetchall()
+    assert rows == [(1,)]
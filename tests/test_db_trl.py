@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core import db_pool, db_trl
+from core.config import TABLE_EVAL
+
+
+@pytest.fixture()
+def temp_db(temp_db: Path):
+    db_trl.init_db_trl()
+    return temp_db
+
+
+def save(id_innovacion: int, nivel: int, fecha: str | None = None) -> None:
+    dims = pd.DataFrame(
+        [{"dimension": "TRL", "nivel": nivel, "evidencia": ""}, {"dimension": "CRL", "nivel": nivel, "evidencia": ""}]
+    )
+    db_trl.save_trl_result(id_innovacion, dims, float(nivel))
+    if fecha is not None:
+        with db_pool.transaction() as conn:
+            conn.execute(
+                f"UPDATE {TABLE_EVAL} SET fecha_eval = ? WHERE id_innovacion = ? AND puntaje_global = ?",
+                (fecha, id_innovacion, float(nivel)),
+            )
+
+
+def test_histories_rank_evaluations_per_project(temp_db: Path) -> None:
+    save(1, 2, fecha="2024-01-01 09:00:00")
+    save(1, 5)
+    save(2, 3)
+
+    histories = db_trl.get_trl_histories([2, 1])
+
+    assert histories["id_innovacion"].tolist() == [1, 1, 1, 1, 2, 2]
+    assert histories["eval_rank"].tolist() == [1, 1, 2, 2, 1, 1]
+    single = db_trl.get_trl_history(1).reset_index(drop=True)
+    bulk = histories[histories["id_innovacion"] == 1].drop(columns="eval_rank").reset_index(drop=True)
+    pd.testing.assert_frame_equal(single, bulk)
+
+
+def test_latest_per_project(temp_db: Path) -> None:
+    save(1, 2, fecha="2024-01-01 09:00:00")
+    save(1, 5)
+    save(2, 3)
+
+    latest = db_trl.get_latest_trl_per_project()
+
+    assert latest.groupby("id_innovacion")["trl_global"].first().to_dict() == {1: 5.0, 2: 3.0}
+    assert db_trl.get_latest_trl_per_project([2])["id_innovacion"].unique().tolist() == [2]
+    assert db_trl.get_latest_trl_per_project([]).empty
+
+
+def test_save_trl_results_stores_every_project_in_one_batch(temp_db: Path) -> None:
+    save(1, 2)
+    db_trl.get_trl_history(1)  # deja la historia en caché
+
+    timestamp = db_trl.save_trl_results(
+        {
+            1: ([{"dimension": "TRL", "nivel": 4, "evidencia": "piloto"}], 4.0),
+            2: (pd.DataFrame(columns=["dimension", "nivel", "evidencia"]), None),
+        }
+    )
+
+    latest = db_trl.get_latest_trl_per_project()
+    assert set(latest["fecha_eval"]) == {timestamp}
+    assert latest.groupby("id_innovacion")["nivel"].first().fillna(0).to_dict() == {1: 4, 2: 0}
+    assert len(db_trl.get_trl_history(1)) == 3
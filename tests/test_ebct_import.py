@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core import ebct_import
+from core.ebct import EBCT_CHARACTERISTICS
+
+
+def test_normalize_options_keeps_loop_precedence() -> None:
+    raw = pd.Series(["Sí cumple", "🟢 Sí cumple", "No cumple", "En desarrollo", "desarrollo", "cumple", None, "x"])
+
+    assert ebct_import.normalize_options(raw).tolist() == [
+        ebct_import.OPTION_YES,
+        ebct_import.OPTION_YES,
+        ebct_import.OPTION_NO,
+        ebct_import.OPTION_PARTIAL,
+        ebct_import.OPTION_PARTIAL,
+        ebct_import.OPTION_YES,
+        ebct_import.OPTION_NO,
+        ebct_import.OPTION_NO,
+    ]
+
+
+def test_single_project_sheet_skips_unknown_ids() -> None:
+    df = pd.DataFrame({"ID": [1, 2, 999, "abc"], "Respuesta": ["Sí cumple", "En desarrollo", "Sí cumple", "No"]})
+
+    responses, stats = ebct_import.load_ebct_responses(df)
+
+    assert responses == {1: ebct_import.OPTION_YES, 2: ebct_import.OPTION_PARTIAL}
+    assert stats["invalidas"] == 2
+    assert [error["fila"] for error in stats["errores"]] == [4, 5]
+
+    with pytest.raises(ValueError, match="Respuesta"):
+        ebct_import.load_ebct_responses(df.drop(columns=["Respuesta"]))
+
+
+def test_multi_project_sheet_groups_and_builds_rows() -> None:
+    df = pd.DataFrame(
+        {
+            "ID_Proyecto": [10, 10, 11, None],
+            "ID": [1, 2, 1, 3],
+            "Respuesta": ["🟢 Sí cumple", "🟡 En desarrollo", "No cumple", "Sí cumple"],
+        }
+    )
+
+    with pytest.raises(ValueError, match="2 proyectos"):
+        ebct_import.load_ebct_responses(df)
+
+    by_project, stats = ebct_import.load_ebct_responses_by_project(df)
+    assert by_project == {
+        "10": {1: ebct_import.OPTION_YES, 2: ebct_import.OPTION_PARTIAL},
+        "11": {1: ebct_import.OPTION_NO},
+    }
+    assert stats["errores"] == [{"fila": 5, "motivo": "Fila sin proyecto"}]
+
+    rows = ebct_import.evaluation_rows(by_project["10"])
+    assert len(rows) == len(EBCT_CHARACTERISTICS)
+    assert [row["value"] for row in rows[:3]] == [1.0, 0.5, 0.0]
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import sys
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core import exports
+from core.exports import ExportService
+
+
+def test_content_key_follows_data_and_params() -> None:
+    df = pd.DataFrame({"a": [1, 2]})
+
+    key = exports.content_key("plan", df)
+    assert key == exports.content_key("plan", df.copy())
+    assert key != exports.content_key("plan", df.assign(a=[1, 3]))
+    assert key != exports.content_key("plan", df, params=7)
+    assert key != exports.content_key("otro", df)
+
+
+def test_builder_runs_once_per_key() -> None:
+    service = ExportService()
+    started = threading.Event()
+    release = threading.Event()
+    calls: list[int] = []
+
+    def builder() -> bytes:
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return b"xlsx"
+
+    first = service.submit("k", builder)
+    started.wait(5)
+    assert service.pending("k") and service.get("k") is None
+    second = service.submit("k", builder)
+    release.set()
+
+    assert first.result(5) == second.result(5) == b"xlsx"
+    assert service.submit("k", builder).result(5) == b"xlsx"
+    assert calls == [1]
+    assert service.get("k") == b"xlsx" and not service.pending("k")
+
+
+def test_failed_export_is_not_cached_and_lru_is_bounded() -> None:
+    service = ExportService(max_entries=2)
+
+    def fail() -> bytes:
+        raise ValueError("boom")
+
+    future = service.submit("malo", fail)
+    assert isinstance(future.exception(5), ValueError)
+    assert service.get("malo") is None and not service.pending("malo")
+
+    for key in ("a", "b", "c"):
+        service.submit(key, lambda key=key: key.encode()).result(5)
+    assert len(service) == 2 and service.get("a") is None
+
+
+def test_failed_build_keeps_its_message_until_resubmitted() -> None:
+    service = ExportService()
+
+    def fail() -> bytes:
+        raise ValueError("sin datos")
+
+    service.submit("k", fail).exception(5)
+    assert service.error("k") == "sin datos"
+
+    service.submit("k", lambda: b"ok").result(5)
+    assert service.error("k") is None and service.get("k") == b"ok"
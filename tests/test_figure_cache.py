@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import pandas as pd
+import plotly.graph_objects as go
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core.figure_cache import FigureCache, fingerprint
+
+
+def build_figure(values: list[int]) -> go.Figure:
+    fig = go.Figure(go.Bar(x=["a", "b", "c"][: len(values)], y=values))
+    fig.update_layout(height=400)
+    return fig
+
+
+def test_hit_returns_equal_figure_without_rebuilding() -> None:
+    cache = FigureCache()
+    calls: list[int] = []
+
+    def builder() -> go.Figure:
+        calls.append(1)
+        return build_figure([1, 2, 3])
+
+    first = cache.get_or_build(("bar", "h1"), builder)
+    second = cache.get_or_build(("bar", "h1"), builder)
+
+    assert len(calls) == 1
+    assert second is not first
+    assert json.loads(second.to_json()) == json.loads(first.to_json())
+
+
+def test_lru_eviction_by_count_and_bytes() -> None:
+    cache = FigureCache(max_entries=2)
+    for key in ("a", "b"):
+        cache.put(key, build_figure([1]))
+    assert cache.get("a") is not None  # "a" pasa a ser el más reciente
+    cache.put("c", build_figure([2]))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and len(cache) == 2
+
+    spec_size = len(build_figure([1]).to_json())
+    small = FigureCache(max_bytes=spec_size * 2)
+    for key in range(5):
+        small.put(key, build_figure([1]))
+    assert len(small) == 2
+    assert small.nbytes <= spec_size * 2
+
+
+def test_fingerprint_tracks_content() -> None:
+    df = pd.DataFrame({"ID_Proyecto": ["P1", "P2"], "Nivel": [3, 4]})
+
+    assert fingerprint(df) == fingerprint(df.copy())
+    assert fingerprint(df) != fingerprint(df.assign(Nivel=[3, 5]))
+    assert fingerprint(df) != fingerprint(df.astype({"Nivel": float}))
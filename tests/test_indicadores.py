@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import io
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core import indicadores
+from core.indicadores import INDICADOR_COLUMNS, calcular_indicadores
+
+
+def build_datos() -> dict:
+    return {
+        "indice": pd.DataFrame({"ID_Proyecto": ["P1", "P2", "P3"], "Nombre_Proyecto": ["A", "B", "C"]}),
+        "irl": pd.DataFrame({"ID_Proyecto": ["P1", "P1", "P2"], "Nivel_Alcanzado": [3, 6, np.nan]}),
+        "ebct": pd.DataFrame({"ID_Proyecto": ["P1", "P1", "P1", "P2"], "Estado_Color": [3, 2, 1, 3]}),
+        "acciones": pd.DataFrame({"ID_Proyecto": ["P1", "P3"], "Avance_Porcentaje": [40, 100]}),
+    }
+
+
+def test_indicators_per_project() -> None:
+    result = calcular_indicadores(build_datos()).set_index("ID_Proyecto")
+
+    assert list(result.reset_index().columns) == INDICADOR_COLUMNS
+    p1 = result.loc["P1"]
+    assert p1["Indicador_IRL_Promedio"] == 4.5
+    assert p1["Indicador_Caracteristicas_Verde"] == 33.3
+    assert p1["Indicador_Caracteristicas_Rojo"] == 33.3
+    assert p1["Indicador_Madurez_Global"] == round(4.5 / 9 * 40 + 100 / 3 * 0.6, 1)
+    assert p1["Total_Caracteristicas"] == 3
+    assert p1["Total_Acciones"] == 1
+    # Proyectos sin filas en una hoja quedan en 0; niveles vacíos siguen como NaN
+    assert np.isnan(result.loc["P2", "Indicador_IRL_Promedio"])
+    assert result.loc["P3", "Indicador_Cumplimiento_EBCT"] == 0
+    assert result.loc["P3", "Indicador_Avance_Acciones"] == 100
+
+
+def test_missing_color_column_counts_rows_only() -> None:
+    datos = build_datos()
+    datos["ebct"] = datos["ebct"].drop(columns="Estado_Color")
+
+    result = calcular_indicadores(datos)
+
+    assert result["Indicador_Cumplimiento_EBCT"].tolist() == [0, 0, 0]
+    assert result["Total_Caracteristicas"].tolist() == [3, 1, 0]
+
+
+def build_workbook(datos: dict, skip: str | None = None) -> bytes:
+    sheets = {
+        "Índice_Proyectos": datos["indice"],
+        "Niveles_IRL": datos["irl"],
+        "Características_EBCT": datos["ebct"],
+        "Plan_Acción": datos["acciones"],
+        "Indicadores_Desempeño": datos["indice"][["ID_Proyecto"]],
+    }
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        for name, frame in sheets.items():
+            if name != skip:
+                frame.to_excel(writer, sheet_name=name, index=False)
+    return buffer.getvalue()
+
+
+def test_workbook_is_parsed_once_per_content(monkeypatch: pytest.MonkeyPatch) -> None:
+    content = build_workbook(build_datos())
+    calls: list[int] = []
+    original = indicadores.leer_libro_proyectos
+
+    def counting(data: bytes, formato: str = "xlsx") -> dict:
+        calls.append(1)
+        return original(data, formato)
+
+    monkeypatch.setattr(indicadores, "leer_libro_proyectos", counting)
+    first = indicadores.cargar_libro_proyectos(content)
+    first["Índice_Proyectos"].loc[0, "Nombre_Proyecto"] = "editado"
+    second = indicadores.cargar_libro_proyectos(content)
+
+    assert len(calls) == 1
+    assert second["Índice_Proyectos"]["Nombre_Proyecto"].tolist() == ["A", "B", "C"]
+    assert second["Características_EBCT"]["Estado_Display"].tolist()[:2] == ["🟢 Verde", "🟡 Amarillo"]
+    assert second["Preguntas_IRL"] is None
+
+
+def test_workbook_schema_is_validated() -> None:
+    with pytest.raises(ValueError, match="Plan_Acción"):
+        indicadores.leer_libro_proyectos(build_workbook(build_datos(), skip="Plan_Acción"))
+
+    datos = build_datos()
+    datos["irl"] = datos["irl"].drop(columns="Nivel_Alcanzado")
+    with pytest.raises(ValueError, match="Niveles_IRL: Nivel_Alcanzado"):
+        indicadores.leer_libro_proyectos(build_workbook(datos))
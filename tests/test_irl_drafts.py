@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core import db_pool, irl_drafts
+from core.config import TABLE_DRAFT
+
+
+@pytest.fixture()
+def temp_db(temp_db: Path):
+    yield temp_db
+    irl_drafts.flush()
+
+
+def count_rows() -> int:
+    irl_drafts.init_db_drafts()
+    return db_pool.get_connection().execute(f"SELECT COUNT(*) FROM {TABLE_DRAFT}").fetchone()[0]
+
+
+def test_draft_round_trip_and_discard(temp_db: Path) -> None:
+    irl_drafts.write_draft(7, {("CRL", 1, 1): ("VERDADERO", "acta"), ("TRL", 2, 0): (None, "nota")})
+    irl_drafts.write_draft(8, {("CRL", 1, 1): ("FALSO", "")})
+
+    values, actualizado = irl_drafts.load_draft(7)
+
+    assert values == {"resp_CRL_1_1": "VERDADERO", "evid_CRL_1_1": "acta", "resp_TRL_2": None, "evid_TRL_2": "nota"}
+    assert actualizado is not None
+
+    # Un slot vaciado borra su fila
+    irl_drafts.write_draft(7, {("TRL", 2, 0): (None, "")})
+    assert list(irl_drafts.load_draft(7)[0]) == ["resp_CRL_1_1", "evid_CRL_1_1"]
+
+    irl_drafts.discard_draft(7)
+    assert irl_drafts.load_draft(7) == ({}, None)
+    assert irl_drafts.load_draft(8)[0] == {"resp_CRL_1_1": "FALSO", "evid_CRL_1_1": ""}
+
+
+def test_writer_coalesces_changes_off_the_calling_thread(temp_db: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[tuple[int, dict, str]] = []
+    write_draft = irl_drafts.write_draft
+
+    def record(project_id, changes, path=None):
+        calls.append((project_id, dict(changes), threading.current_thread().name))
+        write_draft(project_id, changes, path)
+
+    monkeypatch.setattr(irl_drafts, "write_draft", record)
+    writer = irl_drafts.DraftWriter(debounce_s=60, max_delay_s=60)
+
+    writer.enqueue(5, {("CRL", 1, 1): ("VERDADERO", "")})
+    writer.enqueue(5, {("CRL", 1, 1): ("FALSO", "x"), ("CRL", 1, 2): ("VERDADERO", "")})
+    assert len(writer) == 2 and calls == []
+
+    assert writer.flush(timeout=5)
+    assert calls == [(5, {("CRL", 1, 1): ("FALSO", "x"), ("CRL", 1, 2): ("VERDADERO", "")}, "irl-drafts")]
+    assert count_rows() == 2
+
+    writer.enqueue(5, {("CRL", 1, 2): ("FALSO", "")})
+    writer.discard(5)
+    assert writer.flush(timeout=5)
+    assert len(calls) == 1
+
+
+def test_load_draft_overlays_queued_changes_without_waiting(temp_db: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    irl_drafts.write_draft(4, {("CRL", 1, 1): ("FALSO", ""), ("CRL", 1, 2): ("VERDADERO", "")})
+    writer = irl_drafts.DraftWriter(debounce_s=60, max_delay_s=60)
+    monkeypatch.setattr(irl_drafts, "_writer", writer)
+
+    writer.enqueue(4, {("CRL", 1, 1): ("VERDADERO", "acta"), ("CRL", 1, 2): (None, "")})
+    values, actualizado = irl_drafts.load_draft(4)
+
+    assert values == {"resp_CRL_1_1": "VERDADERO", "evid_CRL_1_1": "acta"}
+    assert actualizado is not None
+    assert len(writer) == 2  # nada se escribió en el hilo que lee
+    assert writer.flush(timeout=5)
+    assert irl_drafts.load_draft(4)[0] == values
+
+
+def test_failed_writes_stay_queued_until_retried(temp_db: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    write_draft = irl_drafts.write_draft
+    failures = [RuntimeError("boom")]
+
+    def fail_once(project_id, changes, path=None):
+        if failures:
+            raise failures.pop()
+        write_draft(project_id, changes, path)
+
+    monkeypatch.setattr(irl_drafts, "write_draft", fail_once)
+    writer = irl_drafts.DraftWriter(debounce_s=60, max_delay_s=60)
+    writer.enqueue(1, {("CRL", 1, 1): ("VERDADERO", "")})
+
+    assert not writer.flush(timeout=5)
+    assert writer.queued(1) == {("CRL", 1, 1): ("VERDADERO", "")}
+
+    assert writer.flush(timeout=5)
+    assert count_rows() == 1
+
+
+def test_discard_during_a_failing_write_does_not_requeue(temp_db: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    started, release = threading.Event(), threading.Event()
+
+    def blocked_failure(project_id, changes, path=None):
+        started.set()
+        release.wait(5)
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(irl_drafts, "write_draft", blocked_failure)
+    writer = irl_drafts.DraftWriter(debounce_s=60, max_delay_s=60)
+    writer.enqueue(1, {("CRL", 1, 1): ("VERDADERO", "")})
+    flusher = threading.Thread(target=writer.flush, args=(5,))
+    flusher.start()
+    assert started.wait(5)
+
+    discarder = threading.Thread(target=writer.discard, args=(1,))
+    discarder.start()
+    deadline = time.monotonic() + 5
+    while not writer._discarded and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    discarder.join(5)
+    flusher.join(5)
+
+    assert len(writer) == 0
+    assert writer.queued(1) == {}
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core import irl_engine
+from core.irl_engine import DimensionAnswers
+
+LEVELS = [{"nivel": n, "preguntas": ["¿?"] * 2} for n in (3, 1, 2)] + [{"nivel": 4, "preguntas": []}]
+
+
+def answers(values: dict[str, object], **rules) -> DimensionAnswers:
+    return DimensionAnswers.from_flat("CRL", LEVELS, values, **rules)
+
+
+def test_levels_are_sorted_and_approved_in_sequence() -> None:
+    data = answers(
+        {
+            "resp_CRL_1_1": "VERDADERO",
+            "resp_CRL_1_2": "VERDADERO",
+            "resp_CRL_2_1": "VERDADERO",
+            "resp_CRL_2_2": "FALSO",
+            "resp_CRL_3_1": "VERDADERO",
+            "resp_CRL_3_2": "VERDADERO",
+            "resp_CRL_4": "VERDADERO",
+        }
+    )
+
+    assert data.levels == (1, 2, 3, 4)
+    assert data.approved_flags() == [True, False, True, True]
+    assert data.score() == 1
+    states = irl_engine.level_states(data)
+    assert states[1] == irl_engine.LevelState("VERDADERO", True, "Completo")
+    assert states[2] == irl_engine.LevelState("FALSO", False, "Incompleto")
+
+
+def test_level_ready_requires_evidence_for_true_answers() -> None:
+    values = {"resp_CRL_1_1": "VERDADERO", "resp_CRL_1_2": "FALSO", "evid_CRL_1_1": "  corto "}
+
+    assert answers(values).level_ready(0)
+    assert not answers(values, strict=True, min_chars=40).level_ready(0)
+    assert not answers({"resp_CRL_1_1": "VERDADERO"}).level_ready(0)
+    assert answers({"resp_CRL_4": "FALSO"}).level_ready(3)
+
+    data = answers(values)
+    data.set(0, 1, "VERDADERO")
+    assert data.level_approved(0) and not data.level_ready(0)
+
+
+def test_approved_level_stops_at_gaps() -> None:
+    assert irl_engine.approved_level([1, 2, 4], [True, True, True]) == 2
+    assert irl_engine.approved_level([2, 3], [True, False]) == 2
+    assert irl_engine.approved_level([1, 2], [False, True]) == 0
+    assert irl_engine.approved_level([], []) == 0
+
+
+def test_score_project_matches_mean_of_reached_levels() -> None:
+    full = {f"resp_CRL_{n}_{i}": "VERDADERO" for n in (1, 2) for i in (1, 2)}
+    project = {
+        "CRL": answers(full),
+        "TRL": DimensionAnswers.from_flat("TRL", LEVELS, {}),
+        "BRL": DimensionAnswers.from_flat("BRL", LEVELS, {"resp_BRL_1_1": "VERDADERO", "resp_BRL_1_2": "VERDADERO"}),
+    }
+
+    score = irl_engine.score_project(project)
+
+    assert score.levels == {"CRL": 2, "TRL": 0, "BRL": 1}
+    assert score.global_score == 1.5
+    assert irl_engine.global_score([None, 0, float("nan")]) is None
+
+
+def test_dimension_rows_join_evidence_of_reached_levels() -> None:
+    values = {
+        "resp_CRL_1_1": "VERDADERO",
+        "resp_CRL_1_2": "VERDADERO",
+        "evid_CRL_1_1": " acta ",
+        "evid_CRL_1_2": "piloto",
+        "resp_CRL_2_1": "VERDADERO",
+        "evid_CRL_2_1": "no cuenta",
+    }
+
+    rows, score = irl_engine.dimension_rows({"CRL": LEVELS, "TRL": LEVELS}, values, ["TRL", "CRL"])
+
+    assert rows == [
+        {"dimension": "TRL", "nivel": None, "evidencia": ""},
+        {"dimension": "CRL", "nivel": 1, "evidencia": "acta · piloto"},
+    ]
+    assert score == irl_engine.ProjectScore({"TRL": 0, "CRL": 1}, 1.0)
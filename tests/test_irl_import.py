@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core import irl_import
+
+LEVEL_DEFINITIONS = {
+    "CRL": [{"nivel": 1, "preguntas": ["¿A?", "¿B?"]}, {"nivel": 2, "preguntas": ["¿C?"]}],
+    "TRL": [{"nivel": 1, "preguntas": ["¿D?"]}],
+}
+HEADERS = ["Dimensión", "Nivel", "# Pregunta", "Pregunta", "Respuesta", "Evidencia"]
+
+
+def sheet(rows: list[list]) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=HEADERS)
+
+
+def test_load_irl_responses_normalizes_and_validates() -> None:
+    df = sheet(
+        [
+            ["CRL - Cliente", 1, 1, "¿A?", True, "  acta firmada "],
+            ["CRL - Cliente", 1, 2, "¿B?", " falso\n", None],
+            ["CRL - Cliente", 2, 1, "¿C?", "v", "piloto"],
+            ["TRL - Tecnología", 1, 1, "¿D?", "quizás", None],
+            ["TRL - Tecnología", 9, 1, "¿?", "VERDADERO", None],
+            [None, 1, 1, "", "FALSO", None],
+            ["CRL - Cliente", "x", 1, "", "FALSO", None],
+        ]
+    )
+
+    responses, stats = irl_import.load_irl_responses(df, LEVEL_DEFINITIONS)
+
+    assert responses == {
+        "resp_CRL_1_1": "VERDADERO",
+        "toggle_CRL_1_1": True,
+        "evid_CRL_1_1": "acta firmada",
+        "resp_CRL_1_2": "FALSO",
+        "toggle_CRL_1_2": False,
+        "evid_CRL_1_2": "",
+        "resp_CRL_2_1": "VERDADERO",
+        "toggle_CRL_2_1": True,
+        "evid_CRL_2_1": "piloto",
+    }
+    assert {k: stats[k] for k in ("total", "validas", "invalidas", "vacias")} == {
+        "total": 7,
+        "validas": 3,
+        "invalidas": 3,
+        "vacias": 1,
+    }
+    assert [error["fila"] for error in stats["errores"]] == [5, 6, 8]
+    assert stats["errores"][0]["respuesta_limpia"] == "'QUIZÁS'"
+    assert "catálogo" in stats["errores"][1]["motivo"]
+
+
+def test_missing_columns_raise() -> None:
+    with pytest.raises(ValueError, match="evidencia"):
+        irl_import.load_irl_responses(sheet([]).drop(columns=["Evidencia"]), LEVEL_DEFINITIONS)
+
+
+def test_multi_project_sheet() -> None:
+    df = sheet(
+        [
+            ["CRL - Cliente", 1, 1, "", "VERDADERO", "a"],
+            ["CRL - Cliente", 1, 1, "", "FALSO", ""],
+            ["TRL - Tecnología", 1, 1, "", "VERDADERO", "b"],
+        ]
+    )
+    df.insert(0, "ID_Proyecto", [101, 102, None])
+
+    with pytest.raises(ValueError, match="2 proyectos"):
+        irl_import.load_irl_responses(df, LEVEL_DEFINITIONS)
+
+    by_project, stats = irl_import.load_irl_responses_by_project(df, LEVEL_DEFINITIONS)
+    assert set(by_project) == {"101", "102"}
+    assert by_project["101"]["toggle_CRL_1_1"] is True
+    assert by_project["102"]["resp_CRL_1_1"] == "FALSO"
+    assert stats["validas"] == 2 and stats["invalidas"] == 1
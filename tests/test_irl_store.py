@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core import irl_engine
+from core.irl_store import AnswerStore
+
+LEVEL_DEFINITIONS = {
+    "CRL": [{"nivel": 2, "preguntas": ["¿C?"]}, {"nivel": 1, "preguntas": ["¿A?", "¿B?"]}],
+    "TRL": [{"nivel": 1, "preguntas": []}],
+}
+
+
+def test_store_matches_flat_answers() -> None:
+    values = {
+        "resp_CRL_1_1": "VERDADERO",
+        "evid_CRL_1_1": "acta",
+        "resp_CRL_1_2": "VERDADERO",
+        "resp_CRL_2_1": "FALSO",
+        "resp_TRL_1": "VERDADERO",
+        "evid_TRL_1": "piloto",
+        "resp_XRL_1_1": "VERDADERO",
+    }
+
+    store = AnswerStore.from_flat(LEVEL_DEFINITIONS, values, project_id=7)
+
+    for dimension, levels in LEVEL_DEFINITIONS.items():
+        expected = irl_engine.DimensionAnswers.from_flat(dimension, levels, values)
+        assert store.answers(dimension) == expected
+    assert store.get("CRL", 1, 1) == ("VERDADERO", "acta")
+    assert store.get("CRL", 2, 1) == ("FALSO", "")
+    assert store.get("TRL", 1) == ("VERDADERO", "piloto")
+    assert store.to_flat()["toggle_CRL_1_2"] is True
+    assert "resp_XRL_1_1" not in store.to_flat()
+
+
+def test_versions_change_only_with_the_dimension() -> None:
+    store = AnswerStore.empty(LEVEL_DEFINITIONS)
+
+    assert store.set("CRL", 1, 2, "VERDADERO", "ok")
+    assert not store.set("CRL", 1, 2, "VERDADERO")
+    assert store.dimension_version("CRL") == 1
+    assert store.dimension_version("TRL") == 0
+    assert store.answers("CRL").level_ready(0) is False
+
+    assert store.update({"resp_CRL_1_1": "FALSO", "evid_TRL_1": "texto"}) == 2
+    assert store.answers("CRL").level_ready(0)
+    assert store.get("TRL", 1) == (None, "texto")
+    assert store.version == 3
+
+
+def test_take_changes_returns_each_changed_slot_once() -> None:
+    store = AnswerStore.empty(LEVEL_DEFINITIONS, project_id=3)
+
+    store.set("CRL", 1, 1, "VERDADERO")
+    store.set("CRL", 1, 1, "FALSO", "acta")
+    store.set("TRL", 1, 0, "FALSO")
+    store.set("TRL", 1, 0, "FALSO")
+
+    assert store.take_changes() == {("CRL", 1, 1): ("FALSO", "acta"), ("TRL", 1, 0): ("FALSO", "")}
+    assert store.take_changes() == {}
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import io
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core.portfolio_import import read_upload_chunks
+
+
+def build_frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "id_innovacion": list(range(1, rows + 1)),
+            "nombre_innovacion": [f"Proyecto {i}" for i in range(1, rows + 1)],
+            "fecha_termino_pm": [datetime(2025, 1, 1 + i % 28) for i in range(rows)],
+            "evaluacion_numerica": [i / 2 for i in range(rows)],
+        }
+    )
+
+
+def test_xlsx_chunks_match_read_excel() -> None:
+    buffer = io.BytesIO()
+    build_frame(23).to_excel(buffer, index=False)
+    buffer.seek(0)
+
+    chunks, total = read_upload_chunks(buffer, "portafolio.xlsx", chunk_rows=10)
+    parts = list(chunks)
+
+    assert total == 23
+    assert [len(part) for part in parts] == [10, 10, 3]
+    buffer.seek(0)
+    pd.testing.assert_frame_equal(
+        pd.concat(parts, ignore_index=True), pd.read_excel(buffer), check_dtype=False
+    )
+
+
+def test_csv_chunks_cover_every_row() -> None:
+    buffer = io.BytesIO(build_frame(7).to_csv(index=False).encode("utf-8"))
+
+    chunks, total = read_upload_chunks(buffer, "portafolio.CSV", chunk_rows=3)
+
+    assert total is None
+    assert pd.concat(list(chunks))["id_innovacion"].tolist() == list(range(1, 8))
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core.scoring import evaluate_portfolio, prepare_lookup, thresholds
+from core.utils import normalize_df
+
+
+TODAY = pd.Timestamp("2025-06-01")
+
+
+def build_tables() -> dict[str, pd.DataFrame]:
+    return {
+        "estatus": pd.DataFrame([("MVP", 62.5), ("EBCT", 100.0)], columns=["Concepto", "Valor"]),
+        "impacto": pd.DataFrame([("Alto", 30), ("Medio", 20)], columns=["Concepto", "Valor"]),
+        "estado_pm": pd.DataFrame([("Abierto", 10), ("Cerrado", 0)], columns=["Concepto", "Valor"]),
+        "activo_pm": pd.DataFrame([("Si", 10), ("No", 0)], columns=["Concepto", "Valor"]),
+        "potencial_transferencia": pd.DataFrame([("Comercial", 20)], columns=["Concepto", "Valor"]),
+        "tiene_resp_in": pd.DataFrame([("Si", 0), ("No", 10)], columns=["Concepto", "Valor"]),
+        "evaluacion": pd.DataFrame(
+            [("Alta", 100), ("Media", 50), ("Baja", 0)], columns=["Rango", "ValorReferencia"]
+        ),
+    }
+
+
+def build_portfolio() -> pd.DataFrame:
+    return normalize_df(
+        pd.DataFrame(
+            [
+                {
+                    "id_innovacion": 1, "estatus": " mvp ", "impacto": "Alto", "estado_pm": "Abierto",
+                    "activo_pm": "Si", "potencial_transferencia": "Comercial", "tiene_resp_in": "No",
+                    "fecha_termino_pm": "2025-06-01",
+                },
+                {
+                    "id_innovacion": 2, "estatus": "EBCT", "impacto": "Medio", "estado_pm": "Abierto",
+                    "activo_pm": "Si", "potencial_transferencia": "Otro", "tiene_resp_in": "Si",
+                    "fecha_termino_pm": "31/05/2025",
+                },
+                {
+                    "id_innovacion": 3, "estatus": "EBCT", "impacto": "Alto", "estado_pm": "Cerrado",
+                    "activo_pm": "Si", "potencial_transferencia": "Comercial", "tiene_resp_in": "Si",
+                    "fecha_termino_pm": "",
+                },
+            ]
+        )
+    )
+
+
+def test_prepare_lookup_normalizes_keys_and_values() -> None:
+    table = pd.DataFrame([(" Alto ", "30"), ("", 5), ("Bajo", "n/a")], columns=["Concepto", "Valor"])
+    assert prepare_lookup(table) == {"alto": 30.0, "bajo": 0.0}
+
+
+def test_thresholds_are_monotonic() -> None:
+    table = pd.DataFrame([("Baja", 80), ("Media", 40), ("Alta", 10)], columns=["Rango", "ValorReferencia"])
+    assert thresholds(table) == {"baja": 80.0, "media": 80.0, "alta": 80.0}
+
+
+def test_evaluate_portfolio_scores_and_recommendations() -> None:
+    result = evaluate_portfolio(build_portfolio(), build_tables(), today=TODAY)
+
+    # 62.5 + 30 + 10 + 20 + 10 + 10 + bono plazo
+    assert result["evaluacion_calculada"].tolist() == [152.5, 140.0, 0.0]
+    assert result["recomendacion"].tolist() == [
+        "Dentro de plazo; Impacto alto; Sin Resp IN; Prioridad alta",
+        "Fuera de plazo; Prioridad alta",
+        "Proy. cerrado; Impacto alto; Prioridad baja",
+    ]
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+pytest.importorskip("pyarrow")
+
+from core import db, db_pool, snapshots
+from core.indicadores import HOJAS_REQUERIDAS, leer_libro_proyectos
+from core.utils import normalize_df
+
+
+@pytest.fixture()
+def temp_db(temp_db: Path):
+    db.init_db()
+    return temp_db
+
+
+def build_rows(ids: list[int], estado: str = "Abierto") -> pd.DataFrame:
+    return normalize_df(
+        pd.DataFrame(
+            {
+                "id_innovacion": ids,
+                "nombre_innovacion": [f"Proyecto {i}" for i in ids],
+                "estado_pm": estado,
+                "fecha_termino_pm": "2025-01-31",
+            }
+        )
+    )
+
+
+def read_sql() -> pd.DataFrame:
+    with db_pool.transaction(immediate=False) as conn:
+        return db._read_table(conn)
+
+
+def test_portfolio_snapshot_matches_sql_and_follows_writes(temp_db: Path) -> None:
+    db.replace_all(build_rows([1, 2]))
+
+    first = snapshots.load_table(db.TABLE, db._read_table)
+    with db_pool.transaction(immediate=False) as conn:
+        key = snapshots.snapshot_key(conn, db.TABLE)
+    path = snapshots.snapshot_path(db.TABLE, key)
+    assert os.path.exists(path)
+    pd.testing.assert_frame_equal(first, read_sql())
+    pd.testing.assert_frame_equal(snapshots.read_table(path), first)
+
+    db.upsert_merge(build_rows([2], estado="Cerrado"))
+    second = snapshots.load_table(db.TABLE, db._read_table)
+    assert second.set_index("id_innovacion").loc[2, "estado_pm"] == "Cerrado"
+    assert not os.path.exists(path)  # la generación anterior se elimina
+
+    # upsert sin cambios no invalida el snapshot
+    with db_pool.transaction(immediate=False) as conn:
+        gen = snapshots.generation(conn, db.TABLE)
+    db.upsert_merge(build_rows([1]))
+    with db_pool.transaction(immediate=False) as conn:
+        assert snapshots.generation(conn, db.TABLE) == gen
+
+
+def test_replaced_database_with_same_generation_is_not_served_stale(temp_db: Path) -> None:
+    db.replace_all(build_rows([1]))
+    assert snapshots.load_table(db.TABLE, db._read_table)["id_innovacion"].tolist() == [1]
+
+    # Otra base que llega a la misma generación reemplaza el archivo (backup, git pull)
+    other = temp_db / "other.sqlite"
+    db_pool.close_all()
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(db_pool, "DB_PATH", str(other))
+        db.init_db()
+        db.replace_all(build_rows([8, 9]))
+        db_pool.close_all()
+    os.replace(other, db_pool.DB_PATH)
+
+    assert snapshots.load_table(db.TABLE, db._read_table)["id_innovacion"].tolist() == [8, 9]
+
+
+def test_replace_all_chunked_bumps_generation(temp_db: Path) -> None:
+    db.replace_all(build_rows([1]))
+    snapshots.load_table(db.TABLE, db._read_table)
+
+    db.replace_all_chunked([build_rows([5, 6]), build_rows([7])])
+
+    assert snapshots.load_table(db.TABLE, db._read_table)["id_innovacion"].tolist() == [5, 6, 7]
+
+
+def test_bundle_round_trip_with_projection() -> None:
+    frames = {
+        "Índice_Proyectos": pd.DataFrame({"ID_Proyecto": ["P1", "P2"], "Nombre_Proyecto": ["A", "B"]}),
+        "Niveles_IRL": pd.DataFrame({"ID_Proyecto": ["P1"], "Nivel_Alcanzado": [4], "Extra": ["x"]}),
+        "Características_EBCT": pd.DataFrame({"ID_Proyecto": ["P1"], "Estado_Color": [3]}),
+        "Plan_Acción": pd.DataFrame({"ID_Proyecto": ["P1"], "Avance_Porcentaje": [50]}),
+        "Indicadores_Desempeño": pd.DataFrame({"ID_Proyecto": ["P1", "P2"]}),
+    }
+    content = snapshots.bundle_to_bytes(frames)
+
+    projected = snapshots.bundle_from_bytes(content, {"Niveles_IRL": ["Nivel_Alcanzado"]})
+    assert list(projected["Niveles_IRL"].columns) == ["Nivel_Alcanzado"]
+    pd.testing.assert_frame_equal(projected["Índice_Proyectos"], frames["Índice_Proyectos"])
+
+    libro = leer_libro_proyectos(content, "zip")
+    assert set(HOJAS_REQUERIDAS) <= set(libro)
+    assert libro["Características_EBCT"]["Estado_Display"].tolist() == ["🟢 Verde"]
+    assert libro["Preguntas_IRL"] is None
+
+    with pytest.raises(ValueError, match="Plan_Acción"):
+        leer_libro_proyectos(snapshots.bundle_to_bytes({"Índice_Proyectos": frames["Índice_Proyectos"]}), "zip")
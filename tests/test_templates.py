@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core import templates
+
+
+@pytest.fixture()
+def temp_db(temp_db: Path):
+    templates.clear()
+    yield temp_db
+    templates.clear()
+
+
+def test_template_is_built_once_per_catalog_version(temp_db: Path) -> None:
+    calls: list[str] = []
+
+    def builder(content: bytes):
+        def build() -> bytes:
+            calls.append(content.decode())
+            return content
+        return build
+
+    v1 = templates.catalog_version([{"nivel": 1, "preguntas": ["¿A?"]}])
+    v2 = templates.catalog_version([{"nivel": 1, "preguntas": ["¿B?"]}])
+    assert v1 != v2
+
+    assert templates.get_template("irl", v1, builder(b"uno")) == b"uno"
+    assert templates.get_template("irl", v1, builder(b"otro")) == b"uno"
+    assert templates.get_template("irl", v2, builder(b"dos")) == b"dos"
+    assert calls == ["uno", "dos"]
+    assert templates.get_template("nada", v1, lambda: None) is None
+
+
+def test_persisted_template_survives_restart(temp_db: Path) -> None:
+    v1 = templates.catalog_version(["a"])
+    v2 = templates.catalog_version(["b"])
+    templates.get_template("ebct", v1, lambda: b"v1", persist=True)
+    templates.get_template("ebct", v2, lambda: b"v2", persist=True)
+
+    assert os.listdir(temp_db / "templates") == [f"ebct-{v2}.xlsx"]
+    templates.clear()
+    assert templates.get_template("ebct", v2, lambda: pytest.fail("rebuilt"), persist=True) == b"v2"
+
+
+def test_builder_runs_outside_the_registry_lock(temp_db: Path) -> None:
+    finished = threading.Event()
+
+    def slow_build() -> bytes:
+        # Otra plantilla se sirve mientras esta se construye
+        worker = threading.Thread(
+            target=lambda: templates.get_template("ebct", "v1", lambda: b"ebct") and finished.set()
+        )
+        worker.start()
+        worker.join(timeout=2.0)
+        return b"irl"
+
+    assert templates.get_template("irl", "v1", slow_build) == b"irl"
+    assert finished.is_set()
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from core.utils import (
+    normalize_df,
+    parse_date,
+    parse_date_series,
+    parse_float_local,
+    parse_float_series,
+    to_sql_rows,
+)
+
+
+def as_list(series: pd.Series) -> list[object]:
+    values = series.astype(object)
+    return values.where(values.notna(), None).tolist()
+
+
+def test_parse_date_series_matches_scalar_parser() -> None:
+    raw = pd.Series(
+        ["2024-01-05", "05/01/2024", "2024-01-05 13:45:10", "", None, np.nan, "basura", "31/02/2024", "Jan 5 2024"]
+    )
+    assert as_list(parse_date_series(raw)) == as_list(raw.apply(parse_date))
+    assert pd.api.types.is_datetime64_any_dtype(parse_date_series(raw))
+
+
+def test_parse_float_series_matches_scalar_parser() -> None:
+    raw = pd.Series(["132,5", "150", "", None, 12, 3.5, True, "abc", "-0,25"])
+    expected = raw.apply(parse_float_local).astype(float)
+    np.testing.assert_array_equal(parse_float_series(raw).to_numpy(), expected.to_numpy())
+
+
+def test_normalize_df_fills_missing_columns() -> None:
+    df = normalize_df(pd.DataFrame({"id_innovacion": [1], "evaluacion_numerica": ["92,5"]}))
+    assert df.loc[0, "evaluacion_numerica"] == 92.5
+    assert pd.isna(df.loc[0, "fecha_termino_pm"])
+    assert df.loc[0, "responsable_innovacion"] == ""
+
+
+def test_to_sql_rows_uses_to_sql_encoding() -> None:
+    df = pd.DataFrame(
+        {"id": [1, 2], "fecha": pd.to_datetime(["2024-05-01 10:30:00", None]), "nota": [1.5, np.nan]}
+    )
+    assert to_sql_rows(df) == [(1, "2024-05-01 10:30:00", 1.5), (2, None, None)]